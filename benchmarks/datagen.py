@@ -0,0 +1,182 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Synthetic large dataset generator for scaling tests
+
+Writes a mock iLO tree sized like our worst case servers, or any fraction
+of it, together with matching save, serverclone and multi server files.
+
+    python datagen.py --out worst --preset worst
+    python datagen.py --out tenth --preset worst --scale 0.1
+    python mockilo.py --tree worst/tree.json
+"""
+
+#---------Imports---------
+
+import os
+import sys
+import copy
+import json
+import argparse
+
+from collections import OrderedDict
+
+from mockilo import build_ilo5_tree
+
+#---------End of imports---------
+
+PRESETS = {
+    'default': OrderedDict([('bios_attributes', 120), ('iml_entries', 50), \
+        ('iel_entries', 20), ('controllers', 1), ('drives', 4), ('accounts', 3), \
+        ('nics', 4), ('components', 3)]),
+    'worst': OrderedDict([('bios_attributes', 3000), ('iml_entries', 10000), \
+        ('iel_entries', 2000), ('controllers', 4), ('drives', 50), ('accounts', 30), \
+        ('nics', 40), ('components', 100)]),
+}
+
+#Types written by serverclone save, with the properties it keeps
+CLONE_TYPES = ['#Bios.', '#ComputerSystem.', '#ManagerAccount.', '#SmartStorageConfig.']
+
+def scaled_sizes(preset='worst', scale=1.0, **overrides):
+    """ Dataset sizes for a preset scaled by a factor
+
+    :param preset: name of a preset in PRESETS
+    :type preset: str.
+    :param scale: factor applied to every count of the preset
+    :type scale: float.
+    :returns: returns an ordered dictionary of build_ilo5_tree arguments
+    """
+    sizes = OrderedDict((key, max(1, int(round(val * scale)))) for key, val in \
+                                                            PRESETS[preset].items())
+    sizes.update((key, val) for key, val in overrides.items() if val is not None)
+    return sizes
+
+def instances(tree, typeprefix):
+    """ Resources of a tree whose type starts with typeprefix """
+    return [body for body in tree.resources.values() if \
+                            body.get('@odata.type', '').startswith(typeprefix)]
+
+def comments(tree):
+    """ Comments block written at the top of save and clone files """
+    system = instances(tree, '#ComputerSystem.')[0]
+    return {'Manufacturer': system['Manufacturer'], 'Model': system['Model']}
+
+def save_data(tree):
+    """ Contents of `save --multisave Bios.,ComputerSystem.` for a tree
+
+    :param tree: tree to save
+    :type tree: MockIloTree.
+    :returns: returns the save file contents
+    """
+    data = [{'Comments': comments(tree)}]
+    for body in [tree.get('/redfish/v1/systems/1/bios/settings/')] + \
+                                            instances(tree, '#ComputerSystem.'):
+        data.append({body['@odata.type']: {body['@odata.id']: copy.deepcopy(body)}})
+    return data
+
+def strip_links(body):
+    """ Drop OData annotations, actions and links like serverclone save does """
+    result = OrderedDict()
+    for key, val in body.items():
+        if key.startswith('@odata') or key in ('Actions', 'Links'):
+            continue
+        if isinstance(val, dict):
+            val = {} if '@odata.id' in val else strip_links(val)
+        result[key] = val
+    return result
+
+def clone_data(tree):
+    """ Contents of `serverclone save` for a tree
+
+    :param tree: tree to clone
+    :type tree: MockIloTree.
+    :returns: returns the clone file contents
+    """
+    data = OrderedDict([('Comments', comments(tree))])
+    for prefix in CLONE_TYPES:
+        bodies = instances(tree, prefix)
+        if prefix == '#Bios.':
+            bodies = [tree.get('/redfish/v1/systems/1/bios/settings/')]
+        for body in bodies:
+            entry = strip_links(body)
+            if prefix == '#ManagerAccount.':
+                hpe = body['Oem']['Hpe']
+                entry = OrderedDict([('UserName', body['UserName']), ('LoginName', \
+                    hpe['LoginName']), ('Password', '<p/k>'), ('AccountType', \
+                    'User Account'), ('Privileges', hpe['Privileges'])])
+            data.setdefault(body['@odata.type'], OrderedDict())[body['@odata.id']] = entry
+    return data
+
+def multiserver_data(urls, username='admin', password='password'):
+    """ Contents of a `load -m` multi server file
+
+    :param urls: iLO urls, one server per url
+    :type urls: list.
+    """
+    return ''.join('--url %s -u %s -p %s\n' % (url, username, password) for url in urls)
+
+def write_dataset(outdir, sizes, urls=None):
+    """ Write a tree with matching save, clone and multi server files
+
+    :param outdir: output directory
+    :type outdir: str.
+    :param sizes: build_ilo5_tree arguments
+    :type sizes: dict.
+    :param urls: urls for the multi server file
+    :type urls: list.
+    :returns: returns the generated tree
+    """
+    if not os.path.isdir(outdir):
+        os.makedirs(outdir)
+
+    tree = build_ilo5_tree(**sizes)
+    tree.save(os.path.join(outdir, 'tree.json'))
+
+    with open(os.path.join(outdir, 'save.json'), 'w') as outfile:
+        json.dump(save_data(tree), outfile, indent=2)
+    with open(os.path.join(outdir, 'clone.json'), 'w') as outfile:
+        json.dump(clone_data(tree), outfile, indent=2)
+    with open(os.path.join(outdir, 'servers.txt'), 'w') as outfile:
+        outfile.write(multiserver_data(urls or ['http://127.0.0.1:8000']))
+    with open(os.path.join(outdir, 'sizes.json'), 'w') as outfile:
+        json.dump(sizes, outfile, indent=2)
+
+    return tree
+
+def main(argv=None):
+    """ Command line entry point """
+    parser = argparse.ArgumentParser(description='Generate synthetic iLO datasets.')
+    parser.add_argument('--out', required=True, help='Output directory.')
+    parser.add_argument('--preset', default='worst', choices=sorted(PRESETS), \
+                        help='Base sizes. (default: worst)')
+    parser.add_argument('--scale', type=float, default=1.0, help='Factor applied to '\
+                        'every preset size.')
+    for name in PRESETS['worst']:
+        parser.add_argument('--' + name.replace('_', '-'), dest=name, type=int, \
+                            default=None, help='Override the number of %s.' % \
+                            name.replace('_', ' '))
+    parser.add_argument('--server', action='append', default=None, help='Url written '\
+                        'to the multi server file, may be repeated.')
+    args = parser.parse_args(argv)
+
+    sizes = scaled_sizes(args.preset, args.scale, **dict((name, getattr(args, name)) \
+                                                    for name in PRESETS['worst']))
+    tree = write_dataset(args.out, sizes, args.server)
+    sys.stdout.write('Wrote %d resources to %s\n' % (len(tree.resources), args.out))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1153 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Mock iLO 5 Redfish server for offline testing and benchmarking
+
+Serves an iLO 5 like Redfish tree over plain HTTP on localhost so every
+command can run against --url http://127.0.0.1:PORT without hardware.
+
+    python mockilo.py --port 8000 --latency 0.02 --error-rate 0.01
+    ilorest login http://127.0.0.1:8000 -u admin -p password
+"""
+
+#---------Imports---------
+
+import sys
+import copy
+import json
+import time
+import uuid
+import base64
+import re
+import random
+import hashlib
+import argparse
+import threading
+
+from collections import OrderedDict
+
+from six.moves import BaseHTTPServer, socketserver
+from six.moves.urllib.parse import urlparse, parse_qs
+
+#---------End of imports---------
+
+ROOT = '/redfish/v1/'
+SESSIONS = '/redfish/v1/SessionService/Sessions/'
+BIOS_REGISTRY = 'BiosAttributeRegistryU32.v1_2_10'
+
+def normpath(path):
+    """ Normalize a Redfish path for lookups
+
+    :param path: path as requested by the client
+    :type path: str.
+    :returns: lower case path with a single trailing slash
+    """
+    path = urlparse(path).path.replace('//', '/')
+    return path.rstrip('/').lower() + '/'
+
+def resource(path, odatatype, **fields):
+    """ Create a Redfish resource body
+
+    :param path: @odata.id of the resource
+    :type path: str.
+    :param odatatype: @odata.type of the resource
+    :type odatatype: str.
+    :returns: returns the resource body
+    """
+    body = OrderedDict()
+    body['@odata.context'] = '/redfish/v1/$metadata' + odatatype.split('.')[0]
+    body['@odata.id'] = path
+    body['@odata.type'] = odatatype
+    for key in sorted(fields):
+        body[key] = fields[key]
+    return body
+
+def link(path):
+    """ Create a Redfish link object
+
+    :param path: @odata.id to link to
+    :type path: str.
+    """
+    return {'@odata.id': path}
+
+def collection(path, odatatype, members, name):
+    """ Create a Redfish collection body
+
+    :param path: @odata.id of the collection
+    :type path: str.
+    :param odatatype: @odata.type of the collection
+    :type odatatype: str.
+    :param members: member paths
+    :type members: list.
+    :param name: collection name
+    :type name: str.
+    """
+    return resource(path, odatatype, Name=name, Members=[link(mem) for mem in members],\
+                    **{'Members@odata.count': len(members)})
+
+def extended_info(messageid='Base.1.4.Success', status=200):
+    """ Create an iLO extended info response body
+
+    :param messageid: message id to return
+    :type messageid: str.
+    :param status: HTTP status the message goes with
+    :type status: int.
+    """
+    code = 'iLO.0.10.ExtendedInfo' if status < 400 else 'Base.1.4.GeneralError'
+    return {'error': {'code': code, 'message': 'See @Message.ExtendedInfo for more '\
+                'information.', '@Message.ExtendedInfo': [{'MessageId': messageid}]}}
+
+def bios_attribute_name(index):
+    """ Name of the generated BIOS attribute at index """
+    return 'MockAttribute%04d' % index
+
+def build_bios(tree, attributes):
+    """ Add BIOS, BIOS settings and the BIOS attribute registry to a tree
+
+    :param tree: tree to add resources to
+    :type tree: MockIloTree.
+    :param attributes: number of BIOS attributes
+    :type attributes: int.
+    """
+    values = OrderedDict([('BootMode', 'Uefi'), ('ProcHyperthreading', 'Enabled'), \
+                ('WorkloadProfile', 'GeneralPowerEfficientCompute'), \
+                ('AdminName', ''), ('ServerAssetTag', ''), ('TimeZone', 'Utc0')])
+    entries = [
+        {'AttributeName': 'BootMode', 'Type': 'Enumeration', 'ReadOnly': False, \
+         'Value': [{'ValueName': 'Uefi'}, {'ValueName': 'LegacyBios'}]},
+        {'AttributeName': 'ProcHyperthreading', 'Type': 'Enumeration', 'ReadOnly': False, \
+         'Value': [{'ValueName': 'Enabled'}, {'ValueName': 'Disabled'}]},
+        {'AttributeName': 'WorkloadProfile', 'Type': 'Enumeration', 'ReadOnly': False, \
+         'Value': [{'ValueName': 'GeneralPowerEfficientCompute'}, \
+                   {'ValueName': 'GeneralPeakFrequencyCompute'}, {'ValueName': 'Custom'}]},
+        {'AttributeName': 'AdminName', 'Type': 'String', 'ReadOnly': False, \
+         'MaxLength': 28, 'MinLength': 0},
+        {'AttributeName': 'ServerAssetTag', 'Type': 'String', 'ReadOnly': False, \
+         'MaxLength': 32, 'MinLength': 0, 'ValueExpression': '^[A-Za-z0-9 ]*$'},
+        {'AttributeName': 'TimeZone', 'Type': 'Enumeration', 'ReadOnly': False, \
+         'Value': [{'ValueName': 'Utc0'}, {'ValueName': 'Utc1'}, {'ValueName': 'UtcM1'}]},
+    ]
+
+    for index in range(max(attributes - len(values), 0)):
+        name = bios_attribute_name(index)
+        if index % 3 == 0:
+            values[name] = 'Enabled'
+            entries.append({'AttributeName': name, 'Type': 'Enumeration', \
+                'ReadOnly': index % 30 == 0, 'Value': [{'ValueName': 'Enabled'}, \
+                                                       {'ValueName': 'Disabled'}]})
+        elif index % 3 == 1:
+            values[name] = index % 100
+            entries.append({'AttributeName': name, 'Type': 'Integer', \
+                'ReadOnly': False, 'LowerBound': 0, 'UpperBound': 255})
+        else:
+            values[name] = 'Value%d' % index
+            entries.append({'AttributeName': name, 'Type': 'String', \
+                'ReadOnly': False, 'MaxLength': 64, 'MinLength': 0})
+
+    for entry in entries:
+        entry['DisplayName'] = entry['HelpText'] = entry['AttributeName']
+
+    tree.add(resource('/redfish/v1/systems/1/bios/', '#Bios.v1_0_0.Bios', Id='bios', \
+        Name='BIOS Current Settings', AttributeRegistry=BIOS_REGISTRY, \
+        Attributes=values, Actions={'#Bios.ResetBios': \
+                {'target': '/redfish/v1/systems/1/bios/Actions/Bios.ResetBios/'}}, \
+        **{'@Redfish.Settings': {'@odata.type': '#Settings.v1_0_0.Settings', \
+            'SettingsObject': link('/redfish/v1/systems/1/bios/settings/')}}))
+    tree.add(resource('/redfish/v1/systems/1/bios/settings/', '#Bios.v1_0_0.Bios', \
+        Id='settings', Name='BIOS Pending Settings', AttributeRegistry=BIOS_REGISTRY, \
+        Attributes=copy.deepcopy(values)))
+
+    regpath = '/redfish/v1/RegistryStore/attributeregistries/en/%s/' % BIOS_REGISTRY
+    tree.add(resource(regpath, '#AttributeRegistry.v1_2_0.AttributeRegistry', \
+        Id=BIOS_REGISTRY, Name='BIOS Attribute Registry', Language='en', \
+        RegistryVersion='1.2.10', OwningEntity='HPE', \
+        RegistryEntries={'Attributes': entries, 'Dependencies': [], 'Menus': []}))
+    tree.add(resource('/redfish/v1/Registries/%s/' % BIOS_REGISTRY, \
+        '#MessageRegistryFile.v1_0_0.MessageRegistryFile', Id=BIOS_REGISTRY, \
+        Name='BIOS Attribute Registry', Registry=BIOS_REGISTRY, Languages=['en'], \
+        Location=[{'Language': 'en', 'Uri': regpath}]))
+
+def build_iml(tree, entries):
+    """ Add the IML log service with entries to a tree
+
+    :param tree: tree to add resources to
+    :type tree: MockIloTree.
+    :param entries: number of IML entries
+    :type entries: int.
+    """
+    base = '/redfish/v1/Systems/1/LogServices/IML/'
+    severities = ['OK', 'OK', 'OK', 'Warning', 'Critical']
+    members = []
+    for index in range(1, entries + 1):
+        path = '%sEntries/%d/' % (base, index)
+        members.append(path)
+        stamp = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(1546300800 + index * 600))
+        tree.add(resource(path, '#LogEntry.v1_0_0.LogEntry', Id=str(index), \
+            Name='Integrated Management Log', Created=stamp, EntryType='Oem', \
+            OemRecordFormat='Hpe-IML', Severity=severities[index % len(severities)], \
+            Message='Mock IML event %d' % index, \
+            Oem={'Hpe': {'@odata.type': '#HpeLogEntry.v2_1_0.HpeLogEntry', \
+                 'Class': 33, 'Code': index % 64, 'Count': 1, 'Repaired': False, \
+                 'Updated': stamp}}))
+    tree.add(collection(base + 'Entries/', '#LogEntryCollection.LogEntryCollection', \
+                        members, 'IML Entries'))
+    tree.add(resource(base, '#LogService.v1_0_0.LogService', Id='IML', \
+        Name='Integrated Management Log', Entries=link(base + 'Entries/'), \
+        Actions={'#LogService.ClearLog': {'target': base + 'Actions/LogService.ClearLog/'}}))
+
+def build_iel(tree, entries):
+    """ Add the iLO event log service with entries to a tree
+
+    :param tree: tree to add resources to
+    :type tree: MockIloTree.
+    :param entries: number of IEL entries
+    :type entries: int.
+    """
+    base = '/redfish/v1/Managers/1/LogServices/IEL/'
+    members = []
+    for index in range(1, entries + 1):
+        path = '%sEntries/%d/' % (base, index)
+        members.append(path)
+        stamp = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(1546300800 + index * 300))
+        tree.add(resource(path, '#LogEntry.v1_0_0.LogEntry', Id=str(index), \
+            Name='iLO Event Log', Created=stamp, EntryType='Oem', \
+            OemRecordFormat='Hpe-iLOEventLog', Severity='OK', \
+            Message='Mock iLO event %d' % index))
+    tree.add(collection(base + 'Entries/', '#LogEntryCollection.LogEntryCollection', \
+                        members, 'iLO Event Log Entries'))
+    tree.add(resource(base, '#LogService.v1_0_0.LogService', Id='IEL', \
+        Name='iLO Event Log', Entries=link(base + 'Entries/'), \
+        Actions={'#LogService.ClearLog': {'target': base + 'Actions/LogService.ClearLog/'}}))
+
+def build_storage(tree, controllers, drives):
+    """ Add SmartStorage controllers, drives and SmartStorageConfig to a tree
+
+    :param tree: tree to add resources to
+    :type tree: MockIloTree.
+    :param controllers: number of array controllers
+    :type controllers: int.
+    :param drives: number of physical drives per controller
+    :type drives: int.
+    """
+    base = '/redfish/v1/Systems/1/SmartStorage/'
+    ctrlpaths = []
+    for ctrl in range(controllers):
+        ctrlpath = '%sArrayControllers/%d/' % (base, ctrl)
+        ctrlpaths.append(ctrlpath)
+        drivepaths = []
+        for drive in range(drives):
+            drivepath = '%sDiskDrives/%d/' % (ctrlpath, drive)
+            drivepaths.append(drivepath)
+            tree.add(resource(drivepath, '#HpeSmartStorageDiskDrive.v2_0_0.'\
+                'HpeSmartStorageDiskDrive', Id=str(drive), Name='HpeSmartStorageDiskDrive', \
+                Location='1I:1:%d' % (drive + 1), CapacityMiB=953837, \
+                InterfaceType='SAS', MediaType='HDD', Model='EG001200JWJNQ', \
+                SerialNumber='MOCK%04d%04d' % (ctrl, drive), \
+                Status={'Health': 'OK', 'State': 'Enabled'}))
+        tree.add(collection(ctrlpath + 'DiskDrives/', '#HpeSmartStorageDiskDriveCollection.'\
+            'HpeSmartStorageDiskDriveCollection', drivepaths, 'HpeSmartStorageDiskDrives'))
+        tree.add(resource(ctrlpath, '#HpeSmartStorageArrayController.v2_2_0.'\
+            'HpeSmartStorageArrayController', Id=str(ctrl), \
+            Name='HpeSmartStorageArrayController', Location='Slot %d' % (ctrl + 1), \
+            Model='HPE Smart Array P408i-a SR Gen10', \
+            Links={'PhysicalDrives': link(ctrlpath + 'DiskDrives/')}, \
+            Status={'Health': 'OK', 'State': 'Enabled'}))
+
+        tree.add(resource('/redfish/v1/systems/1/smartstorageconfig%s/' % \
+            (ctrl if ctrl else ''), '#SmartStorageConfig.v2_0_0.SmartStorageConfig', \
+            Id='smartstorageconfig', Name='SmartStorageConfig', Location='Slot %d' % (ctrl + 1), \
+            LocationFormat='PCISlot', LogicalDrives=[], DataGuard='Disabled', \
+            PhysicalDrives=[{'Location': '1I:1:%d' % (drive + 1), \
+                'LocationFormat': 'ControllerPort:Box:Bay'} for drive in range(drives)]))
+
+    tree.add(collection(base + 'ArrayControllers/', '#HpeSmartStorageArrayController'\
+        'Collection.HpeSmartStorageArrayControllerCollection', ctrlpaths, \
+        'HpeSmartStorageArrayControllers'))
+    tree.add(resource(base, '#HpeSmartStorage.v2_0_0.HpeSmartStorage', Id='SmartStorage', \
+        Name='HpeSmartStorage', Links={'ArrayControllers': link(base + 'ArrayControllers/')}))
+
+def build_accounts(tree, accounts):
+    """ Add the AccountService and user accounts to a tree
+
+    :param tree: tree to add resources to
+    :type tree: MockIloTree.
+    :param accounts: number of user accounts
+    :type accounts: int.
+    """
+    base = '/redfish/v1/AccountService/'
+    members = []
+    for index in range(1, accounts + 1):
+        path = '%sAccounts/%d/' % (base, index)
+        members.append(path)
+        name = 'admin' if index == 1 else 'user%02d' % index
+        tree.add(resource(path, '#ManagerAccount.v1_1_3.ManagerAccount', Id=str(index), \
+            Name='User Account', UserName=name, Password=None, RoleId='Administrator', \
+            Oem={'Hpe': {'@odata.type': '#HpeiLOAccount.v2_2_0.HpeiLOAccount', \
+                 'LoginName': name, 'Privileges': {'LoginPriv': True, \
+                 'RemoteConsolePriv': True, 'UserConfigPriv': index == 1, \
+                 'VirtualMediaPriv': True, 'VirtualPowerAndResetPriv': True, \
+                 'iLOConfigPriv': index == 1}}}))
+    tree.add(collection(base + 'Accounts/', '#ManagerAccountCollection.'\
+                        'ManagerAccountCollection', members, 'Accounts'))
+    tree.add(resource(base, '#AccountService.v1_3_0.AccountService', Id='AccountService', \
+        Name='Account Service', MinPasswordLength=8, AuthFailureLoggingThreshold=3, \
+        Accounts=link(base + 'Accounts/'), Oem={'Hpe': {'@odata.type': \
+            '#HpeiLOAccountService.v2_3_0.HpeiLOAccountService', 'AuthFailureDelayTimeSeconds': 10, \
+            'MinPasswordLength': 8}}))
+
+def build_nics(tree, nics):
+    """ Add system ethernet interfaces to a tree
+
+    :param tree: tree to add resources to
+    :type tree: MockIloTree.
+    :param nics: number of network interfaces
+    :type nics: int.
+    """
+    base = '/redfish/v1/Systems/1/EthernetInterfaces/'
+    members = []
+    for index in range(1, nics + 1):
+        path = '%s%d/' % (base, index)
+        members.append(path)
+        tree.add(resource(path, '#EthernetInterface.v1_0_3.EthernetInterface', Id=str(index), \
+            Name='System Ethernet Interface', MACAddress='94:18:82:%02x:%02x:%02x' % \
+            (index // 65536 % 256, index // 256 % 256, index % 256), SpeedMbps=10000, \
+            Status={'Health': 'OK', 'State': 'Enabled'}))
+    tree.add(collection(base, '#EthernetInterfaceCollection.EthernetInterfaceCollection', \
+                        members, 'System Ethernet Interfaces'))
+
+def build_updateservice(tree, components):
+    """ Add the UpdateService, component repository and task queue to a tree
+
+    :param tree: tree to add resources to
+    :type tree: MockIloTree.
+    :param components: number of components in the repository
+    :type components: int.
+    """
+    base = '/redfish/v1/UpdateService/'
+    members = []
+    for index in range(1, components + 1):
+        path = '%sComponentRepository/%d/' % (base, index)
+        members.append(path)
+        tree.add(resource(path, '#HpeComponent.v1_1_0.HpeComponent', Id=str(index), \
+            Name='Mock Component %d' % index, Filename='cp%06d.exe' % index, \
+            Version='1.%d' % index, Locked=False, SizeBytes=1048576, \
+            ComponentUri='/fwrepo/cp%06d.exe' % index, Filepath='cp%06d.exe' % index, \
+            Created='2019-01-01T00:00:00Z', Updated='2019-01-01T00:00:00Z', \
+            Activates='AfterReboot', Criticality='Recommended'))
+    tree.add(collection(base + 'ComponentRepository/', '#HpeComponentCollection.'\
+                        'HpeComponentCollection', members, 'Component Repository'))
+    tree.add(collection(base + 'UpdateTaskQueue/', '#HpeComponentUpdateTaskQueue'\
+            'Collection.HpeComponentUpdateTaskQueueCollection', [], 'Update Task Queue'))
+    tree.add(collection(base + 'InstallSets/', '#HpeComponentInstallSetCollection.'\
+                        'HpeComponentInstallSetCollection', [], 'Install Sets'))
+    tree.add(collection(base + 'FirmwareInventory/', '#SoftwareInventoryCollection.'\
+                        'SoftwareInventoryCollection', [], 'Firmware Inventory'))
+    tree.add(resource(base, '#UpdateService.v1_1_1.UpdateService', Id='UpdateService', \
+        Name='Update Service', ServiceEnabled=True, HttpPushUri='/cgi-bin/uploadFile', \
+        FirmwareInventory=link(base + 'FirmwareInventory/'), \
+        Actions={'#UpdateService.SimpleUpdate': \
+                 {'target': base + 'Actions/UpdateService.SimpleUpdate/'}}, \
+        Oem={'Hpe': {'@odata.type': '#HpeiLOUpdateServiceExt.v2_1_0.'\
+             'HpeiLOUpdateServiceExt', 'State': 'Idle', 'Result': {'MessageId': \
+             'Base.1.4.Success'}, 'PushUpdateUri': '/cgi-bin/uploadFile', \
+             'ComponentRepository': link(base + 'ComponentRepository/'), \
+             'UpdateTaskQueue': link(base + 'UpdateTaskQueue/'), \
+             'InstallSets': link(base + 'InstallSets/'), \
+             'Capabilities': {'UpdateFWPKG': True}}}))
+
+#Properties iLO allows clients to change, everything else is served read only
+WRITABLE_PROPERTIES = set(['AssetTag', 'IndicatorLED', 'HostName', 'Boot', \
+    'BootSourceOverrideEnabled', 'BootSourceOverrideTarget', 'Attributes', 'UserName', \
+    'Password', 'RoleId', 'LoginName', 'Privileges', 'LoginPriv', 'RemoteConsolePriv', \
+    'UserConfigPriv', 'VirtualMediaPriv', 'VirtualPowerAndResetPriv', 'iLOConfigPriv', \
+    'MinPasswordLength', 'AuthFailureLoggingThreshold', 'AuthFailureDelayTimeSeconds', \
+    'SessionTimeout', 'FQDN', 'HTTPS', 'SSH', 'Port', 'ProtocolEnabled', 'Oem', 'Hpe', \
+    'LogicalDrives', 'DataGuard', 'IPv4Addresses'])
+
+def schema_properties(bodies):
+    """ Derive JSON schema properties from example resource bodies
+
+    :param bodies: resource bodies sharing one type
+    :type bodies: list.
+    :returns: returns a properties dictionary
+    """
+    props = OrderedDict()
+    for body in bodies:
+        for key, val in body.items():
+            if key.startswith('@') or key in props:
+                continue
+            prop = {'readonly': key not in WRITABLE_PROPERTIES}
+            if isinstance(val, bool):
+                prop['type'] = 'boolean'
+            elif isinstance(val, int):
+                prop['type'] = 'integer'
+            elif isinstance(val, float):
+                prop['type'] = 'number'
+            elif isinstance(val, dict):
+                prop['type'] = 'object'
+                prop['properties'] = schema_properties([val])
+            elif isinstance(val, list):
+                prop['type'] = 'array'
+            else:
+                prop['type'] = ['string', 'null']
+            props[key] = prop
+    return props
+
+def build_schemas(tree):
+    """ Add the JsonSchemas collection and a schema file for every type in a tree
+
+    :param tree: tree to add resources to
+    :type tree: MockIloTree.
+    """
+    types = OrderedDict()
+    for body in tree.resources.values():
+        types.setdefault(body['@odata.type'].lstrip('#'), []).append(body)
+
+    members = []
+    for name in sorted(types):
+        shortname = name.split('.')[0]
+        filepath = '/redfish/v1/SchemaStore/en/%s.json/' % shortname
+        tree.add(OrderedDict([('@odata.id', filepath), ('$schema', \
+            'http://json-schema.org/draft-04/schema#'), ('title', '#' + name), \
+            ('type', 'object'), ('properties', schema_properties(types[name]))]))
+        path = '/redfish/v1/JsonSchemas/%s/' % shortname
+        members.append(path)
+        tree.add(resource(path, '#JsonSchemaFile.v1_0_4.JsonSchemaFile', Id=shortname, \
+            Name='%s Schema File' % shortname, Schema='#' + name, Languages=['en'], \
+            Location=[{'Language': 'en', 'Uri': filepath}]))
+    tree.add(collection('/redfish/v1/JsonSchemas/', '#JsonSchemaFileCollection.'\
+                        'JsonSchemaFileCollection', members, 'JSON Schemas'))
+
+def build_resourcedirectory(tree):
+    """ Add the iLO resource directory listing every typed resource except
+    schemas, registries and log entries
+
+    :param tree: tree to add resources to
+    :type tree: MockIloTree.
+    """
+    instances = []
+    for path, body in tree.resources.items():
+        if any(path.startswith(store) for store in ('/redfish/v1/jsonschemas/', \
+                    '/redfish/v1/schemastore/', '/redfish/v1/registries/', \
+                    '/redfish/v1/registrystore/')) or \
+                    body['@odata.type'].startswith('#LogEntry.'):
+            continue
+        instances.append({'@odata.id': body['@odata.id'], '@odata.type': \
+            body['@odata.type'], 'ETag': tree.etag(body['@odata.id']), \
+            'HttpMethods': ['GET', 'HEAD', 'PATCH', 'POST']})
+    tree.add(resource('/redfish/v1/ResourceDirectory/', '#HpeiLOResourceDirectory.'\
+        'v2_0_0.HpeiLOResourceDirectory', Id='ResourceDirectory', \
+        Name='iLO Resource Directory', Instances=instances))
+
+def build_ilo5_tree(bios_attributes=120, iml_entries=50, iel_entries=20, controllers=1, \
+                    drives=4, accounts=3, nics=4, components=3):
+    """ Build a realistic iLO 5 Redfish tree
+
+    :param bios_attributes: number of BIOS attributes
+    :type bios_attributes: int.
+    :param iml_entries: number of IML entries
+    :type iml_entries: int.
+    :param iel_entries: number of iLO event log entries
+    :type iel_entries: int.
+    :param controllers: number of SmartStorage array controllers
+    :type controllers: int.
+    :param drives: number of physical drives per controller
+    :type drives: int.
+    :param accounts: number of iLO user accounts
+    :type accounts: int.
+    :param nics: number of system network interfaces
+    :type nics: int.
+    :param components: number of components in the iLO repository
+    :type components: int.
+    :returns: returns a MockIloTree
+    """
+    tree = MockIloTree()
+
+    tree.add(resource(ROOT, '#ServiceRoot.v1_5_1.ServiceRoot', Id='RootService', \
+        Name='HPE RESTful Root Service', RedfishVersion='1.6.0', \
+        UUID='00000000-0000-4d4f-434b-494c4f350000', \
+        Systems=link('/redfish/v1/Systems/'), Managers=link('/redfish/v1/Managers/'), \
+        Chassis=link('/redfish/v1/Chassis/'), AccountService=link('/redfish/v1/AccountService/'), \
+        SessionService=link('/redfish/v1/SessionService/'), \
+        UpdateService=link('/redfish/v1/UpdateService/'), \
+        JsonSchemas=link('/redfish/v1/JsonSchemas/'), Registries=link('/redfish/v1/Registries/'), \
+        Links={'Sessions': link(SESSIONS)}, \
+        Oem=OrderedDict([('Hpe', {'@odata.type': '#HpeiLOServiceExt.v2_0_0.HpeiLOServiceExt', \
+            'Links': {'ResourceDirectory': link('/redfish/v1/ResourceDirectory/')}, \
+            'Manager': [{'ManagerType': 'iLO 5', 'ManagerFirmwareVersion': '1.40', \
+                         'FQDN': 'mockilo.local', 'HostName': 'mockilo'}], \
+            'Sessions': {'LoginFailureDelay': 0, 'SecurityOverride': False}})])))
+
+    tree.add(resource('/redfish/v1/SessionService/', '#SessionService.v1_0_0.SessionService', \
+        Id='SessionService', Name='Session Service', ServiceEnabled=True, \
+        SessionTimeout=30, Sessions=link(SESSIONS)))
+    tree.add(collection(SESSIONS, '#SessionCollection.SessionCollection', [], 'Sessions'))
+
+    tree.add(collection('/redfish/v1/Systems/', '#ComputerSystemCollection.'\
+                        'ComputerSystemCollection', ['/redfish/v1/Systems/1/'], 'Systems'))
+    tree.add(resource('/redfish/v1/Systems/1/', '#ComputerSystem.v1_4_0.ComputerSystem', \
+        Id='1', Name='Computer System', Model='ProLiant DL380 Gen10', \
+        Manufacturer='HPE', SerialNumber='MOCK000001', SKU='868703-B21', \
+        HostName='mockhost', PowerState='On', IndicatorLED='Off', AssetTag='', \
+        BiosVersion='U30 v2.00 (02/02/2019)', UUID='00000000-0000-4d4f-434b-535953000001', \
+        Bios=link('/redfish/v1/systems/1/bios/'), \
+        LogServices=link('/redfish/v1/Systems/1/LogServices/'), \
+        EthernetInterfaces=link('/redfish/v1/Systems/1/EthernetInterfaces/'), \
+        Boot={'BootSourceOverrideEnabled': 'Disabled', 'BootSourceOverrideTarget': 'None', \
+              'BootSourceOverrideTarget@Redfish.AllowableValues': ['None', 'Pxe', 'Hdd']}, \
+        MemorySummary={'TotalSystemMemoryGiB': 256}, \
+        ProcessorSummary={'Count': 2, 'Model': 'Intel(R) Xeon(R) Gold 6130 CPU @ 2.10GHz'}, \
+        Status={'Health': 'OK', 'State': 'Enabled'}, \
+        Actions={'#ComputerSystem.Reset': {'ResetType@Redfish.AllowableValues': ['On', \
+            'ForceOff', 'GracefulShutdown', 'ForceRestart', 'Nmi', 'PushPowerButton'], \
+            'target': '/redfish/v1/Systems/1/Actions/ComputerSystem.Reset/'}}, \
+        Oem={'Hpe': {'@odata.type': '#HpeComputerSystemExt.v2_4_1.HpeComputerSystemExt', \
+            'Links': {'SmartStorage': link('/redfish/v1/Systems/1/SmartStorage/')}, \
+            'PostState': 'FinishedPost'}}))
+    build_bios(tree, bios_attributes)
+    build_iml(tree, iml_entries)
+    tree.add(collection('/redfish/v1/Systems/1/LogServices/', '#LogServiceCollection.'\
+        'LogServiceCollection', ['/redfish/v1/Systems/1/LogServices/IML/'], 'Log Services'))
+    build_storage(tree, controllers, drives)
+    build_nics(tree, nics)
+
+    tree.add(collection('/redfish/v1/Managers/', '#ManagerCollection.ManagerCollection', \
+                        ['/redfish/v1/Managers/1/'], 'Managers'))
+    tree.add(resource('/redfish/v1/Managers/1/', '#Manager.v1_5_1.Manager', Id='1', \
+        Name='Manager', ManagerType='BMC', FirmwareVersion='iLO 5 v1.40', \
+        UUID='00000000-0000-4d4f-434b-4d4752000001', \
+        LogServices=link('/redfish/v1/Managers/1/LogServices/'), \
+        EthernetInterfaces=link('/redfish/v1/Managers/1/EthernetInterfaces/'), \
+        NetworkProtocol=link('/redfish/v1/Managers/1/NetworkProtocol/'), \
+        Status={'Health': 'OK', 'State': 'Enabled'}, \
+        Actions={'#Manager.Reset': {'target': '/redfish/v1/Managers/1/Actions/Manager.Reset/'}}, \
+        Oem={'Hpe': {'@odata.type': '#HpeiLO.v2_3_0.HpeiLO', 'Firmware': {'Current': \
+            {'VersionString': 'iLO 5 v1.40'}}, 'License': {'LicenseString': \
+            'iLO Advanced', 'LicenseType': 'Perpetual'}}}))
+    tree.add(resource('/redfish/v1/Managers/1/NetworkProtocol/', '#ManagerNetworkProtocol.'\
+        'v1_0_0.ManagerNetworkProtocol', Id='NetworkProtocol', Name='Manager Network Protocol', \
+        HostName='mockilo', FQDN='mockilo.local', HTTPS={'Port': 443, 'ProtocolEnabled': True}, \
+        SSH={'Port': 22, 'ProtocolEnabled': True}))
+    tree.add(collection('/redfish/v1/Managers/1/EthernetInterfaces/', \
+        '#EthernetInterfaceCollection.EthernetInterfaceCollection', \
+        ['/redfish/v1/Managers/1/EthernetInterfaces/1/'], 'Manager Network Interfaces'))
+    tree.add(resource('/redfish/v1/Managers/1/EthernetInterfaces/1/', \
+        '#EthernetInterface.v1_0_3.EthernetInterface', Id='1', Name='Manager Dedicated '\
+        'Network Interface', MACAddress='94:18:82:00:00:01', HostName='mockilo', \
+        IPv4Addresses=[{'Address': '127.0.0.1', 'AddressOrigin': 'Static', \
+                        'SubnetMask': '255.0.0.0'}]))
+    build_iel(tree, iel_entries)
+    tree.add(collection('/redfish/v1/Managers/1/LogServices/', '#LogServiceCollection.'\
+        'LogServiceCollection', ['/redfish/v1/Managers/1/LogServices/IEL/'], 'Log Services'))
+
+    tree.add(collection('/redfish/v1/Chassis/', '#ChassisCollection.ChassisCollection', \
+                        ['/redfish/v1/Chassis/1/'], 'Chassis'))
+    tree.add(resource('/redfish/v1/Chassis/1/', '#Chassis.v1_6_0.Chassis', Id='1', \
+        Name='Computer System Chassis', ChassisType='RackMount', SerialNumber='MOCK000001', \
+        Power=link('/redfish/v1/Chassis/1/Power/'), Thermal=link('/redfish/v1/Chassis/1/Thermal/')))
+    tree.add(resource('/redfish/v1/Chassis/1/Power/', '#Power.v1_3_0.Power', Id='Power', \
+        Name='PowerMetrics', PowerControl=[{'PowerConsumedWatts': 180, \
+                                            'PowerCapacityWatts': 1600}]))
+    tree.add(resource('/redfish/v1/Chassis/1/Thermal/', '#Thermal.v1_1_0.Thermal', \
+        Id='Thermal', Name='Thermal', Fans=[{'Name': 'Fan %d' % fan, 'Reading': 20, \
+        'Status': {'Health': 'OK'}} for fan in range(1, 7)], Temperatures=[{'Name': \
+        '01-Inlet Ambient', 'ReadingCelsius': 21, 'Status': {'Health': 'OK'}}]))
+
+    build_accounts(tree, accounts)
+    build_updateservice(tree, components)
+
+    tree.add(collection('/redfish/v1/Registries/', '#MessageRegistryFileCollection.'\
+        'MessageRegistryFileCollection', ['/redfish/v1/Registries/%s/' % BIOS_REGISTRY], \
+        'Registries'))
+    build_schemas(tree)
+    build_resourcedirectory(tree)
+
+    return tree
+
+def merge_dicts(target, source):
+    """ Recursively merge source into target the way PATCH does
+
+    :param target: dictionary updated in place
+    :type target: dict.
+    :param source: changes to apply
+    :type source: dict.
+    """
+    for key, val in source.items():
+        if isinstance(val, dict) and isinstance(target.get(key), dict):
+            merge_dicts(target[key], val)
+        else:
+            target[key] = val
+
+#Comparison of a $filter expression, such as Severity eq 'Critical'
+FILTER_TERM = re.compile(r"^\s*([\w@.#/]+)\s+eq\s+('(?:[^']|'')*'|true|false|-?\d+)\s*$")
+
+def filter_members(tree, members, expr):
+    """ Members of a collection matching a $filter of eq comparisons joined by and
+
+    :param tree: tree holding the members
+    :type tree: MockIloTree.
+    :param members: member links of the collection
+    :type members: list.
+    :param expr: $filter expression
+    :type expr: str.
+    :returns: returns the matching member links, None if expr is not supported
+    """
+    terms = []
+    for term in expr.split(' and '):
+        match = FILTER_TERM.match(term)
+        if not match:
+            return None
+        literal = match.group(2)
+        if literal.startswith("'"):
+            value = literal[1:-1].replace("''", "'")
+        elif literal in ('true', 'false'):
+            value = literal == 'true'
+        else:
+            value = int(literal)
+        terms.append((match.group(1).split('/'), value))
+
+    result = []
+    for member in members:
+        body = tree.get(member['@odata.id']) or member
+        for keys, value in terms:
+            current = body
+            for key in keys:
+                current = current.get(key) if isinstance(current, dict) else None
+            if current != value:
+                break
+        else:
+            result.append(member)
+    return result
+
+class MockIloTree(object):
+    """ Case insensitive store of Redfish resources keyed by path """
+    def __init__(self, resources=None):
+        self.resources = OrderedDict()
+        self._lock = threading.RLock()
+        for body in (resources or []):
+            self.add(body)
+
+    def add(self, body):
+        """ Add or replace a resource
+
+        :param body: resource body including @odata.id
+        :type body: dict.
+        """
+        with self._lock:
+            self.resources[normpath(body['@odata.id'])] = body
+
+    def get(self, path):
+        """ Return the resource at path or None """
+        return self.resources.get(normpath(path))
+
+    def remove(self, path):
+        """ Remove the resource at path and its collection membership """
+        with self._lock:
+            body = self.resources.pop(normpath(path), None)
+            if body is None:
+                return False
+            parent = self.get(path.rstrip('/').rsplit('/', 1)[0] + '/')
+            if parent and 'Members' in parent:
+                parent['Members'] = [mem for mem in parent['Members'] if \
+                                normpath(mem['@odata.id']) != normpath(path)]
+                parent['Members@odata.count'] = len(parent['Members'])
+            return True
+
+    def etag(self, path):
+        """ Weak ETag computed from the resource content """
+        body = self.get(path)
+        digest = hashlib.md5(json.dumps(body, sort_keys=True).encode('utf-8')).hexdigest()
+        return 'W/"%s"' % digest[:8].upper()
+
+    def merge(self, path, patch):
+        """ Merge a PATCH body into the resource at path
+
+        :param path: resource path
+        :type path: str.
+        :param patch: PATCH body
+        :type patch: dict.
+        """
+        with self._lock:
+            merge_dicts(self.get(path), patch)
+
+    def add_member(self, path, body):
+        """ Add a new member to the collection at path. Properties missing
+        from body are defaulted from the first existing member.
+
+        :param path: collection path
+        :type path: str.
+        :param body: new member body
+        :type body: dict.
+        :returns: returns the new member path
+        """
+        with self._lock:
+            coll = self.get(path)
+            memberid = len(coll['Members']) + 1
+            while self.get(coll['@odata.id'] + str(memberid) + '/'):
+                memberid += 1
+            mempath = '%s/%d/' % (coll['@odata.id'].rstrip('/'), memberid)
+
+            if coll['Members']:
+                member = copy.deepcopy(self.get(coll['Members'][0]['@odata.id']))
+            else:
+                name = coll['@odata.type'].split('.')[-1].replace('Collection', '')
+                member = resource(mempath, '#%s.v1_0_0.%s' % (name, name))
+            merge_dicts(member, body)
+            member['@odata.id'] = mempath
+            member['Id'] = str(memberid)
+            if 'Password' in member:
+                member['Password'] = None
+
+            self.add(member)
+            coll['Members'].append(link(mempath))
+            coll['Members@odata.count'] = len(coll['Members'])
+            return mempath
+
+    def save(self, filename):
+        """ Write the tree to a JSON file """
+        with open(filename, 'w') as outfile:
+            json.dump(list(self.resources.values()), outfile, indent=1)
+
+    @classmethod
+    def load(cls, filename):
+        """ Read a tree written by save """
+        with open(filename) as infile:
+            return cls(json.load(infile, object_pairs_hook=OrderedDict))
+
+class MockIloHTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """ Threaded HTTP server carrying a reference to its MockIloServer """
+    daemon_threads = True
+    allow_reuse_address = True
+
+class MockIloRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """ Request handler implementing the Redfish behaviour of iLO 5 """
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        """ Silence the per request logging of BaseHTTPRequestHandler """
+        if self.server.mock.verbose:
+            BaseHTTPServer.BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def do_GET(self):
+        """ GET handler """
+        self.server.mock.handle(self, 'GET')
+
+    def do_HEAD(self):
+        """ HEAD handler """
+        self.server.mock.handle(self, 'HEAD')
+
+    def do_POST(self):
+        """ POST handler """
+        self.server.mock.handle(self, 'POST')
+
+    def do_PATCH(self):
+        """ PATCH handler """
+        self.server.mock.handle(self, 'PATCH')
+
+    def do_PUT(self):
+        """ PUT handler """
+        self.server.mock.handle(self, 'PUT')
+
+    def do_DELETE(self):
+        """ DELETE handler """
+        self.server.mock.handle(self, 'DELETE')
+
+class MockIloServer(object):
+    """ Mock iLO 5 Redfish server with configurable latency, payload sizes
+    and error injection """
+    def __init__(self, tree=None, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, \
+                 padding=0, error_rate=0.0, session_timeout=None, expire_every=None, \
+                 username='admin', password='password', seed=None, verbose=False, \
+                 filter_query=False):
+        """ Constructor
+
+        :param tree: resources to serve, a default iLO 5 tree if not given
+        :type tree: MockIloTree.
+        :param host: address to bind to
+        :type host: str.
+        :param port: port to bind to, 0 for any free port
+        :type port: int.
+        :param latency: seconds added to every response
+        :type latency: float.
+        :param jitter: maximum random seconds added on top of latency
+        :type jitter: float.
+        :param padding: bytes of filler added to every non root resource
+        :type padding: int.
+        :param error_rate: fraction of requests answered with a 503
+        :type error_rate: float.
+        :param session_timeout: idle seconds after which a session expires
+        :type session_timeout: float.
+        :param expire_every: expire all sessions every N requests
+        :type expire_every: int.
+        :param username: accepted user name
+        :type username: str.
+        :param password: accepted password
+        :type password: str.
+        :param seed: random seed for reproducible error injection
+        :type seed: int.
+        :param verbose: log every request to stderr
+        :type verbose: bool.
+        :param filter_query: advertise and evaluate $filter on collections
+        :type filter_query: bool.
+        """
+        self.tree = tree if tree is not None else build_ilo5_tree()
+        self.latency = latency
+        self.jitter = jitter
+        self.padding = padding
+        self.error_rate = error_rate
+        self.session_timeout = session_timeout
+        self.expire_every = expire_every
+        self.credentials = (username, password)
+        self.verbose = verbose
+        self.filter_query = filter_query
+        self.random = random.Random(seed)
+        self.sessions = dict()
+        self.failnext = 0
+        self.stats = dict()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.reset_stats()
+
+        if filter_query and self.tree.get(ROOT) is not None:
+            self.tree.get(ROOT)['ProtocolFeaturesSupported'] = {'FilterQuery': True}
+
+        self.httpd = MockIloHTTPServer((host, port), MockIloRequestHandler)
+        self.httpd.mock = self
+
+    @property
+    def url(self):
+        """ Base url of the running server """
+        host, port = self.httpd.server_address[:2]
+        return 'http://%s:%d' % (host, port)
+
+    def reset_stats(self):
+        """ Reset the request counters """
+        with self._lock:
+            self.stats = {'requests': 0, 'bytes_sent': 0, 'bytes_received': 0, \
+                          'errors_injected': 0, 'methods': dict()}
+
+    def start(self):
+        """ Serve requests on a background thread """
+        self._thread = threading.Thread(target=self.httpd.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """ Stop serving and close the socket """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def expire_sessions(self):
+        """ Invalidate every open session """
+        with self._lock:
+            for token in list(self.sessions):
+                self._drop_session(token)
+
+    def _drop_session(self, token):
+        """ Forget a session token and remove its session resource """
+        if self.sessions.pop(token, None) is not None:
+            self.tree.remove(SESSIONS + token[:16] + '/')
+
+    def fail_next(self, count=1):
+        """ Answer the next count requests with a 503 """
+        with self._lock:
+            self.failnext += count
+
+    def _authorized(self, handler):
+        """ Check the session token or basic credentials of a request """
+        token = handler.headers.get('X-Auth-Token')
+        if token:
+            with self._lock:
+                lastused = self.sessions.get(token)
+                if lastused is None:
+                    return False
+                if self.session_timeout and time.time() - lastused > self.session_timeout:
+                    self._drop_session(token)
+                    return False
+                self.sessions[token] = time.time()
+            return True
+
+        auth = handler.headers.get('Authorization', '')
+        if auth.startswith('Basic '):
+            try:
+                user, password = base64.b64decode(auth[6:].encode('ascii')).\
+                                        decode('utf-8').split(':', 1)
+            except (ValueError, TypeError):
+                return False
+            return (user, password) == self.credentials
+        return False
+
+    def _inject_error(self):
+        """ Decide if the current request should fail with a 503 """
+        with self._lock:
+            if self.failnext:
+                self.failnext -= 1
+                return True
+            return self.error_rate and self.random.random() < self.error_rate
+
+    def _render(self, path, body, query):
+        """ Serialize a resource, expanding collections and padding as needed """
+        if '$expand' in query and 'Members' in body:
+            body = copy.copy(body)
+            body['Members'] = [self.tree.get(mem['@odata.id']) or mem \
+                               for mem in body['Members']]
+        if self.padding and normpath(path) != ROOT:
+            body = copy.copy(body)
+            body['Oem'] = dict(body.get('Oem', {}), Mock={'Padding': 'x' * self.padding})
+        return json.dumps(body)
+
+    def handle(self, handler, method):
+        """ Dispatch a request to the method handlers
+
+        :param handler: request handler of the current connection
+        :type handler: MockIloRequestHandler.
+        :param method: HTTP method of the request
+        :type method: str.
+        """
+        length = int(handler.headers.get('Content-Length') or 0)
+        data = handler.rfile.read(length) if length else b''
+        parsed = urlparse(handler.path)
+        path = parsed.path
+        query = parse_qs(parsed.query, keep_blank_values=True)
+
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['bytes_received'] += length
+            self.stats['methods'][method] = self.stats['methods'].get(method, 0) + 1
+            expire = self.expire_every and self.stats['requests'] % self.expire_every == 0
+        if expire:
+            self.expire_sessions()
+
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        if self._inject_error():
+            with self._lock:
+                self.stats['errors_injected'] += 1
+            return self._respond(handler, 503, extended_info('Base.1.4.'\
+                    'ServiceTemporarilyUnavailable', 503), {'Retry-After': '1'})
+
+        public = normpath(path) == ROOT or (method == 'POST' and normpath(path) == \
+                                            normpath(SESSIONS))
+        if not public and not self._authorized(handler):
+            return self._respond(handler, 401, extended_info('Base.1.4.NoValidSession', 401))
+
+        try:
+            body = json.loads(data.decode('utf-8')) if data and handler.headers.get(\
+                'Content-Type', '').startswith('application/json') else None
+        except ValueError:
+            return self._respond(handler, 400, extended_info('Base.1.4.'\
+                                                        'MalformedJSON', 400))
+
+        return getattr(self, '_do_' + method.lower())(handler, path, query, body, data)
+
+    def _do_get(self, handler, path, query, body, data, headonly=False):
+        """ GET and HEAD implementation """
+        resp = self.tree.get(path)
+        if resp is None:
+            return self._respond(handler, 404, extended_info('Base.1.4.'\
+                                        'ResourceMissingAtURI', 404), headonly=headonly)
+        etag = self.tree.etag(path)
+        if self.filter_query and '$filter' in query and 'Members' in resp:
+            members = filter_members(self.tree, resp['Members'], query['$filter'][0])
+            if members is None:
+                return self._respond(handler, 400, extended_info('Base.1.4.'\
+                                        'QueryNotSupported', 400), headonly=headonly)
+            resp = copy.copy(resp)
+            resp['Members'] = members
+            resp['Members@odata.count'] = len(members)
+            return self._respond(handler, 200, self._render(path, resp, query), \
+                                                                    headonly=headonly)
+        if handler.headers.get('If-None-Match') == etag:
+            return self._respond(handler, 304, None, {'ETag': etag})
+        return self._respond(handler, 200, self._render(path, resp, query), \
+                             {'ETag': etag}, headonly=headonly)
+
+    def _do_head(self, handler, path, query, body, data):
+        """ HEAD implementation """
+        return self._do_get(handler, path, query, body, data, headonly=True)
+
+    def _do_patch(self, handler, path, query, body, data):
+        """ PATCH implementation, BIOS changes land in the pending settings """
+        if self.tree.get(path) is None:
+            return self._respond(handler, 404, extended_info('Base.1.4.'\
+                                                    'ResourceMissingAtURI', 404))
+        if not isinstance(body, dict):
+            return self._respond(handler, 400, extended_info('Base.1.4.'\
+                                                        'MalformedJSON', 400))
+        if normpath(path) == '/redfish/v1/systems/1/bios/':
+            path = '/redfish/v1/systems/1/bios/settings/'
+        self.tree.merge(path, body)
+        return self._respond(handler, 200, extended_info('iLO.2.8.SystemResetRequired' \
+                            if 'bios' in normpath(path) else 'Base.1.4.Success'))
+
+    def _do_put(self, handler, path, query, body, data):
+        """ PUT implementation """
+        current = self.tree.get(path)
+        if current is None:
+            return self._respond(handler, 404, extended_info('Base.1.4.'\
+                                                    'ResourceMissingAtURI', 404))
+        body = OrderedDict(body or {})
+        body['@odata.id'] = current['@odata.id']
+        if '@odata.type' in current:
+            body.setdefault('@odata.type', current['@odata.type'])
+        self.tree.add(body)
+        return self._respond(handler, 200, extended_info())
+
+    def _do_post(self, handler, path, query, body, data):
+        """ POST implementation for sessions, actions, uploads and collections """
+        if normpath(path) == normpath(SESSIONS):
+            body = body or {}
+            if (body.get('UserName'), body.get('Password')) != self.credentials:
+                return self._respond(handler, 401, extended_info('Base.1.4.'\
+                                                            'NoValidSession', 401))
+            token = uuid.uuid4().hex
+            location = '%s%s/' % (SESSIONS, token[:16])
+            stamp = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            session = resource(location, '#Session.v1_0_0.Session', Id=token[:16], \
+                Name='User Session', UserName=body['UserName'], Oem={'Hpe': \
+                {'@odata.type': '#HpeiLOSession.v2_0_0.HpeiLOSession', 'AccessTime': \
+                stamp, 'LoginTime': stamp, 'MySession': True, 'UserAccount': \
+                body['UserName'], 'UserIP': handler.client_address[0], 'UserTag': 'REST', \
+                'UserType': 'Local', 'Privileges': {'LoginPriv': True, \
+                'RemoteConsolePriv': True, 'UserConfigPriv': True, 'VirtualMediaPriv': \
+                True, 'VirtualPowerAndResetPriv': True, 'iLOConfigPriv': True, \
+                'HostBIOSConfigPriv': True, 'HostNICConfigPriv': True, \
+                'HostStorageConfigPriv': True, 'SystemRecoveryConfigPriv': True}}})
+            self.tree.add(session)
+            sessions = self.tree.get(SESSIONS)
+            sessions['Members'].append(link(location))
+            sessions['Members@odata.count'] = len(sessions['Members'])
+            with self._lock:
+                self.sessions[token] = time.time()
+            return self._respond(handler, 201, session, {'X-Auth-Token': token, \
+                                                         'Location': self.url + location})
+
+        if '/actions/' in normpath(path):
+            return self._respond(handler, 200, extended_info())
+
+        if normpath(path) == '/cgi-bin/uploadfile/':
+            self.tree.merge('/redfish/v1/UpdateService/', {'Oem': {'Hpe': \
+                                                            {'State': 'Complete'}}})
+            return self._respond(handler, 200, extended_info())
+
+        coll = self.tree.get(path)
+        if coll is None or 'Members' not in coll:
+            return self._respond(handler, 405, extended_info('Base.1.4.'\
+                                                'ActionNotSupported', 405))
+        mempath = self.tree.add_member(path, body or {})
+        return self._respond(handler, 201, extended_info(), {'Location': self.url + mempath})
+
+    def _do_delete(self, handler, path, query, body, data):
+        """ DELETE implementation for sessions and collection members """
+        if normpath(path).startswith(normpath(SESSIONS)):
+            with self._lock:
+                self._drop_session(handler.headers.get('X-Auth-Token'))
+            return self._respond(handler, 200, extended_info())
+        if not self.tree.remove(path):
+            return self._respond(handler, 404, extended_info('Base.1.4.'\
+                                                    'ResourceMissingAtURI', 404))
+        return self._respond(handler, 200, extended_info())
+
+    def _respond(self, handler, status, body, headers=None, headonly=False):
+        """ Write a JSON response
+
+        :param handler: request handler of the current connection
+        :type handler: MockIloRequestHandler.
+        :param status: HTTP status code
+        :type status: int.
+        :param body: response body, dict or already serialized string
+        :type body: dict or str.
+        :param headers: additional response headers
+        :type headers: dict.
+        :param headonly: skip writing the body
+        :type headonly: bool.
+        """
+        payload = b''
+        if body is not None:
+            payload = (body if isinstance(body, str) else json.dumps(body)).encode('utf-8')
+
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json; charset=utf-8')
+        handler.send_header('Content-Length', str(len(payload)))
+        handler.send_header('OData-Version', '4.0')
+        handler.send_header('Allow', 'GET, HEAD, POST, PATCH, PUT, DELETE')
+        for key, val in (headers or {}).items():
+            handler.send_header(key, val)
+        handler.end_headers()
+
+        if not headonly and payload:
+            handler.wfile.write(payload)
+            with self._lock:
+                self.stats['bytes_sent'] += len(payload)
+
+def main(argv=None):
+    """ Command line entry point """
+    parser = argparse.ArgumentParser(description='Mock iLO 5 Redfish server.')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to bind to.')
+    parser.add_argument('--port', type=int, default=8000, help='Port to bind to.')
+    parser.add_argument('--tree', default=None, help='JSON tree file to serve instead '\
+                        'of the built in iLO 5 tree.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to '\
+                        'every response.')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Maximum random '\
+                        'seconds added on top of latency.')
+    parser.add_argument('--padding', type=int, default=0, help='Bytes of filler added '\
+                        'to every resource.')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of '\
+                        'requests answered with a 503.')
+    parser.add_argument('--session-timeout', type=float, default=None, help='Idle '\
+                        'seconds after which sessions expire.')
+    parser.add_argument('--expire-every', type=int, default=None, help='Expire all '\
+                        'sessions every N requests.')
+    parser.add_argument('--username', default='admin', help='Accepted user name.')
+    parser.add_argument('--password', default='password', help='Accepted password.')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed.')
+    parser.add_argument('--verbose', action='store_true', help='Log every request.')
+    parser.add_argument('--filter-query', action='store_true', help='Advertise and '\
+                        'evaluate $filter on collections.')
+    args = parser.parse_args(argv)
+
+    tree = MockIloTree.load(args.tree) if args.tree else None
+    server = MockIloServer(tree=tree, host=args.host, port=args.port, \
+                latency=args.latency, jitter=args.jitter, padding=args.padding, \
+                error_rate=args.error_rate, session_timeout=args.session_timeout, \
+                expire_every=args.expire_every, username=args.username, \
+                password=args.password, seed=args.seed, verbose=args.verbose, \
+                filter_query=args.filter_query)
+
+    sys.stdout.write("Mock iLO serving %d resources at %s\n" % \
+                     (len(server.tree.resources), server.url))
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == '__main__':
+    main()
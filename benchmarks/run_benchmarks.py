@@ -0,0 +1,279 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""End to end benchmarks of RDMC commands against the mock iLO
+
+Every scenario runs real rdmc.py processes against a local MockIloServer
+and records wall time, request count, bytes transferred and peak RSS.
+
+    python run_benchmarks.py --save-baseline baseline.json
+    python run_benchmarks.py --baseline baseline.json --threshold 20
+
+Exits with 1 when a scenario fails or regresses past the threshold.
+"""
+
+#---------Imports---------
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+
+from collections import OrderedDict
+
+from mockilo import MockIloServer, MockIloTree
+
+#---------End of imports---------
+
+RDMC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), \
+                    'src', 'rdmc.py')
+METRICS = ['wall', 'requests', 'bytes', 'rss']
+LOGIN = ['login', '{url}', '-u', 'admin', '-p', 'password']
+COMPONENT = 'cp999999.exe'
+
+def prepare_load(workdir, rnd):
+    """ Change the saved BIOS settings so load has something to apply """
+    filename = os.path.join(workdir, 'multisave.json')
+    with open(filename) as infile:
+        data = json.load(infile)
+    for entry in data:
+        for paths in entry.values():
+            for body in paths.values() if isinstance(paths, dict) else []:
+                if 'Attributes' in body:
+                    body['Attributes']['AdminName'] = 'load%d' % rnd
+    with open(filename, 'w') as outfile:
+        json.dump(data, outfile, indent=2)
+
+def prepare_component(workdir, rnd):
+    """ Write a component file to upload """
+    with open(os.path.join(workdir, COMPONENT), 'w') as outfile:
+        outfile.write('component %d\n' % rnd * 4096)
+
+#Each scenario logs in during setup, then times its commands in fresh processes
+SCENARIOS = [
+    {'name': 'login', 'setup': [], 'commands': [LOGIN]},
+    {'name': 'login_lazy', 'setup': [], 'commands': [LOGIN + ['--lazy']]},
+    {'name': 'types', 'setup': [LOGIN], 'commands': [['types']]},
+    {'name': 'select', 'setup': [LOGIN], 'commands': [['select', 'Bios.']]},
+    {'name': 'get', 'setup': [LOGIN, ['select', 'Bios.']], 'commands': [['get']]},
+    {'name': 'set_commit', 'setup': [LOGIN, ['select', 'Bios.']], \
+     'commands': [['set', 'AdminName=bench{round}'], ['commit']]},
+    {'name': 'save_multisave', 'setup': [LOGIN], 'commands': [['save', '--multisave', \
+        'Bios.,ComputerSystem.', '-f', '{workdir}/multisave.json']]},
+    {'name': 'load', 'setup': [LOGIN, ['save', '--multisave', 'Bios.,ComputerSystem.', \
+        '-f', '{workdir}/multisave.json']], 'prepare': prepare_load, \
+     'commands': [['load', '-f', '{workdir}/multisave.json']]},
+    {'name': 'serverlogs', 'setup': [LOGIN], 'commands': [['serverlogs', \
+        '--selectlog=IML', '-f', '{workdir}/iml.json']]},
+    {'name': 'serverclone_save', 'setup': [LOGIN], 'commands': [['serverclone', 'save', \
+        '-f', '{workdir}/clone.json', '--silent']]},
+    {'name': 'uploadcomp', 'setup': [LOGIN], 'prepare': prepare_component, \
+     'commands': [['uploadcomp', '--component={workdir}/' + COMPONENT]]},
+]
+
+def run_rdmc(python, args, workdir, stdin=None):
+    """ Run one rdmc.py process
+
+    :param python: interpreter used to run rdmc.py
+    :type python: str.
+    :param args: command line arguments
+    :type args: list.
+    :param workdir: directory holding the cache and output files
+    :type workdir: str.
+    :param stdin: input for interactive mode
+    :type stdin: str.
+    :returns: returns (return code, peak RSS in KiB or None, output)
+    """
+    cmdline = [python, RDMC, '--nologo', '--cache-dir=' + os.path.join(workdir, 'cache')] \
+                                                                                + args
+    proc = subprocess.Popen(cmdline, cwd=workdir, stdout=subprocess.PIPE, \
+            stderr=subprocess.STDOUT, stdin=subprocess.PIPE if stdin else None)
+    rss = None
+
+    if stdin:
+        proc.stdin.write(stdin.encode('utf-8'))
+        proc.stdin.close()
+
+    if hasattr(os, 'wait4'):
+        output = proc.stdout.read()
+        proc.stdout.close()
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -1
+        rss = usage.ru_maxrss // 1024 if sys.platform == 'darwin' else usage.ru_maxrss
+    else:
+        output = proc.communicate()[0]
+
+    return proc.returncode, rss, output.decode('utf-8', 'replace')
+
+def run_scenario(server, scenario, python, rounds=3, verbose=False):
+    """ Run a scenario and collect its metrics
+
+    :param server: running mock iLO
+    :type server: MockIloServer.
+    :param scenario: scenario definition from SCENARIOS
+    :type scenario: dict.
+    :param python: interpreter used to run rdmc.py
+    :type python: str.
+    :param rounds: number of timed repetitions
+    :type rounds: int.
+    :param verbose: print command output
+    :type verbose: bool.
+    :returns: returns the scenario metrics
+    """
+    workdir = tempfile.mkdtemp(prefix='rdmcbench')
+    walls = []
+    result = {'returncode': 0}
+
+    try:
+        for rnd in range(rounds):
+            fields = {'url': server.url, 'workdir': workdir, 'round': rnd}
+            for args in scenario['setup']:
+                run_rdmc(python, [arg.format(**fields) for arg in args], workdir)
+            if scenario.get('prepare'):
+                scenario['prepare'](workdir, rnd)
+
+            server.reset_stats()
+            peak = 0
+            start = time.time()
+
+            for args in scenario['commands']:
+                retcode, rss, output = run_rdmc(python, [arg.format(**fields) for \
+                                    arg in args], workdir, stdin=scenario.get('stdin'))
+                peak = max(peak, rss or 0)
+                if verbose or retcode:
+                    sys.stdout.write(output)
+                if retcode:
+                    result['returncode'] = retcode
+
+            walls.append(time.time() - start)
+            result['requests'] = server.stats['requests']
+            result['bytes'] = server.stats['bytes_sent'] + server.stats['bytes_received']
+            result['rss'] = max(result.get('rss') or 0, peak) or None
+
+            run_rdmc(python, ['logout'], workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    walls.sort()
+    result['wall'] = walls[len(walls) // 2]
+    result['wall_min'] = walls[0]
+    return result
+
+def compare(results, baseline, threshold, metrics):
+    """ Find metrics that regressed against a baseline
+
+    :param results: current results
+    :type results: dict.
+    :param baseline: baseline results
+    :type baseline: dict.
+    :param threshold: allowed increase in percent
+    :type threshold: float.
+    :param metrics: metrics to compare
+    :type metrics: list.
+    :returns: returns a list of (scenario, metric, baseline, current, percent)
+    """
+    regressions = []
+    for name, current in sorted(results['scenarios'].items()):
+        base = baseline.get('scenarios', {}).get(name)
+        if not base:
+            continue
+        for metric in metrics:
+            if not base.get(metric) or current.get(metric) is None:
+                continue
+            change = (current[metric] - base[metric]) * 100.0 / base[metric]
+            if change > threshold:
+                regressions.append((name, metric, base[metric], current[metric], change))
+    return regressions
+
+def print_results(results):
+    """ Print a result table """
+    sys.stdout.write('%-18s %10s %10s %12s %10s\n' % ('scenario', 'wall (s)', 'requests', \
+                                                     'bytes', 'rss (KiB)'))
+    for name, res in results['scenarios'].items():
+        sys.stdout.write('%-18s %10.3f %10d %12d %10s%s\n' % (name, res['wall'], \
+                res['requests'], res['bytes'], res['rss'], '' if not res['returncode'] \
+                else '  FAILED (%d)' % res['returncode']))
+
+def main(argv=None):
+    """ Command line entry point """
+    parser = argparse.ArgumentParser(description='Benchmark RDMC commands against a '\
+                                     'mock iLO.')
+    parser.add_argument('--python', default=sys.executable, help='Interpreter used '\
+                        'to run rdmc.py.')
+    parser.add_argument('--scenario', action='append', default=None, help='Run only '\
+                        'the named scenario, may be repeated.')
+    parser.add_argument('--rounds', type=int, default=3, help='Timed repetitions per '\
+                        'scenario, the median wall time is reported.')
+    parser.add_argument('--tree', default=None, help='JSON tree file to serve instead '\
+                        'of the built in iLO 5 tree.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds the mock '\
+                        'adds to every response.')
+    parser.add_argument('--padding', type=int, default=0, help='Bytes of filler the '\
+                        'mock adds to every resource.')
+    parser.add_argument('--output', default=None, help='Write results to this JSON file.')
+    parser.add_argument('--baseline', default=None, help='Compare against this '\
+                        'baseline JSON file.')
+    parser.add_argument('--save-baseline', default=None, help='Write results as a new '\
+                        'baseline JSON file.')
+    parser.add_argument('--threshold', type=float, default=20.0, help='Allowed '\
+                        'regression in percent before failing. (default: 20)')
+    parser.add_argument('--metrics', default=','.join(METRICS), help='Comma separated '\
+                        'metrics compared against the baseline. (default: %s)' % \
+                        ','.join(METRICS))
+    parser.add_argument('--verbose', action='store_true', help='Print command output.')
+    args = parser.parse_args(argv)
+
+    scenarios = [scen for scen in SCENARIOS if not args.scenario or scen['name'] in \
+                                                                        args.scenario]
+    tree = MockIloTree.load(args.tree) if args.tree else None
+    results = {'meta': {'python': args.python, 'platform': platform.platform(), \
+                        'latency': args.latency, 'padding': args.padding, \
+                        'rounds': args.rounds, 'tree': args.tree}, \
+               'scenarios': OrderedDict()}
+
+    with MockIloServer(tree=tree, latency=args.latency, padding=args.padding) as server:
+        for scenario in scenarios:
+            sys.stdout.write('Running %s...\n' % scenario['name'])
+            results['scenarios'][scenario['name']] = run_scenario(server, scenario, \
+                                    args.python, rounds=args.rounds, verbose=args.verbose)
+
+    print_results(results)
+    for filename in (args.output, args.save_baseline):
+        if filename:
+            with open(filename, 'w') as outfile:
+                json.dump(results, outfile, indent=2, sort_keys=True)
+
+    failed = any(res['returncode'] for res in results['scenarios'].values())
+    if args.baseline:
+        with open(args.baseline) as infile:
+            baseline = json.load(infile)
+        regressions = compare(results, baseline, args.threshold, \
+                              [met.strip() for met in args.metrics.split(',')])
+        for name, metric, base, current, change in regressions:
+            sys.stdout.write('REGRESSION %s %s: %s -> %s (+%.1f%%)\n' % (name, metric, \
+                                                                base, current, change))
+        failed = failed or bool(regressions)
+
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
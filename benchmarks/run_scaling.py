@@ -0,0 +1,115 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Scaling benchmarks of RDMC commands over growing synthetic datasets
+
+Serves datagen trees at several fractions of the worst case size and times
+get, save, load, serverlogs, smartarray and the interactive mode tab
+completion lists at each size. Results are written as CSV, one row per
+size and scenario, ready to plot time and memory against N.
+
+    python run_scaling.py --scales 0.1,0.25,0.5,1 --csv scaling.csv
+"""
+
+#---------Imports---------
+
+import os
+import sys
+import json
+import argparse
+
+from datagen import PRESETS, scaled_sizes, save_data
+from mockilo import MockIloServer, build_ilo5_tree
+from run_benchmarks import LOGIN, run_scenario, prepare_load
+
+#---------End of imports---------
+
+def prepare_saved_load(tree):
+    """ Copy the generated save file to the workdir and change it """
+    def _prepare(workdir, rnd):
+        """ prepare hook of the load scenario """
+        with open(os.path.join(workdir, 'multisave.json'), 'w') as outfile:
+            json.dump(save_data(tree), outfile)
+        prepare_load(workdir, rnd)
+    return _prepare
+
+def scaling_scenarios(tree):
+    """ Scenarios timed at every size
+
+    :param tree: tree being served
+    :type tree: MockIloTree.
+    """
+    return [
+        {'name': 'get', 'setup': [LOGIN, ['select', 'Bios.']], 'commands': [['get']]},
+        {'name': 'save', 'setup': [LOGIN], 'commands': [['save', '--multisave', \
+            'Bios.,ComputerSystem.', '-f', '{workdir}/save.json']]},
+        {'name': 'load', 'setup': [LOGIN], 'prepare': prepare_saved_load(tree), \
+         'commands': [['load', '-f', '{workdir}/multisave.json']]},
+        {'name': 'serverlogs', 'setup': [LOGIN], 'commands': [['serverlogs', \
+            '--selectlog=IML', '-f', '{workdir}/iml.json']]},
+        {'name': 'smartarray', 'setup': [LOGIN], 'commands': [['smartarray']]},
+        #Interactive mode rebuilds the tab completion lists after every command
+        {'name': 'check_for_tab_lists', 'setup': [LOGIN], 'commands': [[]], \
+         'stdin': 'select Bios.\nexit\n'},
+    ]
+
+def main(argv=None):
+    """ Command line entry point """
+    parser = argparse.ArgumentParser(description='Time RDMC commands against growing '\
+                                     'synthetic datasets.')
+    parser.add_argument('--python', default=sys.executable, help='Interpreter used '\
+                        'to run rdmc.py.')
+    parser.add_argument('--preset', default='worst', choices=sorted(PRESETS), \
+                        help='Dataset sizes at scale 1. (default: worst)')
+    parser.add_argument('--scales', default='0.1,0.25,0.5,1', help='Comma separated '\
+                        'fractions of the preset to run. (default: 0.1,0.25,0.5,1)')
+    parser.add_argument('--scenario', action='append', default=None, help='Run only '\
+                        'the named scenario, may be repeated.')
+    parser.add_argument('--rounds', type=int, default=1, help='Timed repetitions per '\
+                        'scenario and size.')
+    parser.add_argument('--csv', default=None, help='Write results to this CSV file '\
+                        'instead of stdout.')
+    args = parser.parse_args(argv)
+
+    columns = ['scale'] + list(PRESETS[args.preset]) + ['scenario', 'wall', 'requests', \
+                                                       'bytes', 'rss', 'returncode']
+    rows = []
+
+    for scale in [float(val) for val in args.scales.split(',')]:
+        sizes = scaled_sizes(args.preset, scale)
+        tree = build_ilo5_tree(**sizes)
+        sys.stderr.write('Scale %s: %d resources\n' % (scale, len(tree.resources)))
+
+        with MockIloServer(tree=tree) as server:
+            for scenario in scaling_scenarios(tree):
+                if args.scenario and scenario['name'] not in args.scenario:
+                    continue
+                sys.stderr.write('  running %s...\n' % scenario['name'])
+                result = run_scenario(server, scenario, args.python, rounds=args.rounds)
+                row = dict(sizes, scale=scale, scenario=scenario['name'], **result)
+                rows.append([str(row[col]) for col in columns])
+
+    outfile = open(args.csv, 'w') if args.csv else sys.stdout
+    try:
+        for row in [columns] + rows:
+            outfile.write(','.join(row) + '\n')
+    finally:
+        if args.csv:
+            outfile.close()
+
+if __name__ == '__main__':
+    main()
@@ -22,8 +22,7 @@ import sys
 from optparse import OptionParser, SUPPRESS_HELP
 
 from rdmc_base_classes import RdmcCommandBase
-from rdmc_helper import ReturnCodes, InvalidCommandLineError, InvalidCommandLineErrorOPTS, \
-                        Encryption
+from rdmc_helper import ReturnCodes, InvalidCommandLineError, InvalidCommandLineErrorOPTS
 
 class BiosDefaultsCommand(RdmcCommandBase):
     """ Set BIOS settings back to default for the server that is currently
@@ -109,35 +108,7 @@ class BiosDefaultsCommand(RdmcCommandBase):
 
     def defaultsvalidation(self, options):
         """ BIOS defaults method validation function """
-        client = None
-        inputline = list()
-
-        if options.encode and options.user and options.password:
-            options.user = Encryption.decode_credentials(options.user)
-            options.password = Encryption.decode_credentials(options.password)
-
-        try:
-            client = self._rdmc.app.get_current_client()
-            if options.user and options.password:
-                if not client.get_username():
-                    client.set_username(options.user)
-                if not client.get_password():
-                    client.set_password(options.password)
-        except:
-            if options.user or options.password or options.url:
-                if options.url:
-                    inputline.extend([options.url])
-                if options.user:
-                    inputline.extend(["-u", options.user])
-                if options.password:
-                    inputline.extend(["-p", options.password])
-            else:
-                if self._rdmc.app.config.get_url():
-                    inputline.extend([self._rdmc.app.config.get_url()])
-                if self._rdmc.app.config.get_username():
-                    inputline.extend(["-u", self._rdmc.app.config.get_username()])
-                if self._rdmc.app.config.get_password():
-                    inputline.extend(["-p", self._rdmc.app.config.get_password()])
+        (client, inputline) = self._rdmc.app.context.resolve(options)
 
         if inputline:
             self.lobobj.loginfunction(inputline)
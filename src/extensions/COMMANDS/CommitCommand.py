@@ -25,7 +25,7 @@ from redfish.ris.rmc_helper import NothingSelectedError
 
 from rdmc_base_classes import RdmcCommandBase
 from rdmc_helper import ReturnCodes, InvalidCommandLineErrorOPTS, FailureDuringCommitError,\
-                        NoChangesFoundOrMadeError, NoCurrentSessionEstablished, Encryption
+                        NoChangesFoundOrMadeError, NoCurrentSessionEstablished
 
 class CommitCommand(RdmcCommandBase):
     """ Constructor """
@@ -103,18 +103,8 @@ class CommitCommand(RdmcCommandBase):
     def commitvalidation(self, options):
         """ Commit method validation function """
 
-        if options.encode and options.user and options.password:
-            options.user = Encryption.decode_credentials(options.user)
-            options.password = Encryption.decode_credentials(options.password)
-
-        try:
-            client = self._rdmc.app.get_current_client()
-            if options.user and options.password:
-                if not client.get_username():
-                    client.set_username(options.user)
-                if not client.get_password():
-                    client.set_password(options.password)
-        except:
+        (client, _) = self._rdmc.app.context.resolve(options)
+        if not client:
             raise NoCurrentSessionEstablished("Please login and make setting" \
                                       " changes before using commit command.")
 
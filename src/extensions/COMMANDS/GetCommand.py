@@ -18,14 +18,18 @@
 """ Get Command for RDMC """
 
 from optparse import OptionParser, SUPPRESS_HELP
-from collections import (OrderedDict)
+from collections import OrderedDict
 
 import six
 
 import redfish.ris
 
-from rdmc_base_classes import RdmcCommandBase, HARDCODEDLIST
-from rdmc_helper import ReturnCodes, InvalidCommandLineErrorOPTS, UI, Encryption, \
+from redfish.ris.rmc_helper import InstanceNotFoundError
+
+from rdmc_base_classes import RdmcCommandBase
+from rdmc_projection import Projection
+from rdmc_tabular import FORMATS, tabularwriter
+from rdmc_helper import ReturnCodes, InvalidCommandLineErrorOPTS, UI, \
                     NoContentsFoundForOperationError, InvalidCommandLineError
 
 class GetCommand(RdmcCommandBase):
@@ -63,6 +67,7 @@ class GetCommand(RdmcCommandBase):
             else:
                 raise InvalidCommandLineErrorOPTS("")
 
+        selectors = self.selectors(options)
         self.getvalidation(options)
 
         filtr = (None, None)
@@ -80,8 +85,12 @@ class GetCommand(RdmcCommandBase):
                 raise InvalidCommandLineError("Invalid filter" \
                   " parameter format [filter_attribute]=[filter_value]")
 
-        self.getworkerfunction(args, options, results=None, uselist=True, filtervals=filtr,\
-                               readonly=options.noreadonly)
+        if len(selectors) > 1:
+            self.getmultiplefunction(selectors, args, options, uselist=True, \
+                                        filtervals=filtr, readonly=options.noreadonly)
+        else:
+            self.getworkerfunction(args, options, results=None, uselist=True, \
+                                        filtervals=filtr, readonly=options.noreadonly)
 
         #Return code
         return ReturnCodes.SUCCESS
@@ -102,45 +111,119 @@ class GetCommand(RdmcCommandBase):
         :type filtervals: tuple
         :param results: current results collected
         :type results: string.
-        :param uselist: use reserved properties list to filter results
+        :param uselist: leave the reserved properties out of the results
         :type uselist: boolean.
         """
-        content = []
         nocontent = set()
         instances = None
+        writer = None if results else tabularwriter(options)
 
-        #For rest redfish compatibility of bios.
         args = [args] if args and isinstance(args, six.string_types) else args
-        args = ["Attributes/"+arg if self._rdmc.app.get_selector().lower().\
-                startswith('bios.') and 'attributes' not in arg.lower() else arg \
-                                                for arg in args] if args else args
+        #For rest redfish compatibility of bios.
+        bios = 'bios.' in self._rdmc.app.get_selector().lower()
+        prefixed = self._rdmc.app.get_selector().lower().startswith('bios.')
         if filtervals[0]:
             instances = self._rdmc.app.select(selector=self._rdmc.app.get_selector(), \
                                                                     fltrvals=filtervals)
 
+        projection = Projection(args, attributes=bios, prefixed=prefixed, \
+                                reserved=uselist and not readonly, ordered=True)
+        #Rows already written cannot be taken back, so readonly properties are
+        #kept only for the instances they cannot be removed from
+        fallback = Projection(args, attributes=bios, prefixed=prefixed, \
+                                reserved=uselist, ordered=True) if writer else None
         try:
-            contents = self._rdmc.app.getprops(props=args, remread=readonly, nocontent=nocontent, \
-                                                                                insts=instances)
-            uselist = False if readonly else uselist
+            contents = self._rdmc.app.iterprops(remread=readonly, nocontent=nocontent, \
+                        insts=instances, projection=projection, fallback=fallback)
+            contents = writer.writerows(contents) if writer else list(contents)
         except redfish.ris.rmc_helper.EmptyRaiseForEAFP:
-            contents = self._rdmc.app.getprops(props=args, nocontent=nocontent)
-        for ind, content in enumerate(contents):
-            if 'bios.' in self._rdmc.app.get_selector().lower() and \
-                    'Attributes' in list(content.keys()):
-                content.update(content['Attributes'])
-                del content['Attributes']
-            contents[ind] = OrderedDict(sorted(list(content.items()), key=lambda x: x[0]))
-        if uselist:
-            map(lambda x: self.removereserved(x), contents)
+            projection = Projection(args, attributes=bios, prefixed=prefixed, \
+                                                        reserved=uselist, ordered=True)
+            contents = list(self._rdmc.app.iterprops(nocontent=nocontent, \
+                                                                projection=projection))
         if results:
             return contents
 
-        contents = contents[0] if len(contents) == 1 else contents
-        if options and options.json and contents:
+        if writer is None:
+            contents = contents[0] if len(contents) == 1 else contents
+            if options and options.json and contents:
+                UI().print_out_json(contents)
+            elif contents:
+                UI().print_out_human_readable(contents)
+
+        if nocontent:
+            strtoprint = ', '.join(str(val) for val in nocontent)
+            raise NoContentsFoundForOperationError('No ' \
+                               'contents found for entry: %s' % strtoprint)
+        if options.logout:
+            self.logoutobj.run("")
+
+    def getmultiplefunction(self, selectors, args, options, readonly=False, \
+                                            filtervals=(None, None), uselist=False):
+        """ get worker function for several selectors, printing a single
+        document keyed by selector, or the rows of every selector in turn
+
+        :param selectors: the type selections
+        :type selectors: list.
+        :param args: command line arguments
+        :type args: list.
+        :param options: command line options
+        :type options: list.
+        :param readonly: remove readonly properties
+        :type readonly: bool
+        :param filtervals: filter key value pair (Key,Val)
+        :type filtervals: tuple
+        :param uselist: leave the reserved properties out of the results
+        :type uselist: boolean.
+        """
+        nocontent = set(args or [])
+        notfound = []
+        contents = OrderedDict()
+        writer = tabularwriter(options)
+        val = filtervals[1].strip('\'\"') if filtervals[1] else filtervals[1]
+
+        gathered = self._rdmc.app.gatherinstances(selectors, \
+                                                    workers=self._rdmc.opts.crawlworkers)
+        for selector, instances in gathered.items():
+            if filtervals[0]:
+                instances = self._rdmc.app.filterinstances(self._rdmc.app.\
+                        modifyselectorforgen(selector), instances, filtervals[0], val)
+            if not instances:
+                notfound.append(selector)
+                continue
+
+            bios = 'bios.' in selector.lower()
+            prefixed = selector.lower().startswith('bios.')
+            missing = set()
+            projection = Projection(args, attributes=bios, prefixed=prefixed, \
+                                    reserved=uselist and not readonly, ordered=True)
+            fallback = Projection(args, attributes=bios, prefixed=prefixed, \
+                                reserved=uselist, ordered=True) if writer else None
+            try:
+                result = self._rdmc.app.iterprops(remread=readonly, nocontent=missing, \
+                            insts=instances, projection=projection, fallback=fallback)
+                result = writer.writerows(result) if writer else list(result)
+            except redfish.ris.rmc_helper.EmptyRaiseForEAFP:
+                projection = Projection(args, attributes=bios, prefixed=prefixed, \
+                                                        reserved=uselist, ordered=True)
+                result = list(self._rdmc.app.iterprops(nocontent=missing, insts=instances, \
+                                                                    projection=projection))
+            except redfish.ris.NothingSelectedError:
+                notfound.append(selector)
+                continue
+            #Properties are only missing if no type has them
+            nocontent &= missing
+            if result and not writer:
+                contents[selector] = result[0] if len(result) == 1 else result
+
+        if options.json and contents:
             UI().print_out_json(contents)
         elif contents:
             UI().print_out_human_readable(contents)
 
+        if notfound:
+            raise InstanceNotFoundError('Unable to locate instance for %s' % \
+                                                                    ', '.join(notfound))
         if nocontent:
             strtoprint = ', '.join(str(val) for val in nocontent)
             raise NoContentsFoundForOperationError('No ' \
@@ -148,26 +231,19 @@ class GetCommand(RdmcCommandBase):
         if options.logout:
             self.logoutobj.run("")
 
-    def removereserved(self, entry):
-        """ function to remove reserved properties
+    def selectors(self, options):
+        """ Split a comma separated list of selectors, the selector option is
+        left with the first one for the validation
 
-        :param entry: dictionary to remove reserved properties from
-        :type entry: dict.
+        :param options: command line options
+        :type options: list.
+        :returns: returns a list of selectors
         """
-
-        for key, val in list(entry.items()):
-            if key.lower() in HARDCODEDLIST or '@odata' in key.lower():
-                del entry[key]
-            elif isinstance(val, list):
-                for item in entry[key]:
-                    if isinstance(item, dict):
-                        self.removereserved(item)
-                        if all([True if not test else False for test in entry[key]]):
-                            del entry[key]
-            elif isinstance(val, dict):
-                self.removereserved(val)
-                if all([True if not test else False for test in entry[key]]):
-                    del entry[key]
+        if not options.selector:
+            return []
+        selectors = [sel.strip() for sel in options.selector.split(',') if sel.strip()]
+        options.selector = selectors[0] if selectors else None
+        return selectors
 
     def getvalidation(self, options):
         """ get method validation function
@@ -175,39 +251,10 @@ class GetCommand(RdmcCommandBase):
         :param options: command line options
         :type options: list.
         """
-        inputline = list()
-
         if self._rdmc.app.config._ac__format.lower() == 'json':
             options.json = True
 
-        if options.encode and options.user and options.password:
-            options.user = Encryption.decode_credentials(options.user)
-            options.password = Encryption.decode_credentials(options.password)
-
-        try:
-            client = self._rdmc.app.get_current_client()
-            if options.user and options.password:
-                if not client.get_username():
-                    client.set_username(options.user)
-                if not client.get_password():
-                    client.set_password(options.password)
-        except:
-            if options.user or options.password or options.url:
-                if options.url:
-                    inputline.extend([options.url])
-                if options.user:
-                    inputline.extend(["-u", options.user])
-                if options.password:
-                    inputline.extend(["-p", options.password])
-            else:
-                if self._rdmc.app.config.get_url():
-                    inputline.extend([self._rdmc.app.config.get_url()])
-                if self._rdmc.app.config.get_username():
-                    inputline.extend(["-u", \
-                                  self._rdmc.app.config.get_username()])
-                if self._rdmc.app.config.get_password():
-                    inputline.extend(["-p", \
-                                  self._rdmc.app.config.get_password()])
+        (client, inputline) = self._rdmc.app.context.resolve(options)
 
         if inputline and options.selector:
             if options.includelogs:
@@ -224,6 +271,8 @@ class GetCommand(RdmcCommandBase):
                 inputline.extend(["--path", options.path])
             if options.ref:
                 inputline.extend(["--refresh"])
+            if options.filter:
+                inputline.extend(["--filter", options.filter])
 
             inputline.extend([options.selector])
             self.selobj.selectfunction(inputline)
@@ -237,6 +286,8 @@ class GetCommand(RdmcCommandBase):
                     inputline.extend(["--path", options.path])
                 if options.ref:
                     inputline.extend(["--refresh"])
+                if options.filter:
+                    inputline.extend(["--filter", options.filter])
 
                 inputline.extend([selector])
                 self.selobj.selectfunction(inputline)
@@ -288,7 +339,8 @@ class GetCommand(RdmcCommandBase):
              " the current command on. Use this flag when you wish to"\
              " select a type without entering another command, or if you"\
               " wish to work with a type that is different from the one"\
-              " you currently have selected.",
+              " you currently have selected. Several types separated by commas"\
+             " are returned together, keyed by type.",
             default=None,
         )
         customparser.add_option(
@@ -324,6 +376,25 @@ class GetCommand(RdmcCommandBase):
             " structure makes the information easier to parse.",
             default=False
         )
+        customparser.add_option(
+            '--format',
+            dest='format',
+            type='choice',
+            choices=list(FORMATS),
+            help="Optionally include this flag to write one row per instance"\
+            " in CSV, TSV or newline delimited JSON format as the instances are"\
+            " read. Nested properties become columns named by their path."\
+            " Valid choices are: csv, tsv, ndjson",
+            default=None
+        )
+        customparser.add_option(
+            '--columns',
+            dest='columns',
+            help="Optionally include this flag with the format flag to choose"\
+            " the columns of the rows and their order, separated by commas."\
+            " Nested properties are separated by /. EX: --columns=Id,Status/Health",
+            default=None
+        )
         customparser.add_option(
             '--logout',
             dest='logout',
@@ -21,8 +21,8 @@ from optparse import OptionParser, SUPPRESS_HELP
 import redfish.ris
 
 from rdmc_base_classes import RdmcCommandBase
-from rdmc_helper import ReturnCodes, InvalidCommandLineErrorOPTS, InvalidCommandLineError, \
-                        Encryption
+from rdmc_tabular import FORMATS
+from rdmc_helper import ReturnCodes, InvalidCommandLineErrorOPTS, InvalidCommandLineError
 
 class ListCommand(RdmcCommandBase):
     """ Constructor """
@@ -59,6 +59,7 @@ class ListCommand(RdmcCommandBase):
             else:
                 raise InvalidCommandLineErrorOPTS("")
 
+        selectors = self.getobj.selectors(options)
         self.listvalidation(options)
 
         fvals = (None, None)
@@ -75,7 +76,11 @@ class ListCommand(RdmcCommandBase):
                 raise InvalidCommandLineError("Invalid filter" \
                   " parameter format [filter_attribute]=[filter_value]")
 
-        self.getobj.getworkerfunction(args, options, filtervals=fvals, uselist=False)
+        if len(selectors) > 1:
+            self.getobj.getmultiplefunction(selectors, args, options, filtervals=fvals, \
+                                                                            uselist=False)
+        else:
+            self.getobj.getworkerfunction(args, options, filtervals=fvals, uselist=False)
 
         return ReturnCodes.SUCCESS
 
@@ -85,37 +90,10 @@ class ListCommand(RdmcCommandBase):
         :param options: command line options
         :type options: list.
         """
-        inputline = list()
-
         if self._rdmc.app.config._ac__format.lower() == 'json':
             options.json = True
 
-        if options.encode and options.user and options.password:
-            options.user = Encryption.decode_credentials(options.user)
-            options.password = Encryption.decode_credentials(options.password)
-
-        try:
-            client = self._rdmc.app.get_current_client()
-            if options.user and options.password:
-                if not client.get_username():
-                    client.set_username(options.user)
-                if not client.get_password():
-                    client.set_password(options.password)
-        except:
-            if options.user or options.password or options.url:
-                if options.url:
-                    inputline.extend([options.url])
-                if options.user:
-                    inputline.extend(["-u", options.user])
-                if options.password:
-                    inputline.extend(["-p", options.password])
-            else:
-                if self._rdmc.app.config.get_url():
-                    inputline.extend([self._rdmc.app.config.get_url()])
-                if self._rdmc.app.config.get_username():
-                    inputline.extend(["-u", self._rdmc.app.config.get_username()])
-                if self._rdmc.app.config.get_password():
-                    inputline.extend(["-p", self._rdmc.app.config.get_password()])
+        (client, inputline) = self._rdmc.app.context.resolve(options)
 
         if inputline and options.selector:
             if options.includelogs:
@@ -132,6 +110,8 @@ class ListCommand(RdmcCommandBase):
                 inputline.extend(["--path", options.path])
             if options.ref:
                 inputline.extend(["--refresh"])
+            if options.filter:
+                inputline.extend(["--filter", options.filter])
 
             inputline.extend([options.selector])
             self.selobj.selectfunction(inputline)
@@ -145,6 +125,8 @@ class ListCommand(RdmcCommandBase):
                     inputline.extend(["--path", options.path])
                 if options.ref:
                     inputline.extend(["--refresh"])
+                if options.filter:
+                    inputline.extend(["--filter", options.filter])
 
                 inputline.extend([selector])
                 self.selobj.selectfunction(inputline)
@@ -196,7 +178,8 @@ class ListCommand(RdmcCommandBase):
              " the current command on. Use this flag when you wish to"\
              " select a type without entering another command, or if you"\
               " wish to work with a type that is different from the one"\
-              " you currently have selected.",
+              " you currently have selected. Several types separated by commas"\
+              " are returned together, keyed by type.",
             default=None,
         )
         customparser.add_option(
@@ -222,6 +205,25 @@ class ListCommand(RdmcCommandBase):
             " structure makes the information easier to parse.",
             default=False
         )
+        customparser.add_option(
+            '--format',
+            dest='format',
+            type='choice',
+            choices=list(FORMATS),
+            help="Optionally include this flag to write one row per instance"\
+            " in CSV, TSV or newline delimited JSON format as the instances are"\
+            " read. Nested properties become columns named by their path."\
+            " Valid choices are: csv, tsv, ndjson",
+            default=None
+        )
+        customparser.add_option(
+            '--columns',
+            dest='columns',
+            help="Optionally include this flag with the format flag to choose"\
+            " the columns of the rows and their order, separated by commas."\
+            " Nested properties are separated by /. EX: --columns=Id,Status/Health",
+            default=None
+        )
         customparser.add_option(
             '--logout',
             dest='logout',
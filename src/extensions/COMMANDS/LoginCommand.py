@@ -18,15 +18,18 @@
 """ Login Command for RDMC """
 
 import sys
+import time
 import getpass
 
 from optparse import OptionParser, SUPPRESS_HELP
 
 import redfish.ris
 
+from rdmc_crawler import crawl, islogentries
+from rdmc_profiles import get_profile
 from rdmc_base_classes import RdmcCommandBase
 from rdmc_helper import ReturnCodes, InvalidCommandLineError, \
-                            InvalidCommandLineErrorOPTS, PathUnavailableError, Encryption
+                    InvalidCommandLineErrorOPTS, PathUnavailableError, Encryption, LOGGER
 
 class LoginCommand(RdmcCommandBase):
     """ Constructor """
@@ -92,12 +95,22 @@ class LoginCommand(RdmcCommandBase):
         proxy = self._rdmc.opts.proxy if self._rdmc.opts.proxy else \
                                         self._rdmc.app.config.get_proxy()
 
+        profile = get_profile(options.profile, self._rdmc.app.config_file) if \
+                                                        options.profile else None
+        lazy = (options.lazy or profile is not None) and not skipbuild
+
         self._rdmc.app.login(username=self.username, \
                       password=self.password, base_url=self.url, \
-                      verbose=self._rdmc.opts.verbose, path=options.path, skipbuild=skipbuild,\
-                      includelogs=options.includelogs, biospassword=self.biospassword, \
+                      verbose=self._rdmc.opts.verbose, path=options.path, \
+                      skipbuild=True, includelogs=options.includelogs, \
+                      biospassword=self.biospassword, \
                       is_redfish=self._rdmc.opts.is_redfish, proxy=proxy)
 
+        if lazy:
+            self.lazybuild(options, profile)
+        elif not skipbuild:
+            self.crawlbuild(options)
+
         # Warning for cache enabled, since we save session in plain text
         if not self._rdmc.encoding:
             sys.stdout.write("WARNING: Cache is activated. Session keys are stored in plaintext.\n")
@@ -115,6 +128,72 @@ class LoginCommand(RdmcCommandBase):
             except Exception as excp:
                 raise redfish.ris.InstanceNotFoundError(excp)
 
+    def lazybuild(self, options, profile=None):
+        """ Build a partial monolith for the lazy login mode. Only the service
+        root, the --path resource and the resource directory are downloaded,
+        no links are followed. Every other instance is left as a placeholder
+        which is downloaded the first time its type is selected.
+
+        :param options: command line options
+        :type options: list.
+        :param profile: profile whose types and paths are downloaded up front
+        :type profile: CrawlProfile.
+        """
+        app = self._rdmc.app
+        monolith = app.current_client.monolith
+        #Log entries are kept in the log store by serverlogs, even with includelogs
+        paths = [options.path] if options.path and not islogentries(options.path) else []
+        paths.append(monolith._resourcedir)
+
+        for path in paths:
+            monolith.load(path=path, crawl=False, includelogs=options.includelogs)
+
+        if monolith.path(monolith._resourcedir):
+            monolith.populatecollections()
+
+            if profile:
+                roots = [member.path for member in list(monolith.paths.values()) if \
+                                    not member and profile.matchestype(member.maj_type)]
+                prefixes = profile.prefixes(app.typepath.defs.startpath)
+                crawl(monolith, roots + prefixes, prefixes, \
+                                            workers=self._rdmc.opts.crawlworkers)
+            app.save()
+        else:
+            #Without a resource directory there is nothing to discover types from
+            self.crawlbuild(options)
+
+    def crawlbuild(self, options):
+        """ Build the monolith with the concurrent crawler. The same links are
+        followed as by the library loader: the crawl stops at the resource
+        directory when a resource links to it and skips schemas and registries.
+
+        :param options: command line options
+        :type options: list.
+        """
+        app = self._rdmc.app
+        monolith = app.current_client.monolith
+        startpath = app.typepath.defs.startpath
+        exclude = [path.split('?')[0] for path in (app.typepath.schemapath, \
+                                                        app.typepath.regpath) if path]
+        progress = LOGGER.getEffectiveLevel() == 40
+        inittime = time.time()
+
+        if progress:
+            sys.stdout.write("Discovering data...")
+
+        crawl(monolith, [options.path or startpath], [startpath], \
+                workers=self._rdmc.opts.crawlworkers, exclude=exclude, \
+                resourcedir=monolith._resourcedir, init=True)
+        monolith.populatecollections()
+
+        if progress:
+            sys.stdout.write("Done\n")
+
+        if self._rdmc.opts.verbose:
+            sys.stdout.write("Monolith build process time: %s\n" % (time.time() - inittime))
+
+        app.save()
+
     def loginvalidation(self, options, args):
         """ Login helper function for login validations
 
@@ -161,8 +240,8 @@ class LoginCommand(RdmcCommandBase):
             # Any argument should be treated as an URL
             self.url = args[0]
 
-            # Verify that URL is properly formatted for https://
-            if "https://" not in self.url:
+            # Verify that URL is properly formatted, defaulting to https://
+            if "://" not in self.url:
                 self.url = "https://" + self.url
             if not self.username or not self.password:
                 raise InvalidCommandLineError("Empty username or password was entered.")
@@ -203,6 +282,26 @@ class LoginCommand(RdmcCommandBase):
             help="Optionally include logs in the data retrieval process.",
             default=False,
         )
+        customparser.add_option(
+            '--lazy',
+            dest='lazy',
+            action="store_true",
+            help="Optionally download only the service root, the session and"\
+            " the resource directory during login. Instances of a type are"\
+            " downloaded the first time the type is selected, so commands"\
+            " only touch the resources they need.",
+            default=False,
+        )
+        customparser.add_option(
+            '--profile',
+            dest='profile',
+            help="Optionally limit the data downloaded during login to the"\
+            " areas a job needs. Built in profiles are bios, firmware, logs,"\
+            " storage, accounts, network and full. Custom profiles can be"\
+            " defined in the configuration file. Other types are downloaded"\
+            " the first time they are selected, as with the lazy flag.",
+            default=None,
+        )
         customparser.add_option(
             '--selector',
             dest='selector',
@@ -180,37 +180,10 @@ class SaveCommand(RdmcCommandBase):
         :param options: command line options
         :type options: list.
         """
-        inputline = list()
-
         if self._rdmc.app.config._ac__format.lower() == 'json':
             options.json = True
 
-        if options.encode and options.user and options.password:
-            options.user = Encryption.decode_credentials(options.user)
-            options.password = Encryption.decode_credentials(options.password)
-
-        try:
-            client = self._rdmc.app.get_current_client()
-            if options.user and options.password:
-                if not client.get_username():
-                    client.set_username(options.user)
-                if not client.get_password():
-                    client.set_password(options.password)
-        except:
-            if options.user or options.password or options.url:
-                if options.url:
-                    inputline.extend([options.url])
-                if options.user:
-                    inputline.extend(["-u", options.user])
-                if options.password:
-                    inputline.extend(["-p", options.password])
-            else:
-                if self._rdmc.app.config.get_url():
-                    inputline.extend([self._rdmc.app.config.get_url()])
-                if self._rdmc.app.config.get_username():
-                    inputline.extend(["-u", self._rdmc.app.config.get_username()])
-                if self._rdmc.app.config.get_password():
-                    inputline.extend(["-p", self._rdmc.app.config.get_password()])
+        (client, inputline) = self._rdmc.app.context.resolve(options)
 
         if inputline and options.selector:
             if options.includelogs:
@@ -225,6 +198,8 @@ class SaveCommand(RdmcCommandBase):
                 inputline.extend(["--includelogs"])
             if options.path:
                 inputline.extend(["--path", options.path])
+            if options.filter:
+                inputline.extend(["--filter", options.filter])
 
             inputline.extend([options.selector])
             self.selobj.selectfunction(inputline)
@@ -248,6 +223,8 @@ class SaveCommand(RdmcCommandBase):
                     inputline.extend(["--includelogs"])
                 if options.path:
                     inputline.extend(["--path", options.path])
+                if options.filter:
+                    inputline.extend(["--filter", options.filter])
 
                 inputline.extend([selector])
                 self.selobj.selectfunction(inputline)
@@ -24,8 +24,7 @@ from optparse import OptionParser, SUPPRESS_HELP
 import redfish.ris
 
 from rdmc_base_classes import RdmcCommandBase
-from rdmc_helper import ReturnCodes, InvalidCommandLineError, InvalidCommandLineErrorOPTS, LOGGER, \
-                        Encryption
+from rdmc_helper import ReturnCodes, InvalidCommandLineError, InvalidCommandLineErrorOPTS, LOGGER
 
 class SelectCommand(RdmcCommandBase):
     """ Constructor """
@@ -65,7 +64,8 @@ class SelectCommand(RdmcCommandBase):
                 if options.ref:
                     LOGGER.warn("Patches from current selection will be cleared.")
                 selector = args[0]
-                selections = self._rdmc.app.select(selector=selector, rel=options.ref)
+                selections = self._rdmc.app.select(selector=selector, rel=options.ref, \
+                                                fltrvals=self.filtervalues(options.filter))
 
                 if self._rdmc.opts.verbose and selections:
                     templist = list()
@@ -81,8 +81,7 @@ class SelectCommand(RdmcCommandBase):
                 selector = self._rdmc.app.get_selector()
 
                 if selector:
-                    sellist = [sel for sel in self._rdmc.app.current_client.\
-                       monolith.typesadded if selector.lower() in sel.lower()]
+                    sellist = self._rdmc.app.typeindex.search(selector)
                     sys.stdout.write("Current selection: ")
                     sys.stdout.write('%s' % ', '.join(map(str, sellist)))
                     sys.stdout.write('\n')
@@ -95,42 +94,33 @@ class SelectCommand(RdmcCommandBase):
         except redfish.ris.InstanceNotFoundError as infe:
             raise redfish.ris.InstanceNotFoundError(infe)
 
+    def filtervalues(self, tofilter):
+        """ Split the filter of the command selecting the type the way it does,
+        so the filtered selection is made once and can be filtered by the server
+
+        :param tofilter: filter option of the calling command
+        :type tofilter: str.
+        :returns: returns the filter values (Key,Val), empty if malformed
+        """
+        try:
+            if (str(tofilter)[0] == str(tofilter)[-1])\
+                    and str(tofilter).startswith(("'", '"')):
+                tofilter = tofilter[1:-1]
+
+            (sel, val) = tofilter.split('=')
+            return (sel.strip(), val.strip())
+        except:
+            return (None, None)
+
     def selectvalidation(self, options):
         """ Select data validation function
 
         :param options: command line options
         :type options: list.
         """
-        client = None
         runlogin = False
-        inputline = list()
-
-        if options.encode and options.user and options.password:
-            options.user = Encryption.decode_credentials(options.user)
-            options.password = Encryption.decode_credentials(options.password)
 
-        try:
-            client = self._rdmc.app.get_current_client()
-            if options.user and options.password:
-                if not client.get_username():
-                    client.set_username(options.user)
-                if not client.get_password():
-                    client.set_password(options.password)
-        except:
-            if options.user or options.password or options.url:
-                if options.url:
-                    inputline.extend([options.url])
-                if options.user:
-                    inputline.extend(["-u", options.user])
-                if options.password:
-                    inputline.extend(["-p", options.password])
-            else:
-                if self._rdmc.app.config.get_url():
-                    inputline.extend([self._rdmc.app.config.get_url()])
-                if self._rdmc.app.config.get_username():
-                    inputline.extend(["-u", self._rdmc.app.config.get_username()])
-                if self._rdmc.app.config.get_password():
-                    inputline.extend(["-p", self._rdmc.app.config.get_password()])
+        (client, inputline) = self._rdmc.app.context.resolve(options)
 
         if not inputline and not client:
             sys.stdout.write('Local login initiated...\n')
@@ -218,6 +208,12 @@ class SelectCommand(RdmcCommandBase):
             " command to execute. This option is only used on Gen 9 systems.",
             default=None,
         )
+        customparser.add_option(
+            '--filter',
+            dest='filter',
+            help=SUPPRESS_HELP,
+            default=None,
+        )
         customparser.add_option(
             '-e',
             '--enc',
@@ -23,7 +23,7 @@ import json
 from optparse import OptionParser, SUPPRESS_HELP
 
 from rdmc_base_classes import RdmcCommandBase
-from rdmc_helper import ReturnCodes, InvalidCommandLineErrorOPTS, Encryption, \
+from rdmc_helper import ReturnCodes, InvalidCommandLineErrorOPTS, \
                                                     NoCurrentSessionEstablished
 
 class StatusCommand(RdmcCommandBase):
@@ -169,18 +169,8 @@ class StatusCommand(RdmcCommandBase):
     def statusvalidation(self, options):
         """ Status method validation function """
 
-        if options.encode and options.user and options.password:
-            options.user = Encryption.decode_credentials(options.user)
-            options.password = Encryption.decode_credentials(options.password)
-
-        try:
-            client = self._rdmc.app.get_current_client()
-            if options.user and options.password:
-                if not client.get_username():
-                    client.set_username(options.user)
-                if not client.get_password():
-                    client.set_password(options.password)
-        except:
+        (client, _) = self._rdmc.app.context.resolve(options)
+        if not client:
             raise NoCurrentSessionEstablished("Please login and make setting" \
                                       " changes before using status command.")
 
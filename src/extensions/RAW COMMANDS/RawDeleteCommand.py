@@ -22,7 +22,7 @@ import json
 
 from optparse import OptionParser, SUPPRESS_HELP
 from rdmc_base_classes import RdmcCommandBase
-from rdmc_helper import ReturnCodes, InvalidCommandLineError, Encryption, \
+from rdmc_helper import ReturnCodes, InvalidCommandLineError, \
                                                     InvalidCommandLineErrorOPTS
 
 class RawDeleteCommand(RdmcCommandBase):
@@ -57,9 +57,7 @@ class RawDeleteCommand(RdmcCommandBase):
         url = None
         headers = {}
 
-        if options.encode and options.user and options.password:
-            options.user = Encryption.decode_credentials(options.user)
-            options.password = Encryption.decode_credentials(options.password)
+        self._rdmc.app.context.decode(options)
 
         if options.sessionid:
             url = self.sessionvalidation(options)
@@ -131,31 +129,8 @@ class RawDeleteCommand(RdmcCommandBase):
         :param options: command line options
         :type options: list.
         """
-        inputline = list()
-
-        try:
-            client = self._rdmc.app.get_current_client()
-            if options.user and options.password:
-                if not client.get_username():
-                    client.set_username(options.user)
-                if not client.get_password():
-                    client.set_password(options.password)
-        except:
-            if options.user or options.password or options.url:
-                if options.url:
-                    inputline.extend([options.url])
-                if options.user:
-                    inputline.extend(["-u", options.user])
-                if options.password:
-                    inputline.extend(["-p", options.password])
-            else:
-                if self._rdmc.app.config.get_url():
-                    inputline.extend([self._rdmc.app.config.get_url()])
-                if self._rdmc.app.config.get_username():
-                    inputline.extend(["-u", self._rdmc.app.config.get_username()])
-                if self._rdmc.app.config.get_password():
-                    inputline.extend(["-p", self._rdmc.app.config.get_password()])
-
+        (client, inputline) = self._rdmc.app.context.resolve(options)
+        if not client:
             self.lobobj.loginfunction(inputline, skipbuild=True)
 
     def sessionvalidation(self, options):
@@ -172,7 +147,7 @@ class RawDeleteCommand(RdmcCommandBase):
         else:
             if self._rdmc.app.config.get_url():
                 url = self._rdmc.app.config.get_url()
-        if url and not "https://" in url:
+        if url and not "://" in url:
             url = "https://" + url
 
         return url
@@ -26,7 +26,7 @@ import redfish
 
 from rdmc_base_classes import RdmcCommandBase
 from rdmc_helper import ReturnCodes, InvalidCommandLineError, \
-                    InvalidCommandLineErrorOPTS, UI, Encryption
+                    InvalidCommandLineErrorOPTS, UI
 
 class RawGetCommand(RdmcCommandBase):
     """ Raw form of the get command """
@@ -60,9 +60,7 @@ class RawGetCommand(RdmcCommandBase):
         url = None
         headers = {}
 
-        if options.encode and options.user and options.password:
-            options.user = Encryption.decode_credentials(options.user)
-            options.password = Encryption.decode_credentials(options.password)
+        self._rdmc.app.context.decode(options)
 
         if options.sessionid:
             url = self.sessionvalidation(options)
@@ -142,31 +140,8 @@ class RawGetCommand(RdmcCommandBase):
         :param options: command line options
         :type options: list.
         """
-        inputline = list()
-
-        try:
-            client = self._rdmc.app.get_current_client()
-            if options.user and options.password:
-                if not client.get_username():
-                    client.set_username(options.user)
-                if not client.get_password():
-                    client.set_password(options.password)
-        except:
-            if options.user or options.password or options.url:
-                if options.url:
-                    inputline.extend([options.url])
-                if options.user:
-                    inputline.extend(["-u", options.user])
-                if options.password:
-                    inputline.extend(["-p", options.password])
-            else:
-                if self._rdmc.app.config.get_url():
-                    inputline.extend([self._rdmc.app.config.get_url()])
-                if self._rdmc.app.config.get_username():
-                    inputline.extend(["-u", self._rdmc.app.config.get_username()])
-                if self._rdmc.app.config.get_password():
-                    inputline.extend(["-p", self._rdmc.app.config.get_password()])
-
+        (client, inputline) = self._rdmc.app.context.resolve(options)
+        if not client:
             self.lobobj.loginfunction(inputline, skipbuild=True)
 
     def sessionvalidation(self, options):
@@ -183,7 +158,7 @@ class RawGetCommand(RdmcCommandBase):
         else:
             if self._rdmc.app.config.get_url():
                 url = self._rdmc.app.config.get_url()
-        if url and not "https://" in url:
+        if url and not "://" in url:
             url = "https://" + url
 
         return url
@@ -25,7 +25,7 @@ from optparse import OptionParser, SUPPRESS_HELP
 
 from rdmc_base_classes import RdmcCommandBase
 from rdmc_helper import ReturnCodes, InvalidCommandLineError, InvalidFileFormattingError, \
-                    InvalidCommandLineErrorOPTS, InvalidFileInputError, Encryption
+                    InvalidCommandLineErrorOPTS, InvalidFileInputError
 
 class RawPatchCommand(RdmcCommandBase):
     """ Raw form of the patch command """
@@ -62,9 +62,7 @@ class RawPatchCommand(RdmcCommandBase):
         headers = {}
         results = None
 
-        if options.encode and options.user and options.password:
-            options.user = Encryption.decode_credentials(options.user)
-            options.password = Encryption.decode_credentials(options.password)
+        self._rdmc.app.context.decode(options)
 
         if options.sessionid:
             url = self.sessionvalidation(options)
@@ -131,34 +129,11 @@ class RawPatchCommand(RdmcCommandBase):
         :param options: command line options
         :type options: list.
         """
-        inputline = list()
-
-        try:
-            client = self._rdmc.app.get_current_client()
-            if options.user and options.password:
-                if not client.get_username():
-                    client.set_username(options.user)
-                if not client.get_password():
-                    client.set_password(options.password)
-
+        (client, inputline) = self._rdmc.app.context.resolve(options)
+        if client:
             if options.biospassword:
                 self._rdmc.app.update_bios_password(options.biospassword)
-        except:
-            if options.user or options.password or options.url:
-                if options.url:
-                    inputline.extend([options.url])
-                if options.user:
-                    inputline.extend(["-u", options.user])
-                if options.password:
-                    inputline.extend(["-p", options.password])
-            else:
-                if self._rdmc.app.config.get_url():
-                    inputline.extend([self._rdmc.app.config.get_url()])
-                if self._rdmc.app.config.get_username():
-                    inputline.extend(["-u", self._rdmc.app.config.get_username()])
-                if self._rdmc.app.config.get_password():
-                    inputline.extend(["-p", self._rdmc.app.config.get_password()])
-
+        else:
             self.lobobj.loginfunction(inputline, skipbuild=True)
 
     def sessionvalidation(self, options):
@@ -175,7 +150,7 @@ class RawPatchCommand(RdmcCommandBase):
         else:
             if self._rdmc.app.config.get_url():
                 url = self._rdmc.app.config.get_url()
-        if url and not "https://" in url:
+        if url and not "://" in url:
             url = "https://" + url
 
         return url
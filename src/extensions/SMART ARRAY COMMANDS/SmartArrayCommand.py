@@ -21,7 +21,8 @@ import sys
 
 from optparse import OptionParser, SUPPRESS_HELP
 from rdmc_base_classes import RdmcCommandBase, HARDCODEDLIST
-from rdmc_helper import ReturnCodes, InvalidCommandLineError, Encryption, \
+from rdmc_tabular import FORMATS, tabularwriter
+from rdmc_helper import ReturnCodes, InvalidCommandLineError, \
                     IncompatableServerTypeError, InvalidCommandLineErrorOPTS, UI
 
 class SmartArrayCommand(RdmcCommandBase):
@@ -76,8 +77,11 @@ class SmartArrayCommand(RdmcCommandBase):
 
         self.selobj.selectfunction("SmartStorageConfig")
         content = self._rdmc.app.getprops()
+        writer = tabularwriter(options)
 
-        if options.controller:
+        if writer:
+            self.tabular_output(options, content, writer)
+        elif options.controller:
             self.selection_output(options, content)
         else:
             self.discovery_output(options, content)
@@ -93,9 +97,79 @@ class SmartArrayCommand(RdmcCommandBase):
         :param options: list of contents
         :type options: list.
         """
-        controllist = []
         outputcontent = False
 
+        for controller in self.selected_controllers(options, content):
+            if options.physicaldrives or options.pdrive:
+                outputcontent = True
+                try:
+                    self.get_drives(options, controller["PhysicalDrives"], physical=True)
+                except KeyError as excp:
+                    if excp.message == "PhysicalDrives":
+                        raise IncompatableServerTypeError("Cannot "\
+                            "configure physical drives using this controller.")
+
+            if options.logicaldrives or options.ldrive:
+                outputcontent = True
+                self.get_drives(options, controller["LogicalDrives"], logical=True)
+
+            if not outputcontent:
+                for k in list(controller.keys()):
+                    if k.lower() in HARDCODEDLIST or '@odata' in k.lower():
+                        del controller[k]
+
+                UI().print_out_json_ordered(controller)
+
+    def tabular_output(self, options, content, writer):
+        """ Rows of the controllers, or of their drives when drives are
+        requested, for the format option
+
+        :param options: command line options
+        :type options: list.
+        :param content: list of contents
+        :type content: list.
+        :param writer: writer of the rows
+        :type writer: TabularWriter.
+        """
+        physical = options.physicaldrives or options.pdrive
+        logical = options.logicaldrives or options.ldrive
+        controllist = self.selected_controllers(options, content) if options.controller \
+                                                                            else content
+
+        for controller in controllist:
+            if physical:
+                if "PhysicalDrives" not in controller:
+                    raise IncompatableServerTypeError("Cannot "\
+                        "configure physical drives using this controller.")
+                if options.pdrive:
+                    drive = self.find_drive(controller["PhysicalDrives"], options.pdrive, \
+                                                                                "Location")
+                    writer.writerows(self.selected_drives(drive["Location"]))
+                else:
+                    writer.writerows(controller["PhysicalDrives"])
+
+            if logical:
+                if options.ldrive:
+                    writer.writerow(self.find_drive(controller["LogicalDrives"], \
+                                            options.ldrive, "VolumeUniqueIdentifier"))
+                else:
+                    writer.writerows(controller["LogicalDrives"])
+
+            if not physical and not logical:
+                writer.writerow(dict((k, v) for (k, v) in controller.items() if not \
+                                    (k.lower() in HARDCODEDLIST or '@odata' in k.lower())))
+
+    def selected_controllers(self, options, content):
+        """ Controllers of the controller option, by index or by location
+
+        :param options: command line options
+        :type options: list.
+        :param content: list of contents
+        :type content: list.
+        :returns: returns a list of controllers
+        """
+        controllist = []
+
         if options.controller.isdigit() and not options.controller == '0':
             try:
                 controllist.append(content[int(options.controller) - 1])
@@ -109,27 +183,7 @@ class SmartArrayCommand(RdmcCommandBase):
         if not controllist:
             raise InvalidCommandLineError("Selected controller not " \
                                         "found in the current inventory list.")
-        else:
-            for controller in controllist:
-                if options.physicaldrives or options.pdrive:
-                    outputcontent = True
-                    try:
-                        self.get_drives(options, controller["PhysicalDrives"], physical=True)
-                    except KeyError as excp:
-                        if excp.message == "PhysicalDrives":
-                            raise IncompatableServerTypeError("Cannot "\
-                                "configure physical drives using this controller.")
-
-                if options.logicaldrives or options.ldrive:
-                    outputcontent = True
-                    self.get_drives(options, controller["LogicalDrives"], logical=True)
-
-                if not outputcontent:
-                    for k in list(controller.keys()):
-                        if k.lower() in HARDCODEDLIST or '@odata' in k.lower():
-                            del controller[k]
-
-                    UI().print_out_json_ordered(controller)
+        return controllist
 
     def discovery_output(self, options, content):
         """ Discovery of output for smart array command
@@ -173,41 +227,11 @@ class SmartArrayCommand(RdmcCommandBase):
 
         if drives:
             if options.pdrive:
-                driveloc = None
-
-                if options.pdrive.isdigit():
-                    try:
-                        driveloc = drives[int(options.pdrive) - 1]["Location"]
-                    except:
-                        pass
-                else:
-                    for drive in drives:
-                        if options.pdrive.lower() == drive["Location"].lower():
-                            driveloc = drive["Location"]
-
-                if not driveloc:
-                    raise InvalidCommandLineError("Selected drive not " \
-                                          "found in the current drives list.")
-                else:
-                    self.get_selected_drive(driveloc)
+                driveloc = self.find_drive(drives, options.pdrive, "Location")["Location"]
+                self.get_selected_drive(driveloc)
             elif options.ldrive:
-                driveloc = None
-
-                if options.ldrive.isdigit():
-                    try:
-                        driveloc = drives[int(options.ldrive) - 1]
-                    except:
-                        pass
-                else:
-                    for drive in drives:
-                        if options.ldrive.lower() == drive["VolumeUniqueIdentifier"].lower():
-                            driveloc = drive
-
-                if not driveloc:
-                    raise InvalidCommandLineError("Selected drive not " \
-                                          "found in the current drives list.")
-                else:
-                    UI().print_out_json_ordered(driveloc)
+                driveloc = self.find_drive(drives, options.ldrive, "VolumeUniqueIdentifier")
+                UI().print_out_json_ordered(driveloc)
             else:
                 for idx, drive in enumerate(drives):
                     if physical:
@@ -227,21 +251,60 @@ class SmartArrayCommand(RdmcCommandBase):
 
         sys.stdout.write("\n")
 
+    def find_drive(self, drives, drive, key):
+        """ Drive of a drive option, by index or by the value of a key
+
+        :param drives: list of drives
+        :type drives: list.
+        :param drive: index or value of the drive option
+        :type drive: str.
+        :param key: property the drive option is compared to
+        :type key: str.
+        :returns: returns the drive
+        """
+        driveloc = None
+
+        if drive.isdigit():
+            try:
+                driveloc = drives[int(drive) - 1]
+            except:
+                pass
+        else:
+            for item in drives:
+                if drive.lower() == item[key].lower():
+                    driveloc = item
+
+        if not driveloc:
+            raise InvalidCommandLineError("Selected drive not " \
+                                  "found in the current drives list.")
+        return driveloc
+
     def get_selected_drive(self, location):
         """ Function to get all selected drives
 
         :param location: list of all locations
         :type location: list.
         """
+        for drive in self.selected_drives(location):
+            UI().print_out_json_ordered(drive)
+
+    def selected_drives(self, location):
+        """ Physical drives at a location, without their reserved properties,
+        produced one drive at a time
+
+        :param location: list of all locations
+        :type location: list.
+        :returns: returns an iterator of drives
+        """
         self.selobj.selectfunction("HpSmartStorageDiskDrive.")
 
-        for drive in self._rdmc.app.getprops():
+        for drive in self._rdmc.app.iterprops():
             if drive["Location"] in location:
                 for k in list(drive.keys()):
                     if k.lower() in HARDCODEDLIST or '@odata' in k.lower():
                         del drive[k]
 
-                UI().print_out_json_ordered(drive)
+                yield drive
 
     def smartarrayvalidation(self, options):
         """ Smart array validation function
@@ -249,36 +312,9 @@ class SmartArrayCommand(RdmcCommandBase):
         :param options: command line options
         :type options: list.
         """
-        client = None
-        inputline = list()
         runlogin = False
 
-        if options.encode and options.user and options.password:
-            options.user = Encryption.decode_credentials(options.user)
-            options.password = Encryption.decode_credentials(options.password)
-
-        try:
-            client = self._rdmc.app.get_current_client()
-            if options.user and options.password:
-                if not client.get_username():
-                    client.set_username(options.user)
-                if not client.get_password():
-                    client.set_password(options.password)
-        except:
-            if options.user or options.password or options.url:
-                if options.url:
-                    inputline.extend([options.url])
-                if options.user:
-                    inputline.extend(["-u", options.user])
-                if options.password:
-                    inputline.extend(["-p", options.password])
-            else:
-                if self._rdmc.app.config.get_url():
-                    inputline.extend([self._rdmc.app.config.get_url()])
-                if self._rdmc.app.config.get_username():
-                    inputline.extend(["-u", self._rdmc.app.config.get_username()])
-                if self._rdmc.app.config.get_password():
-                    inputline.extend(["-p", self._rdmc.app.config.get_password()])
+        (client, inputline) = self._rdmc.app.context.resolve(options)
 
         if inputline or not client:
             runlogin = True
@@ -353,6 +389,24 @@ class SmartArrayCommand(RdmcCommandBase):
             help="""Use this flag to select the corresponding logical disk.""",
             default=None,
         )
+        customparser.add_option(
+            '--format',
+            dest='format',
+            type='choice',
+            choices=list(FORMATS),
+            help="""Use this flag to write one row per controller, or per """
+            """drive of the drive flags, in CSV, TSV or newline delimited """
+            """JSON format. Valid choices are: csv, tsv, ndjson""",
+            default=None,
+        )
+        customparser.add_option(
+            '--columns',
+            dest='columns',
+            help="""Use this flag with the format flag to choose the columns """
+            """of the rows and their order, separated by commas. Nested """
+            """properties are separated by /.""",
+            default=None,
+        )
         customparser.add_option(
             '-e',
             '--enc',
@@ -22,13 +22,15 @@ import json
 import getpass
 
 from optparse import OptionParser, OptionValueError, SUPPRESS_HELP
+from collections import OrderedDict
 
 from redfish.ris.rmc_helper import IdTokenError
 
 from rdmc_base_classes import RdmcCommandBase
+from rdmc_tabular import FORMATS, tabularwriter
 from rdmc_helper import ReturnCodes, InvalidCommandLineError, ResourceExists, \
                 InvalidCommandLineErrorOPTS, NoContentsFoundForOperationError, \
-                IncompatibleiLOVersionError, Encryption
+                IncompatibleiLOVersionError
 
 def account_parse(option, opt_str, value, parser):
     """ Account privileges option helper"""
@@ -161,7 +163,8 @@ class IloAccountsCommand(RdmcCommandBase):
 
         outdict = dict()
         if not args:
-            if not options.json:
+            writer = tabularwriter(options)
+            if not options.json and not writer:
                 sys.stdout.write("iLO Account info: \n[Id] UserName (LoginName): "\
                                 "\nPrivileges\n-----------------\n")
             for acct in sorted(results, key=lambda k: int(k['Id'])):
@@ -173,6 +176,12 @@ class IloAccountsCommand(RdmcCommandBase):
                     service = 'ServiceAccount=True'
                 else:
                     service = 'ServiceAccount=False'
+                if writer:
+                    writer.writerow(OrderedDict([('Id', acct['Id']), ('UserName', \
+                        acct['UserName']), ('LoginName', acct['Oem'][self.typepath.defs.\
+                        oemhp]['LoginName']), ('ServiceAccount', service == \
+                        'ServiceAccount=True'), ('Privileges', privs)]))
+                    continue
                 if not options.json:
                     for priv in privs:
                         privstr += priv + '=' + str(privs[priv]) + '\n'
@@ -373,35 +382,8 @@ class IloAccountsCommand(RdmcCommandBase):
         :param options: command line options
         :type options: list.
         """
-        inputline = list()
-
-        if options.encode and options.user and options.password:
-            options.user = Encryption.decode_credentials(options.user)
-            options.password = Encryption.decode_credentials(options.password)
-
-        try:
-            client = self._rdmc.app.get_current_client()
-            if options.user and options.password:
-                if not client.get_username():
-                    client.set_username(options.user)
-                if not client.get_password():
-                    client.set_password(options.password)
-        except:
-            if options.user or options.password or options.url:
-                if options.url:
-                    inputline.extend([options.url])
-                if options.user:
-                    inputline.extend(["-u", options.user])
-                if options.password:
-                    inputline.extend(["-p", options.password])
-            else:
-                if self._rdmc.app.config.get_url():
-                    inputline.extend([self._rdmc.app.config.get_url()])
-                if self._rdmc.app.config.get_username():
-                    inputline.extend(["-u", self._rdmc.app.config.get_username()])
-                if self._rdmc.app.config.get_password():
-                    inputline.extend(["-p", self._rdmc.app.config.get_password()])
-
+        (client, inputline) = self._rdmc.app.context.resolve(options)
+        if not client:
             if not inputline:
                 sys.stdout.write('Local login initiated...\n')
             self.lobobj.loginfunction(inputline)
@@ -488,6 +470,26 @@ class IloAccountsCommand(RdmcCommandBase):
             " structure makes the information easier to parse.",
             default=False
         )
+        customparser.add_option(
+            '--format',
+            dest='format',
+            type='choice',
+            choices=list(FORMATS),
+            help="Optionally include this flag to write one row per account"\
+            " in CSV, TSV or newline delimited JSON format when listing accounts."\
+            " Nested properties become columns named by their path."\
+            " Valid choices are: csv, tsv, ndjson",
+            default=None
+        )
+        customparser.add_option(
+            '--columns',
+            dest='columns',
+            help="Optionally include this flag with the format flag to choose"\
+            " the columns of the rows and their order, separated by commas."\
+            " Nested properties are separated by /. EX: --columns=Id,UserName,"\
+            "Privileges/LoginPriv",
+            default=None
+        )
         customparser.add_option(
             '-e',
             '--enc',
@@ -20,7 +20,6 @@
 import os
 import sys
 import json
-import time
 import getpass
 import redfish.ris
 
@@ -30,10 +29,11 @@ from six.moves.urllib.request import urlopen
 from optparse import OptionParser, SUPPRESS_HELP
 
 from rdmc_base_classes import RdmcCommandBase
+from rdmc_retry import RetryPolicy, wait_for_ilo_reset
 from rdmc_helper import ReturnCodes, InvalidCommandLineError,\
                     InvalidCommandLineErrorOPTS, InvalidFileFormattingError, \
                     InvalidFileInputError, NoContentsFoundForOperationError, \
-                    IncompatibleiLOVersionError, Encryption
+                    IncompatibleiLOVersionError, Encryption, TimeOutError
 
 class IloCloneCommand(RdmcCommandBase):
     """ Clone iLO config of currently logged in server and copy it to another """
@@ -258,7 +258,8 @@ class IloCloneCommand(RdmcCommandBase):
          :type testing: bool
          """
         clone = self.load_clone(myfile, options)
-        if self._rdmc.app.current_client.get_base_url() == "blobstore://.":
+        baseurl = self._rdmc.app.current_client.get_base_url()
+        if baseurl == "blobstore://.":
             logininfo = ""
             ping = True
         elif options.url and options.user and options.password:
@@ -306,7 +307,7 @@ class IloCloneCommand(RdmcCommandBase):
 
                             if 'resettofactorydefaults' in path.lower():
                                 self.logobj.run("")
-                                self.timer(minutes=3, ping=ping)
+                                self.timer(minutes=10, ping=ping, url=baseurl)
                                 self.loginobj.run(logininfo)
                             elif 'manager.reset' in path.lower():
                                 sys.stdout.write("Waiting for iLO to reset..." \
@@ -315,7 +316,7 @@ class IloCloneCommand(RdmcCommandBase):
                                 self._rdmc.app.post_handler(path,\
                                             item[path]['POST'], service=True, \
                                             silent=True)
-                                self.timer(minutes=3, ping=ping)
+                                self.timer(minutes=10, ping=ping, url=baseurl)
                                 self.loginobj.run(logininfo)
                             else:
                                 sys.stdout.write('\nPosting: ' + path + '\n')
@@ -923,62 +924,42 @@ class IloCloneCommand(RdmcCommandBase):
 
         return loadcontents
 
-    def timer(self, minutes=1, ping=False):
-        """ helper that waits a certain number of minutes before returning or
-        pings a server until service is restored (ping only available in local)
+    def timer(self, minutes=1, ping=False, url=None):
+        """ helper that waits for iLO to come back after a reset, giving up
+        after a certain number of minutes. In local mode (ping) it also waits
+        for the BIOS provider to be selectable again.
 
-        :param minutes: time in minutes
+        :param minutes: maximum time to wait in minutes
         :type minutes: int
-        :param ping: value indicating if ping or timer function
+        :param ping: value indicating if BIOS readiness should be checked
         :type ping: bool
+        :param url: url of the iLO being reset
+        :type url: str
         """
-        if ping:
-            results = None
-            timeout = 0
+        policy = RetryPolicy(initial=5, maximum=30, deadline=minutes * 60)
 
-            while True:
-                if not results:
-                    try:
-                        if timeout == 0:
-                            time.sleep(10)
-
-                        self._rdmc.app.login(is_redfish=True)
-                        results = self._rdmc.app.get_handler(self.typepath.\
-                                                    defs.startpath, silent=True)
-
-                        timeout = 0
-                        self._rdmc.app.logout()
-                    except:
-                        self._rdmc.app.logout()
-                        time.sleep(5)
-                        timeout += 1
-                else:
-                    try:
-                        if timeout == 0:
-                            time.sleep(10)
-
-                        self._rdmc.app.login(is_redfish=True)
-                        self._rdmc.app.select(selector=self.typepath.defs.biostype)
-                        time.sleep(10)
-                        self._rdmc.app.logout()
-                        return
-                    except:
-                        self._rdmc.app.logout()
-                        time.sleep(5)
-                        timeout += 1
-
-                if timeout >= 60:
-                    raise NoContentsFoundForOperationError("Unable to connect" \
-                                                                    " to iLO.")
-        else:
-            for minute in range(minutes):
-                if minute + 1 == minutes:
-                    sys.stdout.write("1 minute remaining...\n")
-                else:
-                    sys.stdout.write("%s minutes remaining...\n" \
-                                                        % str(minutes-minute))
+        try:
+            wait_for_ilo_reset(url, proxy=self._rdmc.opts.proxy, policy=policy)
+
+            if ping:
+                policy.wait_until(self.bios_ready)
+        except TimeOutError:
+            raise NoContentsFoundForOperationError("Unable to connect to iLO.")
+
+    def bios_ready(self):
+        """ helper that checks if the BIOS type can be selected after an iLO
+        reset (local only)
 
-                time.sleep(60)
+        :returns: returns True if the BIOS type is available
+        """
+        try:
+            self._rdmc.app.login(is_redfish=True)
+            self._rdmc.app.select(selector=self.typepath.defs.biostype)
+            return True
+        except Exception:
+            return False
+        finally:
+            self._rdmc.app.logout()
 
     def clonevalidation(self, options):
         """ results method validation function
@@ -986,37 +967,7 @@ class IloCloneCommand(RdmcCommandBase):
         :param options: command line options
         :type options: list.
         """
-        client = None
-        inputline = list()
-
-        if options.encode and options.user and options.password:
-            options.user = Encryption.decode_credentials(options.user)
-            options.password = Encryption.decode_credentials(options.password)
-
-        try:
-            client = self._rdmc.app.get_current_client()
-            if options.user and options.password:
-                if not client.get_username():
-                    client.set_username(options.user)
-                if not client.get_password():
-                    client.set_password(options.password)
-        except:
-            if options.user or options.password or options.url:
-                if options.url:
-                    inputline.extend([options.url])
-                if options.user:
-                    inputline.extend(["-u", options.user])
-                if options.password:
-                    inputline.extend(["-p", options.password])
-            else:
-                if self._rdmc.app.config.get_url():
-                    inputline.extend([self._rdmc.app.config.get_url()])
-                if self._rdmc.app.config.get_username():
-                    inputline.extend(["-u", \
-                                  self._rdmc.app.config.get_username()])
-                if self._rdmc.app.config.get_password():
-                    inputline.extend(["-p", \
-                                  self._rdmc.app.config.get_password()])
+        (client, inputline) = self._rdmc.app.context.resolve(options)
 
         if inputline:
             self.loginobj.loginfunction(inputline)
@@ -0,0 +1,240 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+""" Schema Pack Command for rdmc """
+
+import os
+import sys
+import shutil
+
+from optparse import OptionParser, SUPPRESS_HELP
+from rdmc_base_classes import RdmcCommandBase
+from rdmc_helper import ReturnCodes, InvalidCommandLineError, InvalidCommandLineErrorOPTS, \
+                        InvalidFileInputError, NoContentsFoundForOperationError, \
+                        LOGGER
+from rdmc_crawler import fetchall
+from rdmc_schemacache import SCHEMA, makedirs, documentlocations, documentresponses
+from rdmc_schemapack import SchemaPack, SchemaPackWriter, PACK_EXTENSION, bundledocuments
+
+class SchemaPackCommand(RdmcCommandBase):
+    """ Build offline schema packs """
+    def __init__(self, rdmcObj):
+        RdmcCommandBase.__init__(self,\
+            name='schemapack',\
+            usage='schemapack [OPTIONS]\n\n\t'\
+                'Build a schema pack of the schemas and registries of the '\
+                'currently logged in server.\n\texample: schemapack -f '\
+                'gen10.schemapack\n\n\tBuild a schema pack from downloaded '\
+                'schema bundles, no login\n\tneeded.\n\texample: schemapack '\
+                '--bundle DSP8010_2017.3 --bundle registries.zip\n\n\tCopy '\
+                'the new pack to the schema cache directory, where it\n\tis '\
+                'used in place of the server downloads. A pack that\n\talready '\
+                'exists is imported as it is, no login needed.\n\texample: '\
+                'schemapack -f gen10.schemapack --import',\
+            summary='Builds an offline pack of schemas and registries.',\
+            aliases=None,\
+            optparser=OptionParser())
+        self.definearguments(self.parser)
+        self._rdmc = rdmcObj
+        self.typepath = rdmcObj.app.typepath
+        self.lobobj = rdmcObj.commands_dict["LoginCommand"](rdmcObj)
+
+    def run(self, line):
+        """Main schemapack Function
+
+        :param line: string of arguments passed in
+        :type line: str.
+        """
+        try:
+            (options, args) = self._parse_arglist(line)
+        except:
+            if ("-h" in line) or ("--help" in line):
+                return ReturnCodes.SUCCESS
+            else:
+                raise InvalidCommandLineErrorOPTS("")
+
+        if args:
+            raise InvalidCommandLineError("schemapack command takes no arguments.")
+
+        if not options.filename.endswith(PACK_EXTENSION):
+            options.filename += PACK_EXTENSION
+
+        if options.importpack and not options.bundle and os.path.isfile(options.filename):
+            #A pack built on another host, such as one without access to the server
+            pack = SchemaPack(options.filename)
+            try:
+                _ = pack.index
+            finally:
+                pack.close()
+            self.importpack(options.filename)
+            return ReturnCodes.SUCCESS
+
+        writer = SchemaPackWriter()
+        if options.bundle:
+            for bundle in options.bundle:
+                if not os.path.exists(bundle):
+                    raise InvalidFileInputError("Schema bundle '%s' was not found." % bundle)
+                for document in bundledocuments(bundle):
+                    writer.add(*document)
+        else:
+            self.schemapackvalidation(options)
+            self.serverdocuments(writer)
+
+        if not writer.documents:
+            raise NoContentsFoundForOperationError("No schemas or registries were found.")
+
+        count = writer.write(options.filename)
+        sys.stdout.write("Schema pack '%s' written with %s documents.\n" % \
+                                                            (options.filename, count))
+
+        if options.importpack:
+            self.importpack(options.filename)
+
+        return ReturnCodes.SUCCESS
+
+    def serverdocuments(self, writer):
+        """ Download the schemas and registries of the logged in server
+
+        :param writer: pack to add the documents to
+        :type writer: SchemaPackWriter.
+        """
+        app = self._rdmc.app
+        if not app.getiloversion():
+            raise NoContentsFoundForOperationError("Schemas and registries are not "\
+                                                   "available on this server.")
+
+        client = app.get_current_client()
+        defs = self.typepath.defs
+        bodies = [resp.dict for resp in documentresponses(app)]
+
+        #Collections that were not expanded only link to their members
+        hrefs = set()
+        for body in bodies:
+            for member in body.get(defs.collectionstring, []):
+                if isinstance(member, dict) and 'Location' not in member and \
+                                    member.get(app.monolith._hrefstring):
+                    hrefs.add(member[app.monolith._hrefstring])
+        hrefs = sorted(href for href in hrefs if href not in app.monolith.paths)
+        bodies += [resp.dict for resp in fetchall(client, hrefs, \
+                        workers=self._rdmc.opts.crawlworkers) if resp.status == 200]
+
+        locations = list(documentlocations(bodies, defs.collectionstring).values())
+        resps = fetchall(client, [uri for _, _, _, uri in locations], \
+                                                workers=self._rdmc.opts.crawlworkers)
+        for (kind, identifier, language, uri), resp in zip(locations, resps):
+            if resp.status == 200 and resp.read:
+                writer.add(kind, identifier, language, resp.read)
+            else:
+                LOGGER.info("Unable to download %s, status %s.", uri, resp.status)
+
+    def importpack(self, filename):
+        """ Copy a pack to the schema cache directory
+
+        :param filename: pack file name
+        :type filename: str.
+        """
+        caches = self._rdmc.app.schemacaches
+        if not caches or not caches.get(SCHEMA):
+            raise InvalidCommandLineError("Schema caching is disabled, set iloschemadir "\
+                                          "or remove the --nocache option to import packs.")
+
+        directory = caches[SCHEMA].directory
+        target = os.path.join(directory, os.path.basename(filename))
+        if os.path.abspath(target) != os.path.abspath(filename):
+            makedirs(directory)
+            shutil.copyfile(filename, target)
+        sys.stdout.write("Schema pack imported to '%s'.\n" % target)
+
+    def schemapackvalidation(self, options):
+        """ schemapack validation function
+
+        :param options: command line options
+        :type options: list.
+        """
+        (client, inputline) = self._rdmc.app.context.resolve(options)
+
+        if inputline:
+            self.lobobj.loginfunction(inputline)
+        elif not client:
+            raise InvalidCommandLineError("Please login or pass credentials" \
+                                          " to complete the operation.")
+
+    def definearguments(self, customparser):
+        """ Wrapper function for new command main function
+
+        :param customparser: command line input
+        :type customparser: parser.
+        """
+        if not customparser:
+            return
+        customparser.add_option(
+            '--url',
+            dest='url',
+            help="Use the provided iLO URL to login.",
+            default=None,
+        )
+        customparser.add_option(
+            '-u',
+            '--user',
+            dest='user',
+            help="If you are not logged in yet, including this flag along"\
+            " with the password and URL flags can be used to log into a"\
+            " server in the same command.""",
+            default=None,
+        )
+        customparser.add_option(
+            '-p',
+            '--password',
+            dest='password',
+            help="""Use the provided iLO password to log in.""",
+            default=None,
+        )
+        customparser.add_option(
+            '-f',
+            '--filename',
+            dest='filename',
+            help="Use this flag to name the schema pack. The default file"\
+            " name is ilorest.schemapack.",
+            default='ilorest.schemapack',
+        )
+        customparser.add_option(
+            '--bundle',
+            dest='bundle',
+            action='append',
+            help="Build the pack from a directory or zip archive of schema"\
+            " and registry JSON files instead of the logged in server. Can"\
+            " be used multiple times.",
+            default=None,
+        )
+        customparser.add_option(
+            '--import',
+            dest='importpack',
+            action='store_true',
+            help="Copy the schema pack to the iLO schema cache directory"\
+            " (iloschemadir), where it is used in place of the schema and"\
+            " registry downloads. Without the bundle flag an existing pack"\
+            " is imported as it is.",
+            default=False,
+        )
+        customparser.add_option(
+            '-e',
+            '--enc',
+            dest='encode',
+            action='store_true',
+            help=SUPPRESS_HELP,
+            default=False,
+        )
@@ -23,7 +23,6 @@ import os.path
 import sys
 import copy
 import json
-import time
 import getpass
 import traceback
 
@@ -36,6 +35,9 @@ import redfish.ris
 from redfish.ris.rmc_helper import (IloResponseError, IdTokenError, InstanceNotFoundError)
 from six.moves import input
 from rdmc_base_classes import RdmcCommandBase
+from rdmc_retry import wait_for_ilo_reset
+from rdmc_crawler import crawl
+from rdmc_typeindex import TypeIndex
 
 from rdmc_helper import ReturnCodes, InvalidCommandLineError, InvalidKeyError, Encryption, \
             InvalidCommandLineErrorOPTS, InvalidFileInputError, NoChangesFoundOrMadeError, \
@@ -240,29 +242,16 @@ class ServerCloneCommand(RdmcCommandBase):
 
         unsupported_types_list = ['Collection', 'PowerMeter', 'HpeBiosMapping']
 
-        _types = _types2 = list()
         _types = sorted(set(self._rdmc.app.types('--fulltypes')))
+        index = TypeIndex(_types)
 
-        #supported types comparison
-        _types2 = []
-        for _type in _types:
-            for stype in supported_types_list:
-                if stype.lower() in _type.lower():
-                    _types2.append(_type)
-                    break
-
-        #unsupported types comparison
-        _types = _types2
-        _types2 = []
-        for _type in _types:
-            found = False
-            for utype in unsupported_types_list:
-                if utype.lower() in _type.lower():
-                    found = True
-            if not found:
-                _types2.append(_type)
+        supported = set(_type for stype in supported_types_list for _type in \
+                                                                index.search(stype))
+        unsupported = set(_type for utype in unsupported_types_list for _type in \
+                                                                index.search(utype))
 
-        return _types2
+        return [_type for _type in _types if _type in supported and _type not in \
+                                                                            unsupported]
 
     def loadfunction(self, options):
         """
@@ -331,11 +320,13 @@ class ServerCloneCommand(RdmcCommandBase):
             self.archive_handler()
 
         if reset_confirm:
+            base_url = self._rdmc.app.current_client.get_base_url()
+            proxy = self._rdmc.app.current_client.get_proxy()
             if 'http' not in self._rdmc.app._rmc_clients._rest_client.base_url:
                 sys.stdout.write("Resetting iLO...\n")
                 self.iloresetobj.run("")
-                sys.stdout.write("Sleeping 120 seconds for iLO reset...\n")
-                time.sleep(120)
+                sys.stdout.write("Waiting for iLO reset to complete...\n")
+                wait_for_ilo_reset(base_url, proxy=proxy)
                 sys.stdout.write("Resetting System...\n")
                 self.reboot_server()
             else:
@@ -343,8 +334,8 @@ class ServerCloneCommand(RdmcCommandBase):
                 self.reboot_server()
                 sys.stdout.write("Resetting iLO...\n")
                 self.iloresetobj.run("")
-                sys.stdout.write("Sleeping 120 seconds for iLO reset...\n")
-                time.sleep(120)
+                sys.stdout.write("Waiting for iLO reset to complete...\n")
+                wait_for_ilo_reset(base_url, proxy=proxy)
         else:
             sys.stdout.write("Aborting Server Reboot and iLO reset...\n")
             sys.stdout.write("TestMode...%s\n" % options.testmode)
@@ -571,6 +562,7 @@ class ServerCloneCommand(RdmcCommandBase):
         """
         data = OrderedDict()
         data.update(self._rdmc.app.create_save_header(selectignore=True))
+        self.prefetch(typelist)
 
         for _type in typelist:
             self.gatherandsavehelper(_type, data, options)
@@ -585,10 +577,29 @@ class ServerCloneCommand(RdmcCommandBase):
 
         outfile.close()
 
+    def prefetch(self, typelist):
+        """
+        Reload the instances of every type to save at once with the concurrent
+        crawler, instead of one instance at a time while saving each type.
+
+        :param typelist: list of available types on iLO
+        :type typelist: list
+        """
+        monolith = self._rdmc.app.current_client.monolith
+        selectors = [_type.split('.')[0].split('#')[-1].lower() + '.' for _type in typelist]
+        paths = sorted(path for path, member in monolith.paths.items() if any(sel in \
+                                    (member.maj_type or '').lower() for sel in selectors))
+
+        crawl(monolith, paths, workers=self._rdmc.opts.crawlworkers, reload=True)
+
+        for path in paths:
+            if monolith.path(path):
+                monolith.path(path).patches = []
+
     def gatherandsavehelper(self, _type, data, options):
         """
         Collect data on types and parse properties (delete unnecessary/readonly/
-        empty properties.
+        empty properties. Instances are reloaded by prefetch beforehand.
 
         :param type: type for subsequent select and save
         :type type: string
@@ -603,15 +614,13 @@ class ServerCloneCommand(RdmcCommandBase):
         try:
             if 'EthernetInterface' in _type:
                 instances = self._rdmc.app.select(_typep + '.', \
-                            (self.typepath.defs.hrefstring, self.typepath.defs.managerpath + '*'), \
-                                                                                        rel=True)
+                            (self.typepath.defs.hrefstring, self.typepath.defs.managerpath + '*'))
             #'links/self/href' required when using iLO 4 (rest).
             elif 'EthernetNetworkInterface' in _type:
                 instances = self._rdmc.app.select(_typep + '.', ("links/self/" + \
-                            self.typepath.defs.hrefstring, self.typepath.defs.managerpath + '*'), \
-                                                                                        rel=True)
+                            self.typepath.defs.hrefstring, self.typepath.defs.managerpath + '*'))
             else:
-                instances = self._rdmc.app.select(_typep + '.', rel=True)
+                instances = self._rdmc.app.select(_typep + '.')
 
             for j, instance in enumerate(self._rdmc.app.getprops(insts=instances)):
                 if '#' in _typep:
@@ -2021,37 +2030,7 @@ class ServerCloneCommand(RdmcCommandBase):
         :type options: list.
 
         """
-        client = None
-        inputline = list()
-
-        if options.encode and options.user and options.password:
-            options.user = Encryption.decode_credentials(options.user)
-            options.password = Encryption.decode_credentials(options.password)
-
-        try:
-            client = self._rdmc.app.get_current_client()
-            if options.user and options.password:
-                if not client.get_username():
-                    client.set_username(options.user)
-                if not client.get_password():
-                    client.set_password(options.password)
-        except:
-            if options.user or options.password or options.url:
-                if options.url:
-                    inputline.extend([options.url])
-                if options.user:
-                    inputline.extend(["-u", options.user])
-                if options.password:
-                    inputline.extend(["-p", options.password])
-            else:
-                if self._rdmc.app.config.get_url():
-                    inputline.extend([self._rdmc.app.config.get_url()])
-                if self._rdmc.app.config.get_username():
-                    inputline.extend(["-u", \
-                                  self._rdmc.app.config.get_username()])
-                if self._rdmc.app.config.get_password():
-                    inputline.extend(["-p", \
-                                  self._rdmc.app.config.get_password()])
+        (client, inputline) = self._rdmc.app.context.resolve(options)
 
         if inputline or not client:
             self.loginobj.loginfunction(inputline)
@@ -31,6 +31,9 @@ import itertools
 import subprocess
 
 from optparse import OptionParser, SUPPRESS_HELP
+from collections import OrderedDict
+
+import six
 
 from six.moves import queue
 
@@ -39,9 +42,15 @@ import redfish.hpilo.risblobstore2 as risblobstore2
 from redfish.rest.v1 import SecurityStateError
 
 from rdmc_base_classes import RdmcCommandBase
+from rdmc_chif import CHIF
+from rdmc_cachepolicy import OFF
+from rdmc_crawler import normalize
+from rdmc_logstore import INDEXED, LOGTYPE
+from rdmc_query import FILTERQUERY, filterexpr, querypath, supports
+from rdmc_tabular import FORMATS, tabularwriter
 from rdmc_helper import ReturnCodes, InvalidCommandLineError, InvalidMSCfileInputError, UI, \
                 InvalidCommandLineErrorOPTS, InvalidFileInputError, LOGGER, InvalidCListFileError,\
-                NoContentsFoundForOperationError, IncompatibleiLOVersionError, Encryption, \
+                NoContentsFoundForOperationError, IncompatibleiLOVersionError, \
                 PartitionMoutingError, MultipleServerConfigError, UnabletoFindDriveError
 
 if os.name == 'nt':
@@ -139,6 +148,8 @@ class ServerlogsCommand(RdmcCommandBase):
             path = self.returnielpath(options=options)
         elif options.service.lower() == 'ahs' and options.filter:
             raise InvalidCommandLineError("Cannot filter AHS logs.")
+        elif options.service.lower() == 'ahs' and options.format:
+            raise InvalidCommandLineError("Cannot format AHS logs.")
         elif options.service.lower() == 'ahs' and self.typepath.url.\
                 startswith("blobstore") and not options.clearlog:
             self.downloadahslocally(options=options)
@@ -157,7 +168,10 @@ class ServerlogsCommand(RdmcCommandBase):
         elif options.repiml:
             self.repairlogentry(options, path=path)
         else:
-            data = self.downloaddata(path=path, options=options)
+            data = self.logentries(path=path, options=options)
+
+        if options.clearlog or options.mainmes or options.repiml:
+            self._rdmc.app.logstore.clear(self._rdmc.app.current_client.get_base_url())
 
         self.savedata(options=options, data=data)
 
@@ -424,13 +438,81 @@ class ServerlogsCommand(RdmcCommandBase):
             bodydict["body"] = {"Action":action}
             self._rdmc.app.post_handler(path, bodydict["body"], verbose=self._rdmc.opts.verbose)
 
-    def downloaddata(self, path=None, options=None):
+    def logentries(self, path=None, options=None):
+        """Entries of the IML or IEL logs, through the log store
+
+        Entries are kept in the log store instead of the monolith. The log is
+        listed again once the stored entries are no longer fresh, by every
+        command unless the cache policy keeps LogEntryCollection, and only
+        the entries missing from the store are downloaded. A filter on Id,
+        Created or Severity is looked up in the indexes of the store. When
+        the log has to be listed and the server supports it, a filter is sent
+        to the server instead and only the matching entries are downloaded,
+        without storing them. The whole log is still listed when the server
+        matches nothing.
+
+        :param path: path of the log entries
+        :type path: str
+        :param options: command line options
+        :type options: list.
+        """
+        if not path or options.service == 'AHS':
+            return self.downloaddata(path=path, options=options)
+
+        store = self._rdmc.app.logstore
+        server = self._rdmc.app.current_client.get_base_url()
+        policy = self._rdmc.app.cachepolicy
+        ttl = policy.ttl(LOGTYPE) if policy.mode != OFF else 0
+        (sel, val) = self.parsefilter(options.filter) if options.filter else (None, None)
+        if not store.fresh(server, path, ttl):
+            data = self.queryentries(path, sel, val, options) if sel else None
+            if data:
+                return data
+            href = self.typepath.defs.hrefstring
+            known = dict((normalize(entry[href]), entry) for entry in \
+                            store.entries(server, path) if isinstance(entry.get(href), \
+                                                                    six.string_types))
+            store.update(server, path, self.downloaddata(path=path, options=options, \
+                                                                            known=known))
+
+        if sel in INDEXED and not isinstance(val, bool):
+            data = store.entries(server, path, sel, val)
+            if not data:
+                raise NoContentsFoundForOperationError("Filter returned no matches.")
+            return data
+        return store.entries(server, path)
+
+    def queryentries(self, path, sel, val, options):
+        """Entries of a log matching a filter, filtered by the server
+
+        :param path: path of the log entries
+        :type path: str
+        :param sel: attribute to filter on
+        :type sel: str
+        :param val: value to filter by
+        :type val: str
+        :param options: command line options
+        :type options: list.
+        :returns: returns the entries, None if the server can not filter them
+        """
+        expr = filterexpr(sel, val)
+        if not expr or not supports(self._rdmc.app.monolith, FILTERQUERY):
+            return None
+        return self.downloaddata(path=path, options=options, query=expr)
+
+    def downloaddata(self, path=None, options=None, query=None, known=None):
         """Worker function to download the log files
 
         :param options: command line options
         :type options: list.
         :param path: path to download logs
         :type path: str
+        :param query: $filter expression sent with the request of the entries
+        :type query: str
+        :param known: entries already downloaded by normalized path, used
+                      instead of downloading them again
+        :type known: dict
+        :returns: returns the entries, None if the server rejected the query
         """
         if path:
             LOGGER.info("Getting data from %s", str(path))
@@ -441,14 +523,22 @@ class ServerlogsCommand(RdmcCommandBase):
                 else:
                     raise NoContentsFoundForOperationError("Unable to retrieve AHS logs.")
             else:
-                data = self._rdmc.app.get_handler(path, silent=True)
+                data = self._rdmc.app.get_handler(querypath(path, query) if query else \
+                                                        path, silent=True, uncache=True)
+                if query and (not data or data.status != 200):
+                    LOGGER.info("Unable to filter %s on the server, filtering locally.", \
+                                                                                    path)
+                    return None
 
-            datadict = data.dict
+            #Entries keep the order of their properties through the log store
+            datadict = json.loads(data.read, object_pairs_hook=OrderedDict)
 
             try:
                 completedatadictlist = datadict['Items'] if 'Items' in\
                                             datadict else datadict['Members']
             except:
+                if query:
+                    return None
                 sys.stdout.write('No data available within log.\n')
                 raise NoContentsFoundForOperationError("Unable to retrieve logs.")
 
@@ -461,8 +551,8 @@ class ServerlogsCommand(RdmcCommandBase):
                                     str(datadict['links']['NextPage']['page'])
 
                         href = '%s' % next_link_uri
-                        data = self._rdmc.app.get_handler(href, silent=True)
-                        datadict = data.dict
+                        data = self._rdmc.app.get_handler(href, silent=True, uncache=True)
+                        datadict = json.loads(data.read, object_pairs_hook=OrderedDict)
 
                         try:
                             completedatadictlist = completedatadictlist + datadict['Items']
@@ -477,8 +567,13 @@ class ServerlogsCommand(RdmcCommandBase):
                 for members in completedatadictlist:
                     if len(members.keys()) == 1:
                         memberpath = members[self.typepath.defs.hrefstring]
-                        data = self._rdmc.app.get_handler(memberpath, silent=True)
-                        datadict = datadict+[data.dict]
+                        if known and normalize(memberpath) in known:
+                            datadict = datadict + [known[normalize(memberpath)]]
+                            continue
+                        data = self._rdmc.app.get_handler(memberpath, silent=True, \
+                                                                            uncache=True)
+                        datadict = datadict+[json.loads(data.read, \
+                                                            object_pairs_hook=OrderedDict)]
                     else:
                         datadict = datadict + [members]
                 completedatadictlist = datadict
@@ -489,6 +584,8 @@ class ServerlogsCommand(RdmcCommandBase):
                 except Exception:
                     sys.stdout.write("Could not get the data from server!\n")
                     raise NoContentsFoundForOperationError("Unable to retrieve logs.")
+            elif query:
+                return completedatadictlist
             else:
                 sys.stdout.write("No data present!\n")
                 raise NoContentsFoundForOperationError("Unable to retrieve logs.")
@@ -705,12 +802,18 @@ class ServerlogsCommand(RdmcCommandBase):
                     foutput.write(data)
             elif options.filename:
                 with open(options.filename[0], 'w') as foutput:
-                    if options.json:
+                    writer = tabularwriter(options, stream=foutput)
+                    if writer:
+                        writer.writerows(data)
+                    elif options.json:
                         foutput.write(str(json.dumps(data, indent=2)))
                     else:
                         foutput.write(str(json.dumps(data)))
             else:
-                if options.json:
+                writer = tabularwriter(options)
+                if writer:
+                    writer.writerows(data)
+                elif options.json:
                     sys.stdout.write(str(json.dumps(data, indent=2)))
                 else:
                     UI().print_out_human_readable(data)
@@ -748,7 +851,7 @@ class ServerlogsCommand(RdmcCommandBase):
             raise SecurityStateError("AHS logs cannot be downloaded" \
                                         " locally in high security state.\n")
 
-        self.lib = risblobstore2.BlobStore2.gethprestchifhandle()
+        self.lib = CHIF.handle()
 
         sys.stdout.write("Mounting AHS partition...\n")
 
@@ -1068,27 +1171,37 @@ class ServerlogsCommand(RdmcCommandBase):
         """
         LOGGER.info("Filtering logs based on requsted options.")
         if tofilter and data:
-            try:
-                if (str(tofilter)[0] == str(tofilter)[-1])\
-                                    and str(tofilter).startswith(("'", '"')):
-                    tofilter = tofilter[1:-1]
-
-                (sel, val) = tofilter.split('=')
-                sel = sel.strip()
-                val = val.strip()
-
-                if val.lower() == "true" or val.lower() == "false":
-                    val = val.lower() in ("yes", "true", "t", "1")
-            except:
-                raise InvalidCommandLineError("Invalid filter" \
-                  " parameter format [filter_attribute]=[filter_value]")
-
+            (sel, val) = self.parsefilter(tofilter)
             data = self._rdmc.app.filter_output(data, sel, val)
             if not data:
                 raise NoContentsFoundForOperationError("Filter returned no matches.")
 
         return data
 
+    def parsefilter(self, tofilter):
+        """Split the filter option into its attribute and value
+
+        :param tofilter: command line filter option
+        :type tofilter: str
+        :returns: returns the attribute and the value, a bool for true or false
+        """
+        try:
+            if (str(tofilter)[0] == str(tofilter)[-1])\
+                                and str(tofilter).startswith(("'", '"')):
+                tofilter = tofilter[1:-1]
+
+            (sel, val) = tofilter.split('=')
+            sel = sel.strip()
+            val = val.strip()
+
+            if val.lower() == "true" or val.lower() == "false":
+                val = val.lower() in ("yes", "true", "t", "1")
+        except:
+            raise InvalidCommandLineError("Invalid filter" \
+              " parameter format [filter_attribute]=[filter_value]")
+
+        return (sel, val)
+
     def getahsfilename(self, options):
         """Create a default name if no ahsfilename is passed
 
@@ -1133,35 +1246,7 @@ class ServerlogsCommand(RdmcCommandBase):
         :param options: command line options
         :type options: list.
         """
-        client = None
-        inputline = list()
-
-        if options.encode and options.user and options.password:
-            options.user = Encryption.decode_credentials(options.user)
-            options.password = Encryption.decode_credentials(options.password)
-
-        try:
-            client = self._rdmc.app.get_current_client()
-            if options.user and options.password:
-                if not client.get_username():
-                    client.set_username(options.user)
-                if not client.get_password():
-                    client.set_password(options.password)
-        except Exception:
-            if options.user or options.password or options.url:
-                if options.url:
-                    inputline.extend([options.url])
-                if options.user:
-                    inputline.extend(["-u", options.user])
-                if options.password:
-                    inputline.extend(["-p", options.password])
-            else:
-                if self._rdmc.app.config.get_url():
-                    inputline.extend([self._rdmc.app.config.get_url()])
-                if self._rdmc.app.config.get_username():
-                    inputline.extend(["-u", self._rdmc.app.config.get_username()])
-                if self._rdmc.app.config.get_password():
-                    inputline.extend(["-p", self._rdmc.app.config.get_password()])
+        (client, inputline) = self._rdmc.app.context.resolve(options)
 
         if not inputline and not client:
             sys.stdout.write('Local login initiated...\n')
@@ -1309,6 +1394,24 @@ class ServerlogsCommand(RdmcCommandBase):
             " structure makes the information easier to parse.",
             default=False
         )
+        customparser.add_option(
+            '--format',
+            dest='format',
+            type='choice',
+            choices=list(FORMATS),
+            help="Optionally include this flag to write one row per log entry"\
+            " in CSV, TSV or newline delimited JSON format. Nested properties"\
+            " become columns named by their path. Valid choices are: csv, tsv, ndjson",
+            default=None
+        )
+        customparser.add_option(
+            '--columns',
+            dest='columns',
+            help="Optionally include this flag with the format flag to choose"\
+            " the columns of the rows and their order, separated by commas."\
+            " Nested properties are separated by /. EX: --columns=Id,Created,Severity",
+            default=None
+        )
         customparser.add_option(
             '-e',
             '--enc',
@@ -30,7 +30,7 @@ import redfish.hpilo.risblobstore2 as risblobstore2
 from rdmc_base_classes import RdmcCommandBase
 from rdmc_helper import ReturnCodes, InvalidCommandLineErrorOPTS, \
                         InvalidCommandLineError, DownloadError, \
-                        InvalidFileInputError, IncompatibleiLOVersionError, Encryption
+                        InvalidFileInputError, IncompatibleiLOVersionError
 
 def human_readable_time(seconds):
     """ Returns human readable time
@@ -77,9 +77,7 @@ class DownloadComponentCommand(RdmcCommandBase):
             else:
                 raise InvalidCommandLineErrorOPTS("")
 
-        if options.encode and options.user and options.password:
-            options.user = Encryption.decode_credentials(options.user)
-            options.password = Encryption.decode_credentials(options.password)
+        self._rdmc.app.context.decode(options)
 
         if options.sessionid:
             url = self.sessionvalidation(options)
@@ -201,31 +199,7 @@ class DownloadComponentCommand(RdmcCommandBase):
         :param options: command options
         :type options: options.
         """
-        inputline = list()
-        client = None
-
-        try:
-            client = self._rdmc.app.get_current_client()
-            if options.user and options.password:
-                if not client.get_username():
-                    client.set_username(options.user)
-                if not client.get_password():
-                    client.set_password(options.password)
-        except:
-            if options.user or options.password or options.url:
-                if options.url:
-                    inputline.extend([options.url])
-                if options.user:
-                    inputline.extend(["-u", options.user])
-                if options.password:
-                    inputline.extend(["-p", options.password])
-            else:
-                if self._rdmc.app.config.get_url():
-                    inputline.extend([self._rdmc.app.config.get_url()])
-                if self._rdmc.app.config.get_username():
-                    inputline.extend(["-u", self._rdmc.app.config.get_username()])
-                if self._rdmc.app.config.get_password():
-                    inputline.extend(["-p", self._rdmc.app.config.get_password()])
+        (client, inputline) = self._rdmc.app.context.resolve(options)
 
         if not inputline and not client:
             sys.stdout.write('Local login initiated...\n')
@@ -247,7 +221,7 @@ class DownloadComponentCommand(RdmcCommandBase):
             if self._rdmc.app.config.get_url():
                 url = self._rdmc.app.config.get_url()
 
-        if url and not "https://" in url:
+        if url and not "://" in url:
             url = "https://" + url
 
         return url
@@ -23,9 +23,9 @@ import json
 from optparse import OptionParser, SUPPRESS_HELP
 
 from rdmc_base_classes import RdmcCommandBase
+from rdmc_tabular import FORMATS, tabularwriter
 
-from rdmc_helper import IncompatibleiLOVersionError, ReturnCodes, InvalidCommandLineErrorOPTS, \
-                        Encryption
+from rdmc_helper import IncompatibleiLOVersionError, ReturnCodes, InvalidCommandLineErrorOPTS
 
 class ListComponentCommand(RdmcCommandBase):
     """ Main download command class """
@@ -79,7 +79,10 @@ class ListComponentCommand(RdmcCommandBase):
         :param comps: list of components
         :type comps: list.
         """
-        if options.json:
+        writer = tabularwriter(options)
+        if writer:
+            writer.writerows(comps)
+        elif options.json:
             jsonout = dict()
             for comp in comps:
                 jsonout[comp['Id']] = comp
@@ -98,35 +101,7 @@ class ListComponentCommand(RdmcCommandBase):
         :param options: command line options
         :type options: list.
         """
-        inputline = list()
-        client = None
-
-        if options.encode and options.user and options.password:
-            options.user = Encryption.decode_credentials(options.user)
-            options.password = Encryption.decode_credentials(options.password)
-
-        try:
-            client = self._rdmc.app.get_current_client()
-            if options.user and options.password:
-                if not client.get_username():
-                    client.set_username(options.user)
-                if not client.get_password():
-                    client.set_password(options.password)
-        except:
-            if options.user or options.password or options.url:
-                if options.url:
-                    inputline.extend([options.url])
-                if options.user:
-                    inputline.extend(["-u", options.user])
-                if options.password:
-                    inputline.extend(["-p", options.password])
-            else:
-                if self._rdmc.app.config.get_url():
-                    inputline.extend([self._rdmc.app.config.get_url()])
-                if self._rdmc.app.config.get_username():
-                    inputline.extend(["-u", self._rdmc.app.config.get_username()])
-                if self._rdmc.app.config.get_password():
-                    inputline.extend(["-p", self._rdmc.app.config.get_password()])
+        (client, inputline) = self._rdmc.app.context.resolve(options)
 
         if not inputline and not client:
             sys.stdout.write('Local login initiated...\n')
@@ -174,6 +149,24 @@ class ListComponentCommand(RdmcCommandBase):
             " structure makes the information easier to parse.",
             default=False
         )
+        customparser.add_option(
+            '--format',
+            dest='format',
+            type='choice',
+            choices=list(FORMATS),
+            help="Optionally include this flag to write one row per component"\
+            " in CSV, TSV or newline delimited JSON format. Nested properties"\
+            " become columns named by their path. Valid choices are: csv, tsv, ndjson",
+            default=None
+        )
+        customparser.add_option(
+            '--columns',
+            dest='columns',
+            help="Optionally include this flag with the format flag to choose"\
+            " the columns of the rows and their order, separated by commas."\
+            " Nested properties are separated by /. EX: --columns=Id,Name,Version",
+            default=None
+        )
         customparser.add_option(
             '-e',
             '--enc',
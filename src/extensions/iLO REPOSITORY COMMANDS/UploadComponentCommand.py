@@ -37,7 +37,9 @@ import redfish.hpilo.risblobstore2 as risblobstore2
 from redfish.ris.rmc_helper import InvalidPathError
 
 from rdmc_base_classes import RdmcCommandBase
-from rdmc_helper import ReturnCodes, InvalidCommandLineErrorOPTS, Encryption, UploadError, \
+from rdmc_retry import RetryPolicy, retry_on_busy_updateservice, retry_on_unavailable, \
+                        retry_on_connection_error
+from rdmc_helper import ReturnCodes, InvalidCommandLineErrorOPTS, UploadError, \
             InvalidCommandLineError, IncompatibleiLOVersionError, TimeOutError
 
 def human_readable_time(seconds):
@@ -91,9 +93,7 @@ class UploadComponentCommand(RdmcCommandBase):
             else:
                 raise InvalidCommandLineErrorOPTS("")
 
-        if options.encode and options.user and options.password:
-            options.user = Encryption.decode_credentials(options.user)
-            options.password = Encryption.decode_credentials(options.password)
+        self._rdmc.app.context.decode(options)
 
         if options.sessionid:
             url = self.sessionvalidation(options)
@@ -351,35 +351,24 @@ class UploadComponentCommand(RdmcCommandBase):
         :param wait_time: time to wait on upload
         :type wait_time: int.
         """
-        total_time = 0
         spinner = ['|', '/', '-', '\\']
-        state = ""
         sys.stdout.write("Waiting for iLO UpdateService to finish "\
                                                 "processing the component\n")
 
-        while total_time < wait_time:
-            state, _ = self.get_update_service_state(sessionid, url, username, password)
+        policy = RetryPolicy(initial=1, maximum=8, deadline=wait_time, \
+                    retryon=[retry_on_busy_updateservice, retry_on_unavailable, \
+                             retry_on_connection_error], onretry=lambda attempt, _: \
+                    sys.stdout.write('Updating: %s\r' % spinner[attempt % 4]))
 
-            if state == "ERROR":
-                return False
-            elif state != "COMPLETED" and state != "IDLE" and state != "COMPLETE":
-                # Lets try again after 8 seconds
-                count = 0
-
-                #fancy spinner
-                while count <= 32:
-                    sys.stdout.write('Updating: %s\r' % spinner[count % 4])
-                    time.sleep(0.25)
-                    count += 1
-
-                total_time += 8
-            else:
-                break
-
-        if total_time > wait_time:
-            raise TimeOutError("UpdateService in " + state + " state for " + str(wait_time) + "s")
+        try:
+            state, _ = policy.call(self.get_update_service_state, sessionid, url, \
+                                                                username, password)
+        except TimeOutError:
+            state = policy.lastresult[0] if policy.lastresult else "UNKNOWN"
+            raise TimeOutError("UpdateService in " + state + " state for " + \
+                                                            str(wait_time) + "s")
 
-        return True
+        return state != "ERROR"
 
     def get_update_service_state(self, sessionid=None, url=None, username=None,
                                  password=None):
@@ -515,9 +504,6 @@ class UploadComponentCommand(RdmcCommandBase):
         :param options: command line options
         :type options: list.
         """
-        inputline = list()
-        client = None
-
         if not options.component:
             raise InvalidCommandLineError("The component option is required"\
                                           " for this operation.")
@@ -528,28 +514,7 @@ class UploadComponentCommand(RdmcCommandBase):
         if options.componentsig  and (not os.path.exists(options.componentsig)):
             raise InvalidCommandLineError("Component signature not found.")
 
-        try:
-            client = self._rdmc.app.get_current_client()
-            if options.user and options.password:
-                if not client.get_username():
-                    client.set_username(options.user)
-                if not client.get_password():
-                    client.set_password(options.password)
-        except:
-            if options.user or options.password or options.url:
-                if options.url:
-                    inputline.extend([options.url])
-                if options.user:
-                    inputline.extend(["-u", options.user])
-                if options.password:
-                    inputline.extend(["-p", options.password])
-            else:
-                if self._rdmc.app.config.get_url():
-                    inputline.extend([self._rdmc.app.config.get_url()])
-                if self._rdmc.app.config.get_username():
-                    inputline.extend(["-u", self._rdmc.app.config.get_username()])
-                if self._rdmc.app.config.get_password():
-                    inputline.extend(["-p", self._rdmc.app.config.get_password()])
+        (client, inputline) = self._rdmc.app.context.resolve(options)
 
         if not inputline and not client:
             sys.stdout.write('Local login initiated...\n')
@@ -570,7 +535,7 @@ class UploadComponentCommand(RdmcCommandBase):
         else:
             if self._rdmc.app.config.get_url():
                 url = self._rdmc.app.config.get_url()
-        if url and not "https://" in url:
+        if url and not "://" in url:
             url = "https://" + url
 
         return url
@@ -43,6 +43,12 @@ import redfish.rest.v1
 import cliutils
 import versioning
 import extensions
+import rdmc_transport
+
+from rdmc_app import RdmcApp
+from rdmc_chif import CHIF
+from rdmc_cachepolicy import load_cache_policy
+from rdmc_hostcache import optionvalues
 
 from rdmc_helper import ReturnCodes, ConfigurationFileError, \
                     CommandNotEnabledError, InvalidCommandLineError, \
@@ -60,7 +66,8 @@ from rdmc_helper import ReturnCodes, ConfigurationFileError, \
                     UploadError, BirthcertParseError, ResourceExists,\
                     IncompatableServerTypeError, IloLicenseError, \
                     InvalidKeyError, UnableToDecodeError, \
-                    UnabletoFindDriveError, Encryption, PathUnavailableError, TaskQueueError
+                    UnabletoFindDriveError, Encryption, PathUnavailableError, TaskQueueError, \
+                    RetryCancelledError
 
 from rdmc_base_classes import RdmcCommandBase, RdmcOptionParser, HARDCODEDLIST
 
@@ -123,8 +130,9 @@ class RdmcCommand(RdmcCommandBase):
                                       versioning.__longname__)
         self.opts = None
         self.encoding = None
+        self.transport = None
         self.config_file = None
-        self.app = redfish.ris.RmcApp(Args=Args)
+        self.app = RdmcApp(Args=Args)
         self.retcode = 0
         self.candidates = dict()
         self.commlist = list()
@@ -182,10 +190,14 @@ class RdmcCommand(RdmcCommandBase):
             sys.stdout.write(FIPSSTR)
             CLI.version(self._progname, versioning.__version__,\
                                 versioning.__extracontent__, fileh=sys.stdout)
-        if len(args) > 1:
-            return cmd.run(args[1:])
 
-        return cmd.run([])
+        self.app.begin()
+        if not cmd.ismatch('logout'):
+            self.app.session.check()
+        try:
+            return cmd.run(args[1:])
+        finally:
+            self.app.session.touch()
 
     def run(self, line):
         """ Main rdmc command worker function
@@ -225,12 +237,11 @@ class RdmcCommand(RdmcCommandBase):
 
         (self.opts, _) = self.parser.parse_args(curr)
 
-        try:
-            Encryption.encode_credentials('test')
+        if CHIF.available():
             self.app.set_encode_funct(Encryption.encode_credentials)
             self.app.set_decode_funct(Encryption.decode_credentials)
             self.encoding = True
-        except redfish.hpilo.risblobstore2.ChifDllMissingError:
+        else:
             self.encoding = False
 
         if self.opts.config is not None and len(self.opts.config) > 0:
@@ -285,9 +296,33 @@ class RdmcCommand(RdmcCommandBase):
                 else:
                     raise
 
+        self.app.set_cache_size(self.opts.cachesize)
+
+        schemacache = None if self.opts.nocache else os.path.join(self.opts.config_dir, \
+                                                                        'schemas')
+        self.app.set_schema_caches(schemadir=self.app.config.get_schemadir() or \
+                    schemacache, biosschemadir=self.app.config.get_biosschemadir() or \
+                    schemacache)
+
+        try:
+            self.app.set_cache_policy(load_cache_policy(self.app.config_file))
+        except ConfigurationFileError as excp:
+            self.handle_exceptions(excp)
+
+        if self.opts.record or self.opts.replay:
+            try:
+                self.transport = rdmc_transport.install(record=self.opts.record, \
+                        replay=self.opts.replay, scale=self.opts.replayscale, \
+                        command=nargv[0].lower() if nargv else None)
+            except (InvalidCommandLineError, InvalidFileInputError) as excp:
+                self.handle_exceptions(excp)
+                return self.retcode
+
         if ("login" in line or any(x.startswith("--url") for x in line) or not line)\
                         and not (any(x.startswith(("-h", "--h")) for x in nargv) or "help" in line):
-            self.app.logout()
+            if self.selectserver(nargv):
+                self.opts.is_redfish = self.app.updatedefinesflag(redfishflag=\
+                                                        self.opts.is_redfish)
         else:
             self.app.restore()
             self.opts.is_redfish = self.app.updatedefinesflag(redfishflag=\
@@ -353,7 +388,8 @@ class RdmcCommand(RdmcCommandBase):
         #***************************************************
 
         while True:
-            line = input(versioning.__shortname__+' > ')
+            with self.app.session.idle():
+                line = input(versioning.__shortname__+' > ')
             readline.add_history(line)
 
             if not len(line):
@@ -368,7 +404,7 @@ class RdmcCommand(RdmcCommandBase):
                     any(x.startswith("--h") for x in nargv) or "help" in line):
                     if "login " in line or line == 'login' or \
                         any(x.startswith("--url") for x in nargv):
-                        self.app.logout()
+                        self.selectserver(nargv)
                 self.retcode = self._run_command(opts, nargv)
                 self.check_for_tab_lists(nargv)
             except Exception as excp:
@@ -379,6 +415,40 @@ class RdmcCommand(RdmcCommandBase):
 
         return self.retcode
 
+    def selectserver(self, nargv):
+        """ Switch to the server a login or --url command line names
+
+        The current server is kept in the cache. A login replaces the cached
+        session of its server and user, a --url command restores the cached
+        server if there is one.
+
+        :param nargv: command and its arguments
+        :type nargv: list.
+        :returns: returns True if a cached server was restored
+        """
+        self.app.setaside()
+        try:
+            cmd = self.search_commands(nargv[0]) if nargv else None
+        except Exception:
+            cmd = None
+        if cmd is None or not cmd.parser:
+            return False
+
+        (values, args) = optionvalues(cmd.parser, nargv[1:])
+        user = values.get('user') or self.app.config.get_username() or None
+        if cmd.ismatch('login'):
+            url = args[0] if args else self.app.config.get_url() or 'blobstore://.'
+            self.app.logout(url, user)
+            return False
+        elif not values.get('url'):
+            return False
+
+        self.app.restore(url=values['url'], user=user)
+        try:
+            return self.app.current_client is not None
+        except Exception:
+            return False
+
     def handle_exceptions(self, excp):
         """ Main exception handler for both shell and interactive modes
 
@@ -503,6 +573,9 @@ class RdmcCommand(RdmcCommandBase):
         except TaskQueueError as excp:
             self.retcode = ReturnCodes.TASKQUEUE_ERROR
             UI().error(excp)
+        except RetryCancelledError as excp:
+            self.retcode = ReturnCodes.RETRY_CANCELLED_ERROR
+            UI().error(excp)
         # ****** CLI ERRORS ******
         except cliutils.CommandNotFoundException as excp:
             self.retcode = ReturnCodes.UI_CLI_COMMAND_NOT_FOUND_EXCEPTION
@@ -0,0 +1,573 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""RMC application used by RDMC"""
+
+#---------Imports---------
+
+import os
+import copy
+
+from collections import OrderedDict
+
+import six
+import jsonpatch
+
+import redfish.ris
+
+from redfish.ris.rmc_helper import InstanceNotFoundError
+
+from rdmc_typeindex import MonolithTypeIndex
+from rdmc_cachepolicy import CachePolicy, TimedGet
+from rdmc_compact import compactmonolith
+from rdmc_context import RequestContext
+from rdmc_crawler import normalize
+from rdmc_helper import LOGGER
+from rdmc_hostcache import RdmcFileCacheManager
+from rdmc_logstore import LogStore, LOGSTORE
+from rdmc_projection import Projection
+from rdmc_query import FILTERQUERY, filterexpr, querypath, supports
+from rdmc_schemacache import SchemaCache, SchemaCacheGet, SCHEMA, REGISTRY
+from rdmc_schemapack import findpacks
+from rdmc_session import SessionKeeper
+from rdmc_validation import RdmcValidationManager
+
+#---------End of imports---------
+
+class RdmcApp(redfish.ris.RmcApp):
+    """RmcApp resolving selectors through a type index of the monolith
+
+    The library scans every type name and every monolith member on each
+    selection, these lookups go through MonolithTypeIndex instead and only
+    visit the members of the matching types.
+    """
+    def __init__(self, Args=[]):
+        redfish.ris.RmcApp.__init__(self, Args=Args)
+        self._cm = RdmcFileCacheManager(self)
+        self._typeindex = None
+        self._typescache = None
+        self.schemacaches = None
+        self.cachepolicy = CachePolicy()
+        self._logstore = None
+        self.session = SessionKeeper(self)
+        self.context = RequestContext(self)
+
+    def set_cache_policy(self, policy):
+        """ Use a cache policy for the time cached resources are kept
+
+        :param policy: cache policy
+        :type policy: CachePolicy.
+        """
+        self.cachepolicy = policy
+
+    @property
+    def logstore(self):
+        """ Log entry store of the cache directory, in memory when caching is off """
+        if self._logstore is None:
+            cachedir = self.config.get_cachedir() if self.config.get_cache() else None
+            self._logstore = LogStore(os.path.join(cachedir, LOGSTORE) if cachedir else None)
+        return self._logstore
+
+    def begin(self):
+        """ Start a new command line with its own resolution context, resources
+        fetched before it may be stale again """
+        self.cachepolicy.begin()
+        self.context = RequestContext(self)
+
+    def set_schema_caches(self, schemadir=None, biosschemadir=None):
+        """ Serve schemas and registries from shared on disk caches and the
+        schema packs found in them
+
+        :param schemadir: directory caching the iLO JSON schemas
+        :type schemadir: str.
+        :param biosschemadir: directory caching the BIOS and message registries
+        :type biosschemadir: str.
+        """
+        #A pack holds both kinds of documents, whichever directory it is in
+        packs = findpacks(schemadir) + (findpacks(biosschemadir) if biosschemadir != \
+                                                                schemadir else [])
+        self.schemacaches = {SCHEMA: SchemaCache(schemadir, packs) if schemadir else None, \
+                        REGISTRY: SchemaCache(biosschemadir, packs) if biosschemadir else None}
+
+    def get_current_client(self):
+        """ Get the current client, its schema downloads going through the caches,
+        its downloads timed for the cache policy, its monolith compacted and its
+        requests sent again with a new session when the session expires """
+        client = redfish.ris.RmcApp.get_current_client(self)
+        if not isinstance(client.get, TimedGet):
+            self.session.install(client)
+            compactmonolith(client.monolith)
+            if self.schemacaches:
+                client.get = SchemaCacheGet(self, client.get)
+            if self.cachepolicy.url != client.get_base_url():
+                self.cachepolicy.reset(client.get_base_url())
+            client.get = TimedGet(self.cachepolicy, client.get)
+        return client
+    current_client = property(get_current_client, None)
+
+    def set_cache_size(self, size):
+        """ Limit the size of the sessions and monoliths cached for every server
+
+        :param size: size in MB
+        :type size: int.
+        """
+        self._cm.maxsize = size * 1024 * 1024
+
+    def save(self):
+        """ Cache the current monolith along with the fetch times of its members """
+        client = self._rmc_clients
+        if client and self.config.get_cache():
+            self.cachepolicy.collect(client.monolith, wait=True)
+        redfish.ris.RmcApp.save(self)
+        if client and self.config.get_cache():
+            self.cachepolicy.save(self._cm.cachefile(client), client.get_base_url(), \
+                                                            list(client.monolith.paths))
+
+    def restore(self, url=None, user=None):
+        """ Restore a server from cache along with the fetch times of its members
+
+        :param url: url of the server to restore, the most recently used one
+                    by default
+        :type url: str.
+        :param user: user of the server to restore, any if not given
+        :type user: str.
+        """
+        self._cm.uncache_rmc(url=url, user=user)
+        client = self._rmc_clients
+        self.session.used = self._cm.used if client else None
+        if client and self.config.get_cachedir():
+            self.cachepolicy.restore(self._cm.cachefile(client), client.get_base_url())
+
+    def login(self, username=None, password=None, base_url='blobstore://.', **kwargs):
+        """ Log into a server, its session is cached under username and its
+        password kept for this process to log in again once the session expires
+
+        :param username: user name required to login to server.
+        :type: str.
+        :param password: password credentials required to login.
+        :type password: str.
+        :param base_url: redfish host name or ip address.
+        :type base_url: str.
+        """
+        if not self._rmc_clients:
+            self._cm.releaseshard()
+        self._cm.user = username
+        self.session.remember(base_url, username, password)
+        result = redfish.ris.RmcApp.login(self, username, password, base_url, **kwargs)
+        self.session.touch()
+        return result
+
+    def setaside(self):
+        """ Put the current server aside in the cache, without logging out of it """
+        if not self._rmc_clients:
+            return
+        if not self.config.get_cache():
+            self.logout()
+            return
+
+        self.save()
+        self._validationmanager = None
+        self._iloversion = None
+        self.remove_rmc_client()
+        self._cm.releaseshard()
+
+    def logout(self, url=None, user=None):
+        """ Log out of a server and remove it and its logs from the cache, other
+        cached servers are kept
+
+        :param url: url of the server to log out of, the current one by default
+        :type url: str.
+        :param user: user of the server to log out of, any if not given
+        :type user: str.
+        """
+        sessionlocs = []
+        self._validationmanager = None
+        self._iloversion = None
+        self.logstore.clear(url or (self._rmc_clients.get_base_url() if \
+                                                        self._rmc_clients else None))
+
+        try:
+            self.current_client.logout()
+        except Exception:
+            sessionlocs = self._cm.logout_del_function(url, user)
+        else:
+            self._cm.logout_del_function(url, user)
+
+        for session in sessionlocs:
+            try:
+                self.delete_handler(session[0], url=session[1], \
+                            sessionid=session[2], silent=True, service=True)
+            except:
+                pass
+        self.remove_rmc_client()
+        self.save()
+
+    def get_validation_manager(self, iloversion):
+        """ Get the validation manager, compiling attribute registries once
+
+        :param iloversion: current systems iLO versions.
+        :type iloversion: str.
+        :returns: returns a RdmcValidationManager
+        """
+        manager = self._validationmanager
+        if not isinstance(manager, RdmcValidationManager):
+            self._validationmanager = RdmcValidationManager(self.current_client.monolith, \
+                                        defines=self.typepath, caches=self.schemacaches)
+            return self._validationmanager
+
+        manager._errors = list()
+        manager._warnings = list()
+        manager.updatevalidationdata()
+        return manager
+
+    @property
+    def typeindex(self):
+        """ Type index of the current monolith, up to date with its types """
+        monolith = self.monolith
+        if self._typeindex is None or self._typeindex.monolith is not monolith:
+            self._typeindex = MonolithTypeIndex(monolith)
+        return self._typeindex.refresh()
+
+    def getinstances(self, selector=None, rel=False, crawl=False, fltrvals=(None, None)):
+        """ Get instances of particular type and reload them
+
+        :param selector: the type selection for the get operation.
+        :type selector: str.
+        :param rel: flag to reload the selected instances.
+        :type rel: boolean.
+        :param crawl: flag to determine if load should traverse found links.
+        :type crawl: boolean.
+        :param fltrvals: filter evaluated by the server when its match is exact
+                         (Key,Val), the instances still have to be filtered.
+        :type fltrvals: tuple.
+        :returns: returns a list of selected items
+        """
+        selector = self.current_client.selector if not selector else selector
+        if selector:
+            selector = ".".join(selector.split('#')[-1].split(".")[:2])
+            self.updatemono(currtype=selector, crawl=crawl, rel=rel)
+        if not selector:
+            return list()
+
+        if selector == '"*"':
+            self.cachepolicy.refresh(self.monolith, list(self.monolith.paths))
+            instances = list(self.monolith.iter())
+        else:
+            paths = self.typeindex.paths(selector)
+            matched = self.queryfilter(paths, *fltrvals) if fltrvals[0] and not rel else None
+            dropped = set()
+            if matched is not None:
+                #Stale members the server left out no longer match the filter
+                dropped = set(path for path, _ in self.cachepolicy.stale(self.monolith, \
+                                                            paths) if path not in matched)
+            self.cachepolicy.refresh(self.monolith, paths if matched is None else matched)
+            instances = [inst for inst in self.typeindex.instances(selector) if \
+                                                                inst.path not in dropped]
+        instances = [inst for inst in instances if inst.maj_type not in ['object', 'string']]
+        _ = [setattr(inst, 'patches', []) for inst in instances if rel]
+        return instances
+
+    def queryfilter(self, paths, sel, val):
+        """ Members of paths to revalidate for a filter, the ones a $filter query
+        of their collections matches
+
+        The query is only sent when it saves revalidating stale members, and
+        when the server advertises FilterQuery. The server compares strings
+        differently than the client, case sensitively, so only filters on a
+        boolean or integer value are sent, whose match is exact. The stale
+        members the server leaves out are dropped from the selection and the
+        selection is still filtered by the client.
+
+        :param paths: paths of the instances of a selection.
+        :type paths: list.
+        :param sel: attribute path to filter on, keys separated by /.
+        :type sel: str.
+        :param val: value to filter by.
+        :type val: str, bool or int.
+        :returns: returns the set of matching paths, None to revalidate every
+                  stale path
+        """
+        monolith = self.monolith
+        expr = filterexpr(sel, val) if isinstance(val, (bool,) + six.integer_types) else None
+        if not expr or not supports(monolith, FILTERQUERY):
+            return None
+
+        collections = {}
+        for path in paths:
+            parent = path.rstrip('/').rsplit('/', 1)[0]
+            member = monolith.paths.get(parent + '/')
+            if member is None:
+                member = monolith.paths.get(parent)
+            if member is None or 'collection' not in member.maj_type.lower():
+                return None
+            collections.setdefault(member.path, []).append(path)
+        if len(self.cachepolicy.stale(monolith, paths)) <= len(collections):
+            return None
+
+        matched = set()
+        for collection in collections:
+            resp = self.current_client.get(querypath(collection, expr))
+            try:
+                members = resp.dict['Members'] if resp.status == 200 else None
+            except (ValueError, KeyError, TypeError):
+                members = None
+            if not isinstance(members, list):
+                LOGGER.info('Unable to filter %s on the server, filtering locally.', \
+                                                                            collection)
+                return None
+            matched.update(normalize(mem.get('@odata.id', '')) for mem in members \
+                                                                if isinstance(mem, dict))
+        matched = set(path for path in paths if normalize(path) in matched)
+        return matched if matched else None
+
+    def gatherinstances(self, selectors, workers=1):
+        """ Instances of several types, the stale ones revalidated together
+
+        :param selectors: the type selections.
+        :type selectors: list.
+        :param workers: number of concurrent revalidations
+        :type workers: int.
+        :returns: returns a list of instances by selector
+        """
+        selectors = [(selector, ".".join(self.modifyselectorforgen(selector).\
+                                split('#')[-1].split(".")[:2])) for selector in selectors]
+        paths = []
+        for _, currtype in selectors:
+            self.updatemono(currtype=currtype)
+            paths.extend(self.typeindex.paths(currtype))
+        self.cachepolicy.refresh(self.monolith, paths, workers=workers)
+
+        instances = OrderedDict()
+        for selector, currtype in selectors:
+            instances[selector] = [inst for inst in self.typeindex.instances(currtype) \
+                                            if inst.maj_type not in ['object', 'string']]
+        return instances
+
+    def select(self, selector=None, fltrvals=(None, None), rel=False):
+        """ Select instances of a type, filtered through a property index
+
+        :param selector: the type selection for the get operation.
+        :type selector: str.
+        :param fltrvals: the filter values of selection for the select operation (Key,Val).
+        :type fltrvals: tuple.
+        :param rel: flag to reload the selected instances.
+        :type rel: boolean.
+        :returns: returns a list of selected items
+        """
+        if selector:
+            selector = self.modifyselectorforgen(selector)
+            #Selected already by this command line and not changed since
+            instances = self.context.selection(selector, fltrvals) if not rel else None
+            if instances:
+                return instances
+
+            val = fltrvals[1].strip('\'\"') if isinstance(fltrvals[1], \
+                                            six.string_types) else fltrvals[1]
+            instances = self.getinstances(selector=selector, rel=rel, \
+                                                        fltrvals=(fltrvals[0], val))
+            if fltrvals[0]:
+                instances = self.filterinstances(selector, instances, fltrvals[0], val)
+            if any(instances):
+                self.current_client.selector = selector
+                self.save()
+                self.context.selected(selector, fltrvals, instances)
+                return instances
+
+        errmsg = "Unable to locate instance for '{0}' and filter '{1}={2}'". \
+                    format(selector, fltrvals[0], fltrvals[1]) if fltrvals[0] \
+                    and fltrvals[1] else "Unable to locate instance for {}".format(selector)
+
+        raise InstanceNotFoundError(errmsg)
+
+    def filterinstances(self, selector, instances, sel, val):
+        """ Instances whose sel property matches val
+
+        String values are looked up in a property index of the whole type
+        selection built on first use, other values are compared instance by
+        instance.
+
+        :param selector: the type selection of the instances.
+        :type selector: str.
+        :param instances: instances of the selection.
+        :type instances: list.
+        :param sel: attribute path to filter on, keys separated by /.
+        :type sel: str.
+        :param val: value to filter by.
+        :type val: str.
+        :returns: returns a list of matching instances
+        """
+        if val is not None and not isinstance(val, six.string_types):
+            return [inst for inst in instances if self.navigatejson(sel.split('/'), \
+                                                            copy.deepcopy(inst.dict), val)]
+
+        selector = ".".join(selector.split('#')[-1].split(".")[:2])
+        index = self.typeindex.properties(selector, sel, self.navigatejson)
+        selected = set(id(inst) for inst in instances)
+        return [inst for inst in index.match(val or '') if id(inst) in selected]
+
+    def getprops(self, selector=None, props=None, nocontent=None, skipnonsetting=True, \
+                                            remread=False, insts=None, projection=None):
+        """ Properties of the selected instances, walking each instance once
+
+        :param selector: the type selection for the get operation.
+        :type selector: str.
+        :param props: property paths to return, all properties if empty.
+        :type props: list.
+        :param nocontent: property paths not found are added to this set.
+        :type nocontent: set.
+        :param skipnonsetting: flag to remove non settings path.
+        :type skipnonsetting: boolean.
+        :param remread: flag to remove readonly properties.
+        :type remread: boolean.
+        :param insts: instances to be searched for specific props
+        :type insts: list.
+        :param projection: compiled selection used instead of props
+        :type projection: Projection.
+        :returns: returns a list of instance bodies
+        """
+        return list(self.iterprops(selector=selector, props=props, nocontent=nocontent, \
+                                skipnonsetting=skipnonsetting, remread=remread, \
+                                insts=insts, projection=projection))
+
+    def iterprops(self, selector=None, props=None, nocontent=None, skipnonsetting=True, \
+                            remread=False, insts=None, projection=None, fallback=None):
+        """ Properties of the selected instances, produced one instance at a time,
+        nocontent is only complete once every instance has been produced
+
+        :param selector: the type selection for the get operation.
+        :type selector: str.
+        :param props: property paths to return, all properties if empty.
+        :type props: list.
+        :param nocontent: property paths not found are added to this set.
+        :type nocontent: set.
+        :param skipnonsetting: flag to remove non settings path.
+        :type skipnonsetting: boolean.
+        :param remread: flag to remove readonly properties.
+        :type remread: boolean.
+        :param insts: instances to be searched for specific props
+        :type insts: list.
+        :param projection: compiled selection used instead of props
+        :type projection: Projection.
+        :param fallback: selection applied with the readonly properties kept to
+                         the instances they cannot be removed from, the error
+                         is raised when not given
+        :type fallback: Projection.
+        :returns: returns an iterator of instance bodies
+        """
+        if projection is None:
+            props = [props] if isinstance(props, six.string_types) else props
+            projection = Projection(props)
+        instances = insts if insts else self.getinstances(selector=selector)
+        instances = self.skipnonsettingsinst(instances) if skipnonsetting else instances
+
+        if not instances:
+            raise redfish.ris.NothingSelectedError()
+
+        def body(instance):
+            """ Body of an instance with its pending patches applied """
+            currdict = instance.dict
+            for patch in instance.patches:
+                currdict = jsonpatch.apply_patch(currdict, patch)
+            return currdict
+
+        for instance in instances:
+            currdict = body(instance)
+            selection = projection
+            if remread:
+                try:
+                    self.removereadonlyprops(currdict, emptyraise=True)
+                except redfish.ris.rmc_helper.EmptyRaiseForEAFP:
+                    if fallback is None:
+                        raise
+                    currdict = body(instance)
+                    selection = fallback
+            currdict = selection.apply(currdict)
+            if currdict is not None:
+                yield currdict
+
+        if nocontent is not None:
+            nocontent.update(prop for prop in projection.missing if fallback is None \
+                                                            or prop in fallback.missing)
+
+    def loadset(self, *args, **kwargs):
+        """ Set properties of the selection and drop the property indexes """
+        try:
+            return redfish.ris.RmcApp.loadset(self, *args, **kwargs)
+        finally:
+            if self._typeindex is not None:
+                self._typeindex.invalidate()
+
+    def updatemono(self, monolith=None, currtype=None, path=None, crawl=False, \
+                                            loadtype='href', rel=False):
+        """ Download the missing, modified or reloaded instances of a type or path
+
+        :param monolith: full data model retrieved from server.
+        :type monolith: RisMonolith.
+        :param currtype: the current entry type.
+        :type currtype: str.
+        :param path: path to check instead of a type.
+        :type path: str.
+        :param crawl: flag to determine if load should traverse found links.
+        :type crawl: boolean.
+        :param loadtype: the load type, href or ref.
+        :type loadtype: str.
+        :param rel: flag to reload the selected instances.
+        :type rel: boolean.
+        """
+        if not currtype or currtype == '"*"' or (monolith and monolith is not self.monolith):
+            return redfish.ris.RmcApp.updatemono(self, monolith=monolith, currtype=currtype, \
+                                path=path, crawl=crawl, loadtype=loadtype, rel=rel)
+
+        monolith = self.monolith
+        paths = set()
+        #typesadded keeps a path under its old type when it changes, check it again
+        for instpath in self.typeindex.paths(currtype):
+            resp = monolith.paths.get(instpath)
+            if resp is None or currtype.lower() not in resp.maj_type.lower():
+                continue
+            if rel or not resp:
+                paths.add(instpath)
+            if resp.modified:
+                paths.add(instpath)
+                paths.update(monolith.checkmodified(instpath) if instpath in \
+                                                    monolith.ctree else set())
+        if paths:
+            self.checkforchange(list(paths), crawl=crawl, loadtype=loadtype)
+
+    def types(self, fulltypes=False):
+        """ Types listed in the resource directory, cached until it is reloaded
+
+        :param fulltypes: flag to determine if types return full name.
+        :type fulltypes: boolean.
+        :returns: returns a list of type strings
+        """
+        monolith = self.current_client.monolith
+        rdirtype = next(iter(self.typeindex.search(self.typepath.defs.\
+                                                    resourcedirectorytype)), None)
+        if not rdirtype:
+            return redfish.ris.RmcApp.types(self, fulltypes)
+
+        resps = [inst.resp for inst in self.typeindex.instances(rdirtype)]
+        key = (monolith, bool(fulltypes))
+        if self._typescache and self._typescache[0] == key and \
+                len(self._typescache[1]) == len(resps) and \
+                all(old is new for old, new in zip(self._typescache[1], resps)):
+            return list(self._typescache[2])
+
+        instances = redfish.ris.RmcApp.types(self, fulltypes)
+        self._typescache = (key, resps, instances)
+        return list(instances)
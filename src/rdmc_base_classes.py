@@ -248,6 +248,16 @@ class RdmcOptionParser(OptionParser):
             " data only in memory.",
             default=False
         )
+        globalgroup.add_option(
+            '--cache-size',
+            dest='cachesize',
+            type='int',
+            default=100,
+            help="Size in MB of the sessions and data cached for every server"\
+            " and user logged into. The least recently used servers are"\
+            " logged out of and removed past it. (default: 100)",
+            metavar='MB'
+        )
         globalgroup.add_option(
             '--nologo',
             dest='nologo',
@@ -280,4 +290,40 @@ class RdmcOptionParser(OptionParser):
             help="""Use the provided proxy for communication.""",
             metavar='URL'
         )
+        globalgroup.add_option(
+            '--crawl-workers',
+            dest='crawlworkers',
+            type='int',
+            default=4,
+            help="Number of resources downloaded at once while crawling the"\
+            " server during login or gathering several types. At most 8 requests are sent to a server"\
+            " at once whatever the number of workers. (default: 4)",
+            metavar='N'
+        )
+        globalgroup.add_option(
+            '--record',
+            dest='record',
+            default=None,
+            help="Record every HTTP exchange to the provided cassette file."\
+            " Credentials and session keys are scrubbed. Runs are appended,"\
+            " so a whole session can be recorded into one cassette.",
+            metavar='FILE'
+        )
+        globalgroup.add_option(
+            '--replay',
+            dest='replay',
+            default=None,
+            help="Answer HTTP requests from the provided cassette file"\
+            " instead of the network.",
+            metavar='FILE'
+        )
+        globalgroup.add_option(
+            '--replay-scale',
+            dest='replayscale',
+            type='float',
+            default=1.0,
+            help="Factor applied to recorded latencies when replaying,"\
+            " 0 replays without delays. (default: 1.0)",
+            metavar='FACTOR'
+        )
         self.add_option_group(globalgroup)
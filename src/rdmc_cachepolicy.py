@@ -0,0 +1,433 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Per type cache freshness policy for RDMC
+
+Cached resources are kept for the time to live of the first rule whose
+type pattern matches their type, then revalidated against the server with
+their ETag before they are used again. A resource that did not change
+costs a 304 and keeps its cached body. Revalidation runs before the
+selection is returned, or in the background for resources that may be
+served stale once, with the new bodies applied on the next selection.
+"""
+
+#---------Imports---------
+
+import os
+import re
+import json
+import time
+import threading
+
+from multiprocessing.pool import ThreadPool
+
+from six.moves import configparser
+
+from rdmc_helper import LOGGER, ConfigurationFileError
+from rdmc_crawler import host_semaphore, normalize, store
+from rdmc_schemacache import atomicwrite
+
+#---------End of imports---------
+
+#Config file section holding the policy
+POLICY_SECTION = 'cache policy'
+
+#Revalidation modes, set with the refresh option of the section
+OFF = 'off'
+FOREGROUND = 'foreground'
+BACKGROUND = 'background'
+MODES = (OFF, FOREGROUND, BACKGROUND)
+
+#Time to live of resources kept until they are reloaded
+FOREVER = None
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+UNITS = {'': 1, 's': 1, 'm': MINUTE, 'h': HOUR, 'd': DAY}
+
+#Readings and logs are never reused, settings for minutes, schemas and
+#registries for hours, everything else until it is reloaded
+DEFAULT_RULES = [
+    ('LogService.', 0), ('LogEntryCollection', 0), ('Power.', 0), ('Thermal.', 0),
+    ('Bios.', 5 * MINUTE), ('BootSettings', 5 * MINUTE), ('SmartStorageConfig', \
+    5 * MINUTE), ('SecureBoot.', 5 * MINUTE), ('iSCSISoftwareInitiator', 5 * MINUTE),
+    ('SchemaFile', 12 * HOUR), ('MessageRegistryFile', 12 * HOUR), \
+    ('AttributeRegistry', 12 * HOUR), ('MessageRegistry', 12 * HOUR),
+]
+
+#Fetch times are stored next to the monolith cache file with this suffix
+FETCHED_EXTENSION = '.fetched'
+
+def parsettl(value):
+    """ Parse a time to live such as 30s, 10m, 12h, 1d or forever
+
+    :param value: config value
+    :type value: str.
+    :returns: returns the number of seconds or FOREVER
+    """
+    value = value.strip().lower()
+    if value == 'forever':
+        return FOREVER
+    match = re.match(r'^(\d+)\s*([smhd]?)$', value)
+    if not match:
+        raise ValueError(value)
+    return int(match.group(1)) * UNITS[match.group(2)]
+
+class CachePolicy(object):
+    """Ordered type pattern rules and the fetch times of cached resources
+
+    Fetch times are kept by normalized path. Resources without one, such
+    as members restored from a cache written before the policy existed,
+    count from the time the cache was loaded. A resource fetched since the
+    current command began is never stale, so even resources that are never
+    reused are downloaded once per command.
+    """
+    def __init__(self, rules=None, mode=FOREGROUND):
+        self.rules = [(pattern.lower().lstrip('#'), ttl) for pattern, ttl in \
+                                        (DEFAULT_RULES if rules is None else rules)]
+        self.mode = mode
+        self.url = None
+        self.fetched = {}
+        self.loaded = self.started = time.time()
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._results = []
+
+    def reset(self, url, loaded=None):
+        """ Forget the fetch times, the cache now holds the resources of url
+
+        :param url: base url of the server
+        :type url: str.
+        :param loaded: time the cached resources count from, now by default
+        :type loaded: float.
+        """
+        with self._lock:
+            self.url = url
+            self.fetched = {}
+            self.loaded = time.time() if loaded is None else loaded
+
+    def begin(self):
+        """ Start a new command, resources fetched before it may be stale again """
+        self.started = time.time()
+
+    def ttl(self, typename):
+        """ Time to live of a type
+
+        :param typename: type name of the resource
+        :type typename: str.
+        :returns: returns the number of seconds or FOREVER
+        """
+        typename = (typename or '').lower()
+        for pattern, ttl in self.rules:
+            if pattern in typename:
+                return ttl
+        return FOREVER
+
+    def touch(self, path, when=None):
+        """ Record that a resource was fetched or found unchanged
+
+        :param path: path of the resource
+        :type path: str.
+        :param when: fetch time, now by default
+        :type when: float.
+        """
+        with self._lock:
+            self.fetched[normalize(path)] = time.time() if when is None else when
+
+    def stale(self, monolith, paths, now=None):
+        """ Members of paths past their time to live
+
+        Members with pending changes are left alone, they are checked
+        again when they are committed.
+
+        :param monolith: monolith holding the members
+        :type monolith: RisMonolith.
+        :param paths: paths to check
+        :type paths: iterable.
+        :param now: time to compare against, now by default
+        :type now: float.
+        :returns: returns a list of (path, time to live)
+        """
+        if self.mode == OFF:
+            return []
+        now = time.time() if now is None else now
+        result = []
+        for path in paths:
+            member = monolith.paths.get(path)
+            if not member or member.patches or member.modified:
+                continue
+            ttl = self.ttl(member.maj_type)
+            if ttl is FOREVER:
+                continue
+            fetched = self.fetched.get(normalize(path), self.loaded)
+            if fetched < self.started and now - fetched >= ttl:
+                result.append((path, ttl))
+        return result
+
+    def revalidate(self, client, path, etag):
+        """ Download a resource unless it still has the cached ETag
+
+        :param client: client to download with
+        :type client: RmcClient.
+        :param path: path of the resource
+        :type path: str.
+        :param etag: ETag of the cached resource
+        :type etag: str.
+        :returns: returns the response, status 304 when unchanged
+        """
+        headers = {'If-None-Match': etag} if etag else None
+        with host_semaphore(client.get_base_url()):
+            LOGGER.debug('revalidating %s', path)
+            return client.get(path, headers=headers)
+
+    def revalidateall(self, client, entries, workers=1):
+        """ Revalidate resources concurrently
+
+        :param client: client to download with
+        :type client: RmcClient.
+        :param entries: (path, etag) of the resources
+        :type entries: list.
+        :param workers: number of concurrent revalidations
+        :type workers: int.
+        :returns: returns the responses in the order of the entries
+        """
+        revalidate = lambda entry: self.revalidate(client, *entry)
+        if client.get_base_url().startswith('blobstore'):
+            #The local CHIF interface is not thread safe
+            workers = 1
+        if workers <= 1 or len(entries) < 2:
+            return [revalidate(entry) for entry in entries]
+
+        pool = ThreadPool(min(workers, len(entries)))
+        try:
+            return pool.map(revalidate, entries)
+        finally:
+            pool.close()
+            pool.join()
+
+    def apply(self, monolith, path, resp):
+        """ Bring a cached member up to date with a revalidation response
+
+        :param monolith: monolith holding the member
+        :type monolith: RisMonolith.
+        :param path: path of the member
+        :type path: str.
+        :param resp: revalidation response
+        :type resp: RestResponse.
+        :returns: returns True if the member was replaced or removed
+        """
+        member = monolith.paths.get(path)
+        if resp is None or not member or member.patches or member.modified:
+            return False
+        if resp.status == 304:
+            self.touch(path)
+            return False
+        if resp.status in (404, 410):
+            monolith.removepath(path)
+            return True
+        if resp.status != 200:
+            LOGGER.info('Unable to revalidate %s, status %s. Keeping the cached data.', \
+                                                                    path, resp.status)
+            return False
+        store(monolith, path, resp)
+        return True
+
+    def refresh(self, monolith, paths, workers=1):
+        """ Revalidate the stale members of paths
+
+        Members that are never reused, and every member when the client
+        is the local CHIF interface, are revalidated now. Others are
+        revalidated now in foreground mode, or in a background thread in
+        background mode and served from the cache until the next refresh.
+
+        :param monolith: monolith holding the members
+        :type monolith: RisMonolith.
+        :param paths: paths to check
+        :type paths: iterable.
+        :param workers: number of concurrent revalidations
+        :type workers: int.
+        :returns: returns True if a member was replaced or removed
+        """
+        changed = self.collect(monolith)
+        client = monolith._client
+        now = []
+        later = []
+        for path, ttl in self.stale(monolith, paths):
+            if self.mode == BACKGROUND and ttl and not \
+                                client.get_base_url().startswith('blobstore'):
+                later.append(path)
+            else:
+                now.append(path)
+
+        resps = self.revalidateall(client, [(path, monolith.paths[path].etag) for path \
+                                                                    in now], workers)
+        for path, resp in zip(now, resps):
+            changed = self.apply(monolith, path, resp) or changed
+
+        if later:
+            self.submit(client, [(path, monolith.paths[path].etag) for path in later])
+        return changed
+
+    def submit(self, client, entries):
+        """ Revalidate resources in a background thread
+
+        :param client: client to download with
+        :type client: RmcClient.
+        :param entries: (path, etag) of the resources
+        :type entries: list.
+        """
+        with self._lock:
+            entries = [(path, etag) for path, etag in entries if path not in self._pending]
+            self._pending.update(path for path, _ in entries)
+        if not entries:
+            return
+
+        def worker():
+            """ Revalidate the entries and queue the responses """
+            for path, etag in entries:
+                try:
+                    resp = self.revalidate(client, path, etag)
+                except Exception as excp:
+                    LOGGER.info('Unable to revalidate %s: %s', path, excp)
+                    resp = None
+                with self._lock:
+                    self._results.append((path, resp))
+                    self._pending.discard(path)
+
+        thread = threading.Thread(target=worker)
+        thread.daemon = True
+        thread.start()
+
+    def collect(self, monolith, wait=False):
+        """ Apply the responses of background revalidations
+
+        :param monolith: monolith holding the members
+        :type monolith: RisMonolith.
+        :param wait: wait for running revalidations first
+        :type wait: bool.
+        :returns: returns True if a member was replaced or removed
+        """
+        while wait and self._pending:
+            time.sleep(0.05)
+        with self._lock:
+            results, self._results = self._results, []
+
+        changed = False
+        for path, resp in results:
+            changed = self.apply(monolith, path, resp) or changed
+        return changed
+
+    def save(self, cachefile, url, paths):
+        """ Store the fetch times of the cached members of a server next to its
+        cache file
+
+        :param cachefile: monolith cache file of the server
+        :type cachefile: str.
+        :param url: base url of the server
+        :type url: str.
+        :param paths: paths of the cached members
+        :type paths: iterable.
+        """
+        with self._lock:
+            fetched = dict((normalize(path), self.fetched.get(normalize(path), \
+                                                        self.loaded)) for path in paths)
+        try:
+            atomicwrite(cachefile + FETCHED_EXTENSION, json.dumps({'url': url, \
+                                                    'fetched': fetched}).encode('utf-8'))
+        except (IOError, OSError) as excp:
+            LOGGER.info('Unable to store the cache fetch times: %s', excp)
+
+    def restore(self, cachefile, url):
+        """ Load the fetch times of a server, members without one count from the
+        time the monolith was cached
+
+        :param cachefile: monolith cache file of the server
+        :type cachefile: str.
+        :param url: base url of the server
+        :type url: str.
+        """
+        try:
+            self.reset(url, os.path.getmtime(cachefile))
+        except OSError:
+            self.reset(url)
+
+        try:
+            with open(cachefile + FETCHED_EXTENSION, 'r') as infile:
+                fetched = json.load(infile).get('fetched', {})
+        except (IOError, OSError, ValueError, AttributeError):
+            return
+        with self._lock:
+            self.fetched.update(fetched)
+
+class TimedGet(object):
+    """Client get recording the fetch time of every resource downloaded
+
+    Replaces RmcClient.get, above any other replacement.
+    """
+    def __init__(self, policy, get):
+        self._policy = policy
+        self._get = get
+
+    def __call__(self, path, args=None, headers=None):
+        resp = self._get(path, args=args, headers=headers)
+        if not args and resp is not None and resp.status == 200:
+            self._policy.touch(path)
+        return resp
+
+def load_cache_policy(configfile):
+    """ Read the cache policy of a configuration file
+
+    The "cache policy" section holds a refresh option, off, foreground or
+    background, and the time to live of type patterns, tried in order
+    before the default rules.
+
+    :param configfile: configuration file path
+    :type configfile: str.
+    :returns: returns a CachePolicy
+    """
+    if not configfile or not os.path.isfile(configfile):
+        return CachePolicy()
+
+    parser = configparser.RawConfigParser()
+    parser.optionxform = str
+    try:
+        parser.read(configfile)
+    except configparser.Error as excp:
+        raise ConfigurationFileError("Unable to read the cache policy from the "\
+                                     "configuration file '%s': %s" % (configfile, excp))
+    if not parser.has_section(POLICY_SECTION):
+        return CachePolicy()
+
+    mode = FOREGROUND
+    rules = []
+    for option, value in parser.items(POLICY_SECTION):
+        if option.lower() == 'refresh':
+            mode = value.strip().lower()
+            if mode not in MODES:
+                raise ConfigurationFileError("The refresh option of the cache policy in "\
+                            "the configuration file '%s' must be one of %s." % \
+                                                        (configfile, ', '.join(MODES)))
+            continue
+        try:
+            rules.append((option, parsettl(value)))
+        except ValueError:
+            raise ConfigurationFileError("Invalid time to live '%s' for '%s' in the "\
+                    "configuration file '%s', use seconds with an s, m, h or d unit "\
+                                    "or forever." % (value, option, configfile))
+
+    return CachePolicy(rules=rules + DEFAULT_RULES, mode=mode)
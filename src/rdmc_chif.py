@@ -0,0 +1,67 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Process wide handle of the CHIF iLOrest library
+
+The library is looked up the first time it is needed and stays loaded for
+the rest of the process, so encoding and decoding credentials no longer
+loads and unloads it on every call. A missing library is only searched
+for once as well.
+"""
+
+#---------Imports---------
+
+import threading
+
+from redfish.hpilo.risblobstore2 import BlobStore2, ChifDllMissingError
+
+#---------End of imports---------
+
+class ChifLibrary(object):
+    """Lazily loaded handle of the CHIF iLOrest library"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._handle = None
+        self._error = None
+
+    def handle(self):
+        """ Handle of the library, loaded on first use
+
+        :returns: returns the library handle
+        """
+        with self._lock:
+            if self._handle is None and self._error is None:
+                try:
+                    self._handle = BlobStore2.gethprestchifhandle()
+                except ChifDllMissingError as excp:
+                    self._error = excp
+            if self._handle is None:
+                raise self._error
+            return self._handle
+
+    def available(self):
+        """ Check if the library can be loaded
+
+        :returns: returns True if the library is available
+        """
+        try:
+            self.handle()
+        except ChifDllMissingError:
+            return False
+        return True
+
+CHIF = ChifLibrary()
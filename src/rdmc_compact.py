@@ -0,0 +1,304 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Compact in memory monolith members for RDMC
+
+A library member keeps its whole download: the urllib3 response, the raw
+body and its decoded text, four bytes per character on Python 2, and an
+instance dictionary for each of them. Members are stored here as slotted
+records instead, holding the status, the headers and the body text as a
+native string. Paths, type names and header names are interned so every
+member shares them, and the raw body is rebuilt from the text when a
+caller asks for it.
+"""
+
+#---------Imports---------
+
+import json
+
+import six
+
+from six.moves import intern
+
+from redfish.rest.v1 import RisObject
+from redfish.ris.ris import RisMonolithMemberv100
+
+from rdmc_typeindex import VersionedPaths
+
+#---------End of imports---------
+
+#Header name tuples shared by every response sending the same headers
+_HEADERNAMES = {}
+
+#Marks a member whose type was not parsed yet
+_UNPARSED = object()
+
+def share(value):
+    """ Interned copy of a string, ASCII text becomes a native string on Python 2
+
+    :param value: value to share
+    :type value: str.
+    :returns: returns the shared value, other values as they are
+    """
+    if six.PY2 and isinstance(value, six.text_type):
+        try:
+            value = value.encode('ascii')
+        except UnicodeError:
+            return value
+    return intern(value) if isinstance(value, str) else value
+
+def nativetext(text):
+    """ Body text as a native string, UTF-8 encoded on Python 2
+
+    :param text: body text of a response
+    :type text: str.
+    :returns: returns the native string
+    """
+    if six.PY2 and isinstance(text, six.text_type):
+        return text.encode('utf-8')
+    elif not six.PY2 and isinstance(text, bytes):
+        return text.decode('utf-8', 'ignore')
+    return text
+
+class CompactRequest(object):
+    """Path and method of the request a monolith member answered"""
+    __slots__ = ('_path', '_method')
+
+    body = ''
+    url = None
+
+    def __init__(self, path, method='GET'):
+        self._path = share(path)
+        self._method = share(method)
+
+    @property
+    def path(self):
+        """Return object path"""
+        return self._path
+
+    @property
+    def method(self):
+        """Return object method"""
+        return self._method
+
+    def __str__(self):
+        return "{} {}\n\n".format(self.method, self.path)
+
+class CompactResponse(object):
+    """Read only RestResponse of a monolith member
+
+    Headers are kept as a shared tuple of names and a tuple of values and
+    looked up case insensitively, like the headers of a live response.
+    """
+    __slots__ = ('_request', '_status', '_names', '_values', '_read')
+
+    #Compact responses never hold the urllib3 response
+    _http_response = None
+
+    def __init__(self, request, status, headers, read):
+        self._request = request
+        self._status = status
+        items = sorted((share(name), share(value)) for name, value in \
+                                                        (headers or {}).items())
+        names = tuple(name for name, _ in items)
+        self._names = _HEADERNAMES.setdefault(names, names)
+        self._values = tuple(value for _, value in items)
+        self._read = nativetext(read)
+
+    @classmethod
+    def fromresponse(cls, resp):
+        """ Compact copy of a response
+
+        :param resp: response to copy
+        :type resp: RestResponse.
+        :returns: returns a CompactResponse
+        """
+        request = resp.request
+        request = CompactRequest(request.path, request.method) if request is not None \
+                                                                                else None
+        return cls(request, resp.status, resp.getheaders(), resp.read)
+
+    @property
+    def read(self):
+        """Body text of the response"""
+        return self._read
+
+    @read.setter
+    def read(self, read):
+        """Property for setting the body text
+
+        :param read: The data to set to read.
+        :type read: str.
+        """
+        if read is not None:
+            if isinstance(read, dict):
+                read = json.dumps(read, indent=4)
+            self._read = nativetext(read)
+
+    @property
+    def ori(self):
+        """Raw body of the response, rebuilt from its text"""
+        if self._read is None or isinstance(self._read, bytes):
+            return self._read
+        return self._read.encode('utf-8')
+
+    def getheaders(self):
+        """Function for accessing the headers"""
+        return dict(zip(self._names, self._values))
+
+    def getheader(self, name):
+        """Function for accessing an individual header
+
+        :param name: The header name to retrieve.
+        :type name: str.
+        :returns: returns the header value or None
+        """
+        if name in self._names:
+            return self._values[self._names.index(name)]
+        name = name.lower()
+        for position, header in enumerate(self._names):
+            if header.lower() == name:
+                return self._values[position]
+        return None
+
+    def loaddict(self, newdict):
+        """Property for setting JSON data
+
+        :param newdict: The string data to set as JSON data.
+        :type newdict: str.
+        """
+        self._read = nativetext(json.dumps(newdict, indent=4))
+
+    @property
+    def dict(self):
+        """Property for accessing the data as an dict"""
+        return json.loads(self._read)
+
+    @property
+    def obj(self):
+        """Property for accessing the data as an object"""
+        return RisObject.parse(self.dict)
+
+    @property
+    def status(self):
+        """Property for accessing the status code"""
+        return self._status
+
+    @property
+    def session_key(self):
+        """Property for accessing the saved session key"""
+        return self.getheader('x-auth-token')
+
+    @property
+    def session_location(self):
+        """Property for accessing the saved session location"""
+        return self.getheader('location')
+
+    @property
+    def request(self):
+        """Property for accessing the saved http request"""
+        return self._request
+
+    @property
+    def path(self):
+        """Return object path"""
+        return self._request.path
+
+    def __str__(self):
+        headerstr = ''
+        for kiy, val in self.getheaders().items():
+            headerstr += '%s %s\n' % (kiy, val)
+
+        return "%(status)s\n%(headerstr)s\n\n%(body)s" % \
+                            {'status': self.status, 'headerstr': headerstr, \
+                             'body': self.read}
+
+class CompactMember(RisMonolithMemberv100):
+    """Monolith member with its attributes in slots
+
+    The library base classes declare no __slots__, so a member still has
+    room for an instance dictionary, but it is never created: every
+    attribute the library sets is a slot. The type is parsed from the body
+    once instead of on every lookup.
+    """
+    __slots__ = ('_resp', '_patches', '_typestring', 'modified', 'defpath', 'deftype', \
+                 'defetag', '_type', '_typename')
+
+    def __init__(self, member):
+        resp = member.resp
+        if resp is not None and not isinstance(resp, CompactResponse):
+            resp = CompactResponse.fromresponse(resp)
+        self._resp = resp
+        self._patches = member.patches
+        self._typestring = member._typestring
+        self.modified = member.modified
+        self.defpath = share(member.defpath)
+        self.deftype = share(member.deftype)
+        self.defetag = member.defetag
+        self._type = share(member._type)
+        self._typename = _UNPARSED
+
+    __bool__ = RisMonolithMemberv100.__nonzero__
+
+    @property
+    def type(self):
+        """Return type from monolith"""
+        if self._typename is _UNPARSED:
+            self._typename = share(RisMonolithMemberv100.type.fget(self))
+        return self._typename
+
+    def load_from_dict(self, src):
+        """Load variables from dict monolith
+
+        :param src: source to load from
+        :type src: dict
+        """
+        RisMonolithMemberv100.load_from_dict(self, src)
+        if self._resp is not None and not isinstance(self._resp, CompactResponse):
+            self._resp = CompactResponse.fromresponse(self._resp)
+        self._typename = _UNPARSED
+
+class CompactPaths(VersionedPaths):
+    """Monolith paths replacement storing every member as a CompactMember"""
+    def __init__(self, *args, **kwargs):
+        VersionedPaths.__init__(self)
+        for key, val in dict(*args, **kwargs).items():
+            self[key] = val
+
+    def __setitem__(self, key, val):
+        if not isinstance(val, CompactMember):
+            val = CompactMember(val)
+        VersionedPaths.__setitem__(self, share(key), val)
+
+def compactmonolith(monolith):
+    """ Store the members of a monolith compactly, now and from then on
+
+    :param monolith: monolith to compact
+    :type monolith: RisMonolith.
+    :returns: returns the monolith
+    """
+    if isinstance(monolith.paths, CompactPaths):
+        return monolith
+
+    monolith.paths = CompactPaths(monolith.paths)
+    #Paths restored from cache are separate copies in every table
+    for table in (monolith.typesadded, monolith.ctree, monolith.colltypes):
+        for values in table.values():
+            shared = set(share(value) for value in values)
+            values.clear()
+            values.update(shared)
+    return monolith
@@ -0,0 +1,135 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Command line scoped client, credential and selection resolution for RDMC
+
+Every command checks for a client, decodes the credentials it was given
+and selects its type before it runs. Commands calling other commands,
+such as load selecting every type of its file or set selecting again for
+commit, repeated all of it. A RequestContext is started for each command
+line and shared by every command it runs, so credentials are decoded
+once and a selection that is still current is not made again.
+"""
+
+#---------Imports---------
+
+from rdmc_helper import Encryption
+
+#---------End of imports---------
+
+class RequestContext(object):
+    """Client, credentials and selections resolved for one command line"""
+    def __init__(self, app):
+        self._app = app
+        self._decoded = {}
+        self._selections = {}
+
+    def decode(self, options):
+        """ Decode the encoded user name and password of the options, values
+        already decoded are left as they are
+
+        :param options: command line options
+        :type options: list.
+        """
+        if not (getattr(options, 'encode', False) and options.user and options.password):
+            return
+        for name in ('user', 'password'):
+            value = getattr(options, name)
+            if value in self._decoded.values():
+                continue
+            if value not in self._decoded:
+                self._decoded[value] = Encryption.decode_credentials(value)
+            setattr(options, name, self._decoded[value])
+
+    def loginline(self, options):
+        """ Login command line for the url and credentials of the options, or
+        of the configuration file when none are given
+
+        :param options: command line options
+        :type options: list.
+        :returns: returns a list of login arguments
+        """
+        inputline = list()
+        config = self._app.config
+        if options.user or options.password or getattr(options, 'url', None):
+            if getattr(options, 'url', None):
+                inputline.extend([options.url])
+            if options.user:
+                inputline.extend(["-u", options.user])
+            if options.password:
+                inputline.extend(["-p", options.password])
+        else:
+            if config.get_url():
+                inputline.extend([config.get_url()])
+            if config.get_username():
+                inputline.extend(["-u", config.get_username()])
+            if config.get_password():
+                inputline.extend(["-p", config.get_password()])
+        return inputline
+
+    def resolve(self, options):
+        """ Current client, or the login command line to open one
+
+        :param options: command line options
+        :type options: list.
+        :returns: returns the client or None and the login arguments, empty
+                  when there is a client
+        """
+        self.decode(options)
+        try:
+            client = self._app.get_current_client()
+        except Exception:
+            return None, self.loginline(options)
+
+        if options.user and options.password:
+            if not client.get_username():
+                client.set_username(options.user)
+            if not client.get_password():
+                client.set_password(options.password)
+        return client, list()
+
+    def selection(self, selector, fltrvals):
+        """ Instances of a selection made by this command line, if it is still
+        the current selection and its instances are still in the monolith and
+        not modified since
+
+        :param selector: the type selection.
+        :type selector: str.
+        :param fltrvals: the filter values of the selection (Key,Val).
+        :type fltrvals: tuple.
+        :returns: returns a list of instances or None
+        """
+        instances = self._selections.get((selector, tuple(fltrvals)))
+        client = self._app._rmc_clients
+        if not instances or not client or client.selector != selector:
+            return None
+        paths = client.monolith.paths
+        if any(paths.get(inst.path) is not inst or inst.modified for inst in instances):
+            return None
+        return list(instances)
+
+    def selected(self, selector, fltrvals, instances):
+        """ Remember the instances of a selection for the rest of the command line
+
+        :param selector: the type selection.
+        :type selector: str.
+        :param fltrvals: the filter values of the selection (Key,Val).
+        :type fltrvals: tuple.
+        :param instances: selected instances.
+        :type instances: list.
+        """
+        self._selections[(selector, tuple(fltrvals))] = list(instances)
@@ -0,0 +1,326 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Bounded concurrent monolith crawler for RDMC"""
+
+#---------Imports---------
+
+import threading
+
+from multiprocessing.pool import ThreadPool
+
+import six
+
+from six.moves.urllib.parse import urlparse, urlunparse
+
+import redfish.ris
+
+from rdmc_helper import LOGGER
+from rdmc_compact import CompactResponse
+
+#---------End of imports---------
+
+#Requests sent to a single iLO at once, whatever the number of workers
+HOST_LIMIT = 8
+
+_HOST_SEMAPHORES = {}
+_HOST_LOCK = threading.Lock()
+
+def host_semaphore(url):
+    """ Semaphore shared by every crawl of a host
+
+    :param url: base url of the host
+    :type url: str.
+    :returns: returns a BoundedSemaphore
+    """
+    host = urlparse(url).netloc.lower() or url
+    with _HOST_LOCK:
+        if host not in _HOST_SEMAPHORES:
+            _HOST_SEMAPHORES[host] = threading.BoundedSemaphore(HOST_LIMIT)
+        return _HOST_SEMAPHORES[host]
+
+def fetcher(client):
+    """ Function downloading a path through the semaphore of the client host
+
+    :param client: client to download with
+    :type client: RmcClient.
+    :returns: returns a function taking a path and returning its response
+    """
+    semaphore = host_semaphore(client.get_base_url())
+
+    def fetch(path):
+        """ Download a single resource """
+        with semaphore:
+            LOGGER.debug('downloading %s', path)
+            return client.get(path)
+    return fetch
+
+def fetchall(client, paths, workers=1):
+    """ Download a list of paths concurrently
+
+    :param client: client to download with
+    :type client: RmcClient.
+    :param paths: paths to download
+    :type paths: list.
+    :param workers: number of concurrent downloads
+    :type workers: int.
+    :returns: returns the responses in the order of the paths
+    """
+    fetch = fetcher(client)
+    if client.get_base_url().startswith('blobstore'):
+        #The local CHIF interface is not thread safe
+        workers = 1
+    if workers <= 1 or len(paths) < 2:
+        return [fetch(path) for path in paths]
+
+    pool = ThreadPool(min(workers, len(paths)))
+    try:
+        return pool.map(fetch, paths)
+    finally:
+        pool.close()
+        pool.join()
+
+def iterlinks(body, hrefstring):
+    """ Yield every link found in a resource body
+
+    :param body: resource body to search
+    :type body: dict.
+    :param hrefstring: key holding links, @odata.id or href
+    :type hrefstring: str.
+    """
+    if isinstance(body, dict):
+        for key, val in body.items():
+            if key == hrefstring and isinstance(val, six.string_types):
+                yield val
+            else:
+                for link in iterlinks(val, hrefstring):
+                    yield link
+    elif isinstance(body, list):
+        for item in body:
+            for link in iterlinks(item, hrefstring):
+                yield link
+
+def memberlinks(body, collstr, hrefstring):
+    """ Yield the links of a resource body the monolith loader records as its
+    children, the ones of its collection members and log entries
+
+    :param body: resource body to search
+    :type body: dict.
+    :param collstr: key holding the members of a collection
+    :type collstr: str.
+    :param hrefstring: key holding links, @odata.id or href
+    :type hrefstring: str.
+    """
+    if isinstance(body, dict):
+        for key, val in body.items():
+            if key.startswith((collstr, 'Entries')):
+                for link in iterlinks(val, hrefstring):
+                    yield link
+
+def nextpage(path, body):
+    """ Link to the next page of a paged Gen9 collection
+
+    :param path: path of the collection page
+    :type path: str.
+    :param body: collection page body
+    :type body: dict.
+    :returns: returns the next page path or None
+    """
+    try:
+        page = body['links']['NextPage']['page']
+    except (KeyError, TypeError):
+        return None
+    return path.split('?')[0] + '?page=' + str(page)
+
+def cleanpath(path):
+    """ Strip fragments and escape pipes the way the monolith loader does
+
+    :param path: path to clean
+    :type path: str.
+    :returns: returns the path to request
+    """
+    parts = list(urlparse(path.replace("|", "%7C"))[:])
+    parts[-1] = ''
+    return urlunparse(tuple(parts))
+
+def normalize(path):
+    """ Lowercase a path and strip fragments and the trailing slash for comparisons
+
+    :param path: path to normalize
+    :type path: str.
+    :returns: returns the normalized path
+    """
+    return path.split('#')[0].rstrip('/').lower()
+
+def within(path, prefixes):
+    """ Check if a path is one of or below one of the prefixes
+
+    :param path: path to check
+    :type path: str.
+    :param prefixes: normalized path prefixes
+    :type prefixes: list.
+    :returns: returns True if path is below a prefix
+    """
+    path = normalize(path)
+    return any(path == prefix or path.startswith(prefix + '/') for prefix in prefixes)
+
+def islogentries(path):
+    """ Check if a path is the entries collection of a log service or below it
+
+    :param path: path to check
+    :type path: str.
+    :returns: returns True for IML, IEL and other log entries
+    """
+    keys = normalize(path).split('/')
+    return any(key == 'entries' and ind > 1 and keys[ind - 2] in ('logservices', 'logs') \
+                                                        for ind, key in enumerate(keys))
+
+def store(monolith, path, resp, init=False):
+    """ Add a downloaded resource to the monolith like the monolith loader
+
+    :param monolith: monolith to add the resource to
+    :type monolith: RisMonolith.
+    :param path: path the resource was downloaded from
+    :type path: str.
+    :param resp: response of the download
+    :type resp: RestResponse.
+    :param init: update the login progress dots
+    :type init: bool.
+    :returns: returns the stored member or None
+    """
+    if resp.status != 200 and path.lower() == monolith._client.typepath.defs.biospath:
+        raise redfish.ris.ris.BiosUnregisteredError()
+    elif resp.status == 401:
+        raise redfish.ris.SessionExpired("Invalid session. Please logout and "\
+                                         "log back in or include credentials.")
+    elif resp.status not in (201, 200):
+        monolith.removepath(path)
+        return None
+
+    monolith.update_member(resp=resp, path=path, init=init)
+    return monolith.path(path)
+
+def crawl(monolith, roots, prefixes=None, workers=1, exclude=None, resourcedir=None, \
+                                                            reload=False, init=False):
+    """ Download the roots and every resource linked below the prefixes
+
+    The crawl is breadth first. Every level is downloaded by a pool of
+    workers, at most HOST_LIMIT at once per host, and added to the monolith
+    in link order once the whole level is back, so the monolith comes out
+    the same whatever the number of workers.
+
+    Roots are always downloaded, links are only followed when they are one
+    of or below one of the prefixes and not below an excluded path. Log
+    entries are neither, serverlogs keeps them in the log store instead of
+    the monolith.
+    Resources already in the monolith are not downloaded again unless
+    reload is set, placeholders left by a lazy login are. Paths are compared
+    case insensitively and resolved to the monolith's spelling so a resource
+    is never stored twice. Links followed to collection members, log
+    entries and the resource directory are added to the monolith ctree
+    under the resource linking them, as the monolith loader does.
+
+    :param monolith: monolith to load the resources into
+    :type monolith: RisMonolith.
+    :param roots: paths to start from
+    :type roots: list.
+    :param prefixes: path prefixes the crawl may follow links into
+    :type prefixes: list.
+    :param workers: number of concurrent downloads
+    :type workers: int.
+    :param exclude: paths whose subtrees are never followed
+    :type exclude: list.
+    :param resourcedir: when a resource links this path only that link is
+                        followed, like the monolith loader does
+    :type resourcedir: str.
+    :param reload: download roots already in the monolith again
+    :type reload: bool.
+    :param init: update the login progress dots
+    :type init: bool.
+    :returns: returns the number of resources downloaded
+    """
+    prefixes = [normalize(prefix) for prefix in prefixes or []]
+    exclude = [normalize(path) for path in exclude or []]
+    client = monolith._client
+    download = fetcher(client)
+    if client.get_base_url().startswith('blobstore'):
+        #The local CHIF interface is not thread safe
+        workers = 1
+
+    def fetch(path):
+        """ Download a resource, keeping only its compact record until it is stored """
+        resp = download(path)
+        return CompactResponse.fromresponse(resp) if resp is not None else None
+
+    known = dict((normalize(path), path) for path in monolith.paths)
+    reloaded = set(normalize(path) for path in roots) if reload else set()
+    visited = set()
+    level = [path for path in roots if not islogentries(path)]
+    loaded = 0
+    pool = ThreadPool(workers) if workers > 1 else None
+
+    try:
+        while level:
+            paths = []
+            for path in level:
+                path = cleanpath(known.get(normalize(path), path))
+                if normalize(path) in visited:
+                    continue
+                visited.add(normalize(path))
+                paths.append(path)
+
+            missing = [path for path in paths if not monolith.path(path) or \
+                                                    normalize(path) in reloaded]
+            resps = pool.map(fetch, missing) if pool else [fetch(path) for path in missing]
+            loaded += len(missing)
+            downloaded = dict(zip(missing, resps))
+
+            level = []
+            for path in paths:
+                if path in downloaded:
+                    member = store(monolith, path, downloaded[path], init=init)
+                else:
+                    member = monolith.path(path)
+                if not member:
+                    continue
+                known[normalize(path)] = path
+
+                body = member.dict
+                links = list(iterlinks(body, monolith._hrefstring))
+                children = set(memberlinks(body, client.typepath.defs.collectionstring, \
+                                                                    monolith._hrefstring))
+                if resourcedir and any(normalize(link) == normalize(resourcedir) for \
+                                                                            link in links):
+                    #The resource directory links to itself, which ends the crawl there
+                    links = [resourcedir]
+                    children = set(links)
+                page = nextpage(path, body)
+                links += [page] if page else []
+
+                links = [link for link in links if within(link, prefixes) and not \
+                                        within(link, exclude) and not islogentries(link)]
+                for link in links:
+                    child = cleanpath(known.get(normalize(link), link))
+                    if link in children and child != path:
+                        monolith.ctree[path].add(child)
+                level.extend(link for link in links if normalize(link) not in visited)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    return loaded
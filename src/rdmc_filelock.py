@@ -0,0 +1,123 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Advisory file locks shared by the RDMC processes of a cache directory"""
+
+#---------Imports---------
+
+import os
+import time
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+#---------End of imports---------
+
+class FileLock(object):
+    """Advisory lock on a file, exclusive or shared
+
+    Locks are taken with flock, so they are released when the process
+    exits however it ends. Windows only has exclusive locks, shared locks
+    are not taken there.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self._handle = None
+
+    @property
+    def locked(self):
+        """ Check if the lock is held """
+        return self._handle is not None
+
+    def acquire(self, exclusive=True, blocking=True):
+        """ Take the lock
+
+        :param exclusive: take an exclusive lock instead of a shared one
+        :type exclusive: bool.
+        :param blocking: wait for the lock instead of failing
+        :type blocking: bool.
+        :returns: returns True if the lock was taken
+        """
+        if self._handle is not None:
+            return True
+        if os.name == 'nt' and not exclusive:
+            return True
+
+        handle = open(self.filename, 'a+')
+        try:
+            if os.name == 'nt':
+                taken = self._lockwindows(handle, blocking)
+            else:
+                taken = self._lockposix(handle, exclusive, blocking)
+        except Exception:
+            handle.close()
+            raise
+
+        if not taken:
+            handle.close()
+            return False
+        self._handle = handle
+        return True
+
+    @staticmethod
+    def _lockposix(handle, exclusive, blocking):
+        """ Take a flock on an open file """
+        flags = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+        try:
+            fcntl.flock(handle.fileno(), flags if blocking else flags | fcntl.LOCK_NB)
+        except (IOError, OSError):
+            if blocking:
+                raise
+            return False
+        return True
+
+    @staticmethod
+    def _lockwindows(handle, blocking):
+        """ Lock the first byte of an open file """
+        while True:
+            try:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+                return True
+            except (IOError, OSError):
+                if not blocking:
+                    return False
+                time.sleep(0.05)
+
+    def release(self):
+        """ Release the lock """
+        if self._handle is None:
+            return
+        try:
+            if os.name == 'nt':
+                self._handle.seek(0)
+                msvcrt.locking(self._handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._handle.fileno(), fcntl.LOCK_UN)
+        except (IOError, OSError):
+            pass
+        self._handle.close()
+        self._handle = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *_):
+        self.release()
@@ -33,10 +33,11 @@ import six
 import pyaes
 
 import redfish.ris
-import redfish.hpilo.risblobstore2 as risblobstore2
 
 import versioning
 
+from rdmc_chif import CHIF
+
 if os.name == 'nt':
     from six.moves import winreg
     from win32con import HKEY_LOCAL_MACHINE
@@ -148,6 +149,7 @@ class ReturnCodes(object):
     ENCRYPTION_ERROR = 81
     DRIVE_MISSING_ERROR = 82
     PATH_UNAVAILABLE_ERROR = 83
+    RETRY_CANCELLED_ERROR = 84
 
     # ****** RIS ERRORS ******
     RIS_RIS_BIOS_UNREGISTERED_ERROR = 100
@@ -291,7 +293,11 @@ class UploadError(RdmcError):
     pass
 
 class TimeOutError(RdmcError):
-    """Raised when the update service times out"""
+    """Raised when the update service or a retry policy times out"""
+    pass
+
+class RetryCancelledError(RdmcError):
+    """Raised when a retry policy wait has been cancelled"""
     pass
 
 class LibHPsrvMissingError(RdmcError):
@@ -497,15 +503,18 @@ class UI(object):
 
 class Encryption(object):
     """ Encryption/Decryption object """
+    #FIPS mode of the OS, read once per process
+    _fipsmode = None
+
     @staticmethod
     def check_fips_mode_os():
         """ Function to check for the OS fips mode
 
-        :param key: string to encrypt with
-        :type key: str.
-
         :returns: returns True if FIPS mode is active, False otherwise
         """
+        if Encryption._fipsmode is not None:
+            return Encryption._fipsmode
+
         fips = False
         if os.name == 'nt':
             reg = winreg.ConnectRegistry(None, HKEY_LOCAL_MACHINE)
@@ -523,10 +532,11 @@ class Encryption(object):
                 fipsfile = open("/proc/sys/crypto/fips_enabled")
                 result = fipsfile.readline()
                 if int(result) > 0:
-                    fipsfile = True
+                    fips = True
                 fipsfile.close()
             except:
                 fips = False
+        Encryption._fipsmode = fips
         return fips
 
     def encrypt_file(self, filetxt, key):
@@ -580,7 +590,7 @@ class Encryption(object):
         :returns: returns the decoded credential
         """
 
-        lib = risblobstore2.BlobStore2.gethprestchifhandle()
+        lib = CHIF.handle()
         credbuff = create_string_buffer(credential.encode('utf-8'))
         retbuff = create_string_buffer(128)
 
@@ -588,7 +598,6 @@ class Encryption(object):
 
         lib.decode_credentials(credbuff, byref(retbuff))
 
-        risblobstore2.BlobStore2.unloadchifhandle(lib)
         try:
             retbuff.value.encode('utf-8')
             if not retbuff.value:
@@ -609,7 +618,7 @@ class Encryption(object):
         :returns: returns the encoded credential
         """
 
-        lib = risblobstore2.BlobStore2.gethprestchifhandle()
+        lib = CHIF.handle()
         credbuff = create_string_buffer(credential.encode('utf-8'))
         retbuff = create_string_buffer(128)
 
@@ -617,7 +626,6 @@ class Encryption(object):
 
         lib.encode_credentials(credbuff, byref(retbuff))
 
-        risblobstore2.BlobStore2.unloadchifhandle(lib)
         try:
             retbuff.value.encode('utf-8')
             if not retbuff.value:
@@ -0,0 +1,403 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Multi server session cache for RDMC
+
+The library caches a single server, so moving to another server logs out
+of the first one and throws its monolith away. Sessions and monoliths are
+cached here for every server and user pair instead, each session in its
+own shard file. The index lists them from the most to the least recently
+used, the least recently used are evicted once the cache grows past its
+size limit.
+
+Several processes may share a cache directory. Shards and the index are
+replaced by atomic renames so readers never see them half written, index
+updates are serialized by a lock file, and every process holds a shared
+lock on the shard of the session it uses so no other process logs out of
+it or evicts it meanwhile.
+"""
+
+#---------Imports---------
+
+import os
+import json
+import time
+import uuid
+import hashlib
+
+from redfish.ris.rmc_helper import RmcFileCacheManager, JSONEncoder
+
+from rdmc_helper import LOGGER
+from rdmc_filelock import FileLock
+from rdmc_schemacache import makedirs, atomicwrite
+
+#---------End of imports---------
+
+INDEX = 'index'
+INDEX_LOCK = '.lock'
+SHARD_LOCK = '.lock'
+
+#Size of the cached sessions and monoliths of every server, in MB
+DEFAULT_CACHE_SIZE = 100
+
+def normalizeurl(url):
+    """ Compare urls the way the login command completes them
+
+    :param url: server url or host name
+    :type url: str.
+    :returns: returns the normalized url
+    """
+    if not url:
+        return url
+    url = url if '://' in url else 'https://' + url
+    return url.rstrip('/').lower()
+
+def hostkey(url, user):
+    """ Cache file name of a server and user
+
+    :param url: base url of the server
+    :type url: str.
+    :param user: user name, empty for local logins
+    :type user: str.
+    :returns: returns the file name
+    """
+    key = '%s\n%s' % (normalizeurl(url), user or '')
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+def shardname(url, user):
+    """ Cache file name of a new session of a server and user
+
+    :param url: base url of the server
+    :type url: str.
+    :param user: user name, empty for local logins
+    :type user: str.
+    :returns: returns the file name
+    """
+    return '%s-%s' % (hostkey(url, user), uuid.uuid4().hex[:16])
+
+def optionvalues(parser, args):
+    """ Values of the options of a command line, without running its checks
+
+    :param parser: option parser of the command
+    :type parser: OptionParser.
+    :param args: command arguments, without the command name
+    :type args: list.
+    :returns: returns a dictionary of values by destination and the
+              positional arguments
+    """
+    values = {}
+    positional = []
+    index = 0
+    while index < len(args):
+        arg = args[index]
+        option = parser.get_option(arg.split('=', 1)[0]) if arg.startswith('-') else None
+        if option is not None and option.takes_value():
+            if arg.startswith('--') and '=' in arg:
+                values[option.dest] = arg.split('=', 1)[1]
+            elif index + 1 < len(args):
+                index += 1
+                values[option.dest] = args[index]
+        elif not arg.startswith('-'):
+            positional.append(arg)
+        index += 1
+    return values, positional
+
+class RdmcFileCacheManager(RmcFileCacheManager):
+    """RMC file cache manager keeping several servers side by side
+
+    The client forgets its user name once its session is open, the user a
+    server is cached under is kept here instead, along with the time its
+    session was last used.
+    """
+    def __init__(self, rmc):
+        super(RdmcFileCacheManager, self).__init__(rmc)
+        self.maxsize = DEFAULT_CACHE_SIZE * 1024 * 1024
+        self.user = None
+        self.used = None
+        self.shard = None
+        self._shardlock = None
+
+    def indexlock(self):
+        """ Lock serializing the index updates of every process
+
+        :returns: returns a FileLock
+        """
+        return FileLock(os.path.join(self._rmc.config.get_cachedir(), INDEX_LOCK))
+
+    def holdshard(self, shard):
+        """ Use a shard, other processes leave it alone until it is released
+
+        :param shard: shard file name
+        :type shard: str.
+        """
+        self.releaseshard()
+        self.shard = shard
+        self._shardlock = FileLock(os.path.join(self._rmc.config.get_cachedir(), \
+                                                                    shard + SHARD_LOCK))
+        try:
+            self._shardlock.acquire(exclusive=False)
+        except (IOError, OSError) as excp:
+            LOGGER.info('Unable to lock the cache shard %s: %s', shard, excp)
+
+    def releaseshard(self):
+        """ Stop using the current shard, the next save starts a new one """
+        if self._shardlock is not None:
+            self._shardlock.release()
+        self._shardlock = None
+        self.shard = None
+
+    def claim(self, entry):
+        """ Lock the shard of an index entry, unless another process uses it
+
+        :param entry: index entry
+        :type entry: dict.
+        :returns: returns the held FileLock or None
+        """
+        lock = FileLock(os.path.join(self._rmc.config.get_cachedir(), entry['href'] + \
+                                                                            SHARD_LOCK))
+        try:
+            return lock if lock.acquire(blocking=False) else None
+        except (IOError, OSError):
+            return None
+
+    def readindex(self):
+        """ Cached servers from the most to the least recently used
+
+        :returns: returns a list of dictionaries with url, user, href, size
+                  and used keys
+        """
+        cachedir = self._rmc.config.get_cachedir()
+        try:
+            with open(os.path.join(cachedir, INDEX), 'r') as indexfh:
+                entries = json.load(indexfh)
+        except (IOError, OSError, ValueError, TypeError, AttributeError):
+            return []
+        return [entry for entry in entries if isinstance(entry, dict) and \
+                                                'url' in entry and 'href' in entry]
+
+    def writeindex(self, entries):
+        """ Store the cached servers
+
+        :param entries: index entries, most recently used first
+        :type entries: list.
+        """
+        cachedir = self._rmc.config.get_cachedir()
+        atomicwrite(os.path.join(cachedir, INDEX), json.dumps(entries, \
+                                                            indent=2).encode('utf-8'))
+
+    def cachefile(self, client):
+        """ Cache file of a client, its session shard
+
+        :param client: client to find the file of
+        :type client: RmcClient.
+        :returns: returns the file path
+        """
+        if self.shard is None:
+            self.holdshard(shardname(client.get_base_url(), self.user or \
+                                                            client.get_username()))
+        return os.path.join(self._rmc.config.get_cachedir(), self.shard)
+
+    @staticmethod
+    def matches(entry, url, user=None):
+        """ Check if an index entry caches a server, for any user if user is None
+
+        :param entry: index entry
+        :type entry: dict.
+        :param url: server url
+        :type url: str.
+        :param user: user name
+        :type user: str.
+        :returns: returns True if the entry matches
+        """
+        return normalizeurl(entry['url']) == normalizeurl(url) and (user is None or \
+                                                        (entry.get('user') or '') == user)
+
+    def uncache_rmc(self, url=None, user=None):
+        """ Restore a cached server, the most recently used one by default
+
+        :param url: url of the server to restore
+        :type url: str.
+        :param user: user of the server to restore, any if not given
+        :type user: str.
+        """
+        if not self._rmc.config.get_cachedir():
+            return
+        entries = self.readindex()
+        if url:
+            entries = [entry for entry in entries if self.matches(entry, url, user)]
+        cachedir = self._rmc.config.get_cachedir()
+        for entry in entries:
+            self.holdshard(entry['href'])
+            if not os.path.isfile(os.path.join(cachedir, entry['href'])):
+                #Evicted by another process since the index was read
+                self.releaseshard()
+                continue
+            self.user = entry.get('user') or None
+            self.used = entry.get('used')
+            self._uncache_client(entry['href'])
+            return
+
+    def cache_rmc(self):
+        """ Cache the current server and mark it as the most recently used """
+        client = self._rmc._rmc_clients
+        if not self._rmc.config.get_cache() or not client:
+            return
+
+        cachedir = self._rmc.config.get_cachedir()
+        makedirs(cachedir)
+        user = self.user or client.get_username()
+        login_data = dict(\
+            username=None, \
+            password=None, url=client.get_base_url(), \
+            session_key=self.encodefunct(client.get_session_key()), \
+            session_location=client.get_session_location(), \
+            authorization_key=client.get_authorization_key(), \
+            bios_password=client.get_biospassword(), \
+            redfish=client.monolith.is_redfish, \
+            ilo=client.typepath.ilogen,\
+            proxy=client.get_proxy())
+
+        clients_data = dict(selector=client.selector, login=login_data, \
+                 monolith=client.monolith, get=client.monolith.paths)
+
+        cachefile = self.cachefile(client)
+        data = json.dumps(clients_data, indent=2, cls=JSONEncoder).encode('utf-8')
+        atomicwrite(cachefile, data)
+
+        with self.indexlock():
+            entries = [entry for entry in self.readindex() if entry['href'] != self.shard]
+            entries.insert(0, dict(url=client.get_base_url(), user=user or '', \
+                            href=self.shard, size=len(data), used=time.time()))
+            self.writeindex(self.evict(entries))
+
+    def evict(self, entries):
+        """ Drop the least recently used servers past the size limit, never the
+        current one or one another process uses
+
+        :param entries: index entries, most recently used first
+        :type entries: list.
+        :returns: returns the entries kept
+        """
+        total = 0
+        kept = []
+        for position, entry in enumerate(entries):
+            total += entry.get('size', 0)
+            lock = self.claim(entry) if position and total > self.maxsize else None
+            if lock is None:
+                kept.append(entry)
+                continue
+            LOGGER.info('Evicting the cached session of %s from the cache.', entry['url'])
+            self.logoutsession(entry)
+            self.removeentry(entry)
+            lock.release()
+        return kept
+
+    def removeentry(self, entry):
+        """ Remove the files of a cached server
+
+        :param entry: index entry
+        :type entry: dict.
+        """
+        cachefile = os.path.join(self._rmc.config.get_cachedir(), entry['href'])
+        for filename in (cachefile, cachefile + '.fetched', cachefile + SHARD_LOCK):
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+
+    def sessionlocation(self, entry):
+        """ Session of a cached server
+
+        :param entry: index entry
+        :type entry: dict.
+        :returns: returns (session path, url, session key) or None
+        """
+        try:
+            with open(os.path.join(self._rmc.config.get_cachedir(), entry['href']), \
+                                                                    'r') as clientsfh:
+                login = json.load(clientsfh).get('login', {})
+        except (IOError, OSError, ValueError, AttributeError):
+            return None
+        if not login.get('session_location') or not login.get('url'):
+            return None
+
+        if 'blobstore' in login['url']:
+            return (login['session_location'].split('//')[-1], None, \
+                                        self.decodefunct(login.get('session_key')))
+        return (login['session_location'].split(login['url'])[-1], login['url'], \
+                                        self.decodefunct(login.get('session_key')))
+
+    def logoutsession(self, entry):
+        """ Delete the session of a cached server on the server, if it is still open
+
+        :param entry: index entry
+        :type entry: dict.
+        """
+        session = self.sessionlocation(entry)
+        if not session:
+            return
+        try:
+            self._rmc.delete_handler(session[0], url=session[1], sessionid=session[2], \
+                                                            silent=True, service=True)
+        except Exception:
+            pass
+
+    def logout_del_function(self, url=None, user=None):
+        """ Remove cached servers, the current one when no url is given or every
+        one when there is no current server either. Servers another process
+        uses are kept.
+
+        :param url: url of the servers to remove
+        :type url: str.
+        :param user: user of the servers to remove, any if not given
+        :type user: str.
+        :returns: returns the sessions of the removed servers
+        """
+        if not self._rmc.config.get_cachedir():
+            return []
+
+        client = self._rmc._rmc_clients
+        current = self.shard
+        self.releaseshard()
+        self.user = None
+
+        sessionlocs = []
+        with self.indexlock():
+            entries = self.readindex()
+            if url:
+                candidates = [entry for entry in entries if self.matches(entry, url, user)]
+            elif client:
+                candidates = [entry for entry in entries if entry['href'] == current]
+            else:
+                candidates = entries
+
+            removed = []
+            for entry in candidates:
+                lock = self.claim(entry)
+                if lock is None:
+                    LOGGER.info('Keeping the cached session of %s, another process is '\
+                                                            'using it.', entry['url'])
+                    continue
+                session = self.sessionlocation(entry)
+                if session:
+                    sessionlocs.append(session)
+                self.removeentry(entry)
+                lock.release()
+                removed.append(entry)
+            if removed:
+                self.writeindex([entry for entry in entries if entry not in removed])
+        return sessionlocs
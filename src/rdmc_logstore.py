@@ -0,0 +1,211 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Log entry store for RDMC
+
+Log entries are kept out of the monolith, so commands working on the
+configuration never load, save or select them. They are stored in an
+SQLite database in the cache directory instead, one row per entry in
+the order the server listed them, indexed by creation time, severity
+and Id. The database is only opened by the commands reading logs.
+
+Entries do not change once logged, so only the entries added to a log
+since it was stored have to be downloaded and written.
+"""
+
+#---------Imports---------
+
+import os
+import json
+import time
+import sqlite3
+
+from collections import OrderedDict
+
+import six
+
+from rdmc_helper import LOGGER
+from rdmc_crawler import normalize
+from rdmc_hostcache import normalizeurl
+from rdmc_schemacache import makedirs
+
+#---------End of imports---------
+
+#Database file name in the cache directory
+LOGSTORE = 'logs.sqlite'
+
+#Type of the log entries collections, listed again by every command by default
+LOGTYPE = 'LogEntryCollection'
+
+#Entry properties stored in their own indexed column
+INDEXED = {'Id': 'id', 'Created': 'created', 'Severity': 'severity'}
+
+SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS logs (server TEXT NOT NULL, log TEXT NOT NULL, '\
+                                            'synced REAL, PRIMARY KEY (server, log))',
+    'CREATE TABLE IF NOT EXISTS entries (server TEXT NOT NULL, log TEXT NOT NULL, '\
+                'position INTEGER NOT NULL, id TEXT, created TEXT, severity TEXT, '\
+                                'body TEXT NOT NULL, PRIMARY KEY (server, log, position))',
+    'CREATE INDEX IF NOT EXISTS entries_id ON entries (server, log, id)',
+    'CREATE INDEX IF NOT EXISTS entries_created ON entries (server, log, created)',
+    'CREATE INDEX IF NOT EXISTS entries_severity ON entries (server, log, severity)',
+]
+
+class LogStore(object):
+    """Log entries of every server, by log entries collection
+
+    Without a file the entries are only kept in memory for the process.
+    """
+    def __init__(self, filename=None):
+        self.filename = filename
+        self._conn = None
+
+    @property
+    def conn(self):
+        """ Database connection, the database is created on first use """
+        if self._conn is None:
+            if self.filename and not os.path.isfile(self.filename):
+                #Readable by the owner only, like the rest of the cache
+                makedirs(os.path.dirname(self.filename))
+                os.close(os.open(self.filename, os.O_CREAT | os.O_WRONLY, 0o600))
+            self._conn = sqlite3.connect(self.filename or ':memory:', timeout=30)
+            with self._conn:
+                for statement in SCHEMA:
+                    self._conn.execute(statement)
+        return self._conn
+
+    def exists(self):
+        """ Check if anything may be stored yet, without creating the database """
+        return self._conn is not None or bool(self.filename and \
+                                                        os.path.isfile(self.filename))
+
+    def synced(self, server, log):
+        """ Time the entries of a log were last downloaded
+
+        :param server: base url of the server
+        :type server: str.
+        :param log: path of the log entries collection
+        :type log: str.
+        :returns: returns the time or None
+        """
+        if not self.exists():
+            return None
+        row = self.conn.execute('SELECT synced FROM logs WHERE server = ? AND log = ?', \
+                                    (normalizeurl(server), normalize(log))).fetchone()
+        return row[0] if row else None
+
+    def fresh(self, server, log, ttl):
+        """ Check if the stored entries of a log may be used without downloading them
+
+        :param server: base url of the server
+        :type server: str.
+        :param log: path of the log entries collection
+        :type log: str.
+        :param ttl: seconds the entries are kept, None to keep them until reloaded
+        :type ttl: int.
+        :returns: returns True if the stored entries are fresh
+        """
+        synced = self.synced(server, log)
+        if synced is None:
+            return False
+        return ttl is None or time.time() - synced < ttl
+
+    def update(self, server, log, entries):
+        """ Store the entries of a log, only the new ones are written when the
+        stored entries start the list, as when entries were added to the log
+
+        :param server: base url of the server
+        :type server: str.
+        :param log: path of the log entries collection
+        :type log: str.
+        :param entries: log entry bodies in the order of the server
+        :type entries: list.
+        """
+        key = (normalizeurl(server), normalize(log))
+        rows = []
+        for position, entry in enumerate(entries):
+            columns = [entry.get(name) if isinstance(entry, dict) else None for name in \
+                                                            ('Id', 'Created', 'Severity')]
+            columns = [value if isinstance(value, six.string_types) else None for value \
+                                                                            in columns]
+            rows.append(key + (position,) + tuple(columns) + (json.dumps(entry),))
+
+        stored = [row[0] for row in self.conn.execute('SELECT body FROM entries WHERE '\
+                                    'server = ? AND log = ? ORDER BY position', key)]
+        appended = len(stored) <= len(rows) and all(body == row[-1] for body, row in \
+                                                                    zip(stored, rows))
+        rows = rows[len(stored):] if appended else rows
+
+        with self.conn:
+            if not appended:
+                self.conn.execute('DELETE FROM entries WHERE server = ? AND log = ?', key)
+            self.conn.executemany('INSERT INTO entries (server, log, position, id, created, '\
+                                        'severity, body) VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            self.conn.execute('INSERT OR REPLACE INTO logs (server, log, synced) VALUES '\
+                                                        '(?, ?, ?)', key + (time.time(),))
+        LOGGER.debug('Stored %s entries of %s', len(rows), log)
+
+    def entries(self, server, log, sel=None, val=None):
+        """ Stored entries of a log in the order of the server
+
+        :param server: base url of the server
+        :type server: str.
+        :param log: path of the log entries collection
+        :type log: str.
+        :param sel: indexed property to filter on, Id, Created or Severity
+        :type sel: str.
+        :param val: value the property must be equal to
+        :type val: str.
+        :returns: returns a list of log entry bodies
+        """
+        if not self.exists():
+            return []
+        query = 'SELECT body FROM entries WHERE server = ? AND log = ?'
+        params = (normalizeurl(server), normalize(log))
+        if sel is not None:
+            query += ' AND %s = ?' % INDEXED[sel]
+            params += (val,)
+        return [json.loads(row[0], object_pairs_hook=OrderedDict) for row in \
+                                    self.conn.execute(query + ' ORDER BY position', params)]
+
+    def clear(self, server=None, log=None):
+        """ Forget the entries of a log, of every log of a server or of every server
+
+        :param server: base url of the server
+        :type server: str.
+        :param log: path of the log entries collection
+        :type log: str.
+        """
+        if not self.exists():
+            return
+        where, params = '', ()
+        if server:
+            where, params = ' WHERE server = ?', (normalizeurl(server),)
+            if log:
+                where, params = where + ' AND log = ?', params + (normalize(log),)
+        try:
+            with self.conn:
+                self.conn.execute('DELETE FROM entries' + where, params)
+                self.conn.execute('DELETE FROM logs' + where, params)
+        except sqlite3.Error as excp:
+            LOGGER.info('Unable to clear the log store: %s', excp)
+
+    def close(self):
+        """ Close the database """
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = None
@@ -0,0 +1,150 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Login crawl profiles for RDMC"""
+
+#---------Imports---------
+
+import os
+
+from six.moves import configparser
+
+from rdmc_helper import InvalidCommandLineError, ConfigurationFileError
+
+#---------End of imports---------
+
+#Config file sections defining custom profiles start with this
+PROFILE_SECTION = 'profile '
+
+class CrawlProfile(object):
+    """Set of type patterns and path prefixes bounding the login crawl
+
+    Instances of matching types are downloaded from the resource directory,
+    path prefixes are relative to the service root and are crawled along
+    with every resource linked below them.
+    """
+    def __init__(self, name, types=None, paths=None):
+        self.name = name
+        self.types = list(types or [])
+        self.paths = list(paths or [])
+
+    def matchestype(self, typename):
+        """ Check if a type matches one of the type patterns
+
+        :param typename: type name to check
+        :type typename: str.
+        :returns: returns True if the type matches
+        """
+        typename = (typename or '').lower()
+        return any(pattern.lower().lstrip('#') in typename for pattern in self.types)
+
+    def prefixes(self, startpath):
+        """ Absolute path prefixes of the profile
+
+        :param startpath: service root path, /redfish/v1/ or /rest/v1
+        :type startpath: str.
+        :returns: returns a list of paths
+        """
+        return [startpath.rstrip('/') + '/' + path.lstrip('/') for path in self.paths]
+
+#The full profile keeps the regular crawl
+PROFILES = {
+    'full': None,
+    'bios': CrawlProfile('bios', types=['Bios.', 'BiosMapping.', \
+            'ServerBootSettings.', 'SecureBoot.', 'iSCSISoftwareInitiator.', \
+            'TlsConfig.', 'KmsConfig.'], paths=['Systems/1/bios/']),
+    'firmware': CrawlProfile('firmware', types=['UpdateService.', \
+            'SoftwareInventory', 'FwSwVersionInventory', 'HpeComponent', \
+            'MaintenanceWindow'], paths=['UpdateService/']),
+    'logs': CrawlProfile('logs', types=['LogService'], \
+            paths=['Systems/1/LogServices/', 'Managers/1/LogServices/']),
+    'storage': CrawlProfile('storage', types=['SmartStorage', 'Storage.', \
+            'StorageCollection', 'Drive.', 'Volume'], paths=['Systems/1/SmartStorage/', \
+            'Systems/1/Storage/']),
+    'accounts': CrawlProfile('accounts', types=['AccountService.', 'ManagerAccount', \
+            'AccountCollection', 'FederationGroup', 'SessionService.'], \
+            paths=['AccountService/']),
+    'network': CrawlProfile('network', types=['EthernetInterface', \
+            'EthernetNetworkInterface', 'ManagerNetworkProtocol', 'NetworkAdapter', \
+            'NetworkPort', 'NetworkDeviceFunction', 'NetworkInterface', \
+            'SnmpService', 'HostInterface'], paths=['Managers/1/EthernetInterfaces/', \
+            'Systems/1/EthernetInterfaces/']),
+}
+
+def splitlist(value):
+    """ Split a comma or whitespace separated config value
+
+    :param value: config value
+    :type value: str.
+    :returns: returns a list of entries
+    """
+    return [item for item in value.replace(',', ' ').split() if item]
+
+def load_custom_profiles(configfile):
+    """ Read the custom profiles of a configuration file
+
+    Custom profiles are sections named "profile NAME" holding comma
+    separated types and paths options.
+
+    :param configfile: configuration file path
+    :type configfile: str.
+    :returns: returns a dictionary of CrawlProfile by name
+    """
+    profiles = {}
+    if not configfile or not os.path.isfile(configfile):
+        return profiles
+
+    parser = configparser.RawConfigParser()
+    try:
+        parser.read(configfile)
+    except configparser.Error as excp:
+        raise ConfigurationFileError("Unable to read profiles from the configuration "\
+                                     "file '%s': %s" % (configfile, excp))
+
+    for section in parser.sections():
+        if not section.startswith(PROFILE_SECTION):
+            continue
+        name = section[len(PROFILE_SECTION):].strip().lower()
+        types = splitlist(parser.get(section, 'types')) if parser.has_option(section, \
+                                                                    'types') else []
+        paths = splitlist(parser.get(section, 'paths')) if parser.has_option(section, \
+                                                                    'paths') else []
+        if not name or not (types or paths):
+            raise ConfigurationFileError("Profile section '%s' in the configuration "\
+                            "file '%s' needs a name and types or paths." % (section, \
+                                                                        configfile))
+        profiles[name] = CrawlProfile(name, types=types, paths=paths)
+
+    return profiles
+
+def get_profile(name, configfile=None):
+    """ Find a built in or custom profile by name
+
+    :param name: profile name
+    :type name: str.
+    :param configfile: configuration file holding custom profiles
+    :type configfile: str.
+    :returns: returns a CrawlProfile or None for the full profile
+    """
+    profiles = dict(PROFILES)
+    profiles.update(load_custom_profiles(configfile))
+
+    try:
+        return profiles[name.lower()]
+    except KeyError:
+        raise InvalidCommandLineError("Unknown profile '%s'. Available profiles: %s" % \
+                                      (name, ', '.join(sorted(profiles))))
@@ -0,0 +1,218 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Column projection of instances for RDMC
+
+The property paths of get and list are parsed once into a tree keyed by
+lower case property name, with the Attributes/ prefix of BIOS selections
+and the reserved property exclusions applied up front. Each instance is
+then walked once along the tree and only the selected values are copied,
+instead of deep copying the whole instance for every property and
+removing the reserved properties from the copies afterwards.
+"""
+
+#---------Imports---------
+
+from collections import OrderedDict
+
+from rdmc_base_classes import HARDCODEDLIST
+
+#---------End of imports---------
+
+#Marks a path that is not in the instance
+MISSING = object()
+
+#Tree node of a path that selects the whole value
+WHOLE = None
+
+def isreserved(key):
+    """ Check if a property is left out of get output
+
+    :param key: property name
+    :type key: str.
+    :returns: returns True if the property is reserved
+    """
+    key = key.lower()
+    return key in HARDCODEDLIST or '@odata' in key
+
+class Projection(object):
+    """Compiled selection of property paths
+
+    :param props: property paths, keys separated by /, all properties if empty
+    :type props: list.
+    :param attributes: the selection is a BIOS type, its Attributes are
+                       moved to the top of the results
+    :type attributes: bool.
+    :param prefixed: property paths are searched under Attributes, for
+                     Redfish BIOS types whose body is not flat
+    :type prefixed: bool.
+    :param reserved: leave the reserved properties out
+    :type reserved: bool.
+    :param ordered: sort the top level properties of the results
+    :type ordered: bool.
+    """
+    def __init__(self, props=None, attributes=False, prefixed=False, reserved=False, \
+                                                                        ordered=False):
+        self.props = list(props or [])
+        self.attributes = attributes
+        self.prefixed = prefixed
+        self.reserved = reserved
+        self.ordered = ordered
+        self.found = set()
+        self.tree = self.compile(self.props) if self.props else WHOLE
+
+    def compile(self, props):
+        """ Parse property paths into a tree of lower case property names,
+        leaves select the whole value and list the paths ending there
+
+        :param props: property paths
+        :type props: list.
+        :returns: returns the root node
+        """
+        root = {}
+        for prop in props:
+            path = prop
+            if self.prefixed and 'attributes' not in prop.lower():
+                path = 'Attributes/' + prop
+            node = root
+            keys = [key.lower() for key in path.split('/')]
+            for key in keys[:-1]:
+                child = node.get(key)
+                if isinstance(child, list):
+                    #A shorter path already selects the whole value
+                    child.append(prop)
+                    break
+                node = node.setdefault(key, {})
+            else:
+                child = node.get(keys[-1])
+                if isinstance(child, list):
+                    child.append(prop)
+                else:
+                    #Longer paths are covered by this one
+                    node[keys[-1]] = [prop] + self.leaves(child)
+        return root
+
+    def leaves(self, node):
+        """ Paths ending under a node
+
+        :param node: tree node
+        :type node: dict or list.
+        :returns: returns a list of property paths
+        """
+        if node is None:
+            return []
+        if isinstance(node, list):
+            return list(node)
+        return [prop for child in node.values() for prop in self.leaves(child)]
+
+    @property
+    def missing(self):
+        """ Property paths not found in any instance applied so far """
+        return [prop for prop in self.props if prop not in self.found]
+
+    def apply(self, currdict):
+        """ Selected properties of an instance
+
+        :param currdict: body of the instance
+        :type currdict: dict.
+        :returns: returns the selection, None if no path was found
+        """
+        if self.tree is WHOLE:
+            result = self.strip(currdict) if self.reserved else currdict
+        else:
+            result = self.walk(self.tree, currdict)
+            if result is MISSING:
+                return None
+
+        if self.attributes and isinstance(result.get('Attributes'), dict):
+            result = dict(result)
+            result.update(result.pop('Attributes'))
+        if self.ordered:
+            result = OrderedDict(sorted(list(result.items()), key=lambda x: x[0]))
+        return result
+
+    def walk(self, node, value):
+        """ Copy the values of a tree node out of a value
+
+        :param node: tree node
+        :type node: dict.
+        :param value: value to select from
+        :type value: dict or list.
+        :returns: returns the selection or MISSING
+        """
+        if isinstance(value, dict):
+            result = {}
+            found = False
+            for key, val in value.items():
+                child = node.get(key.lower(), MISSING)
+                if child is MISSING:
+                    continue
+                if isinstance(child, list):
+                    self.found.update(child)
+                else:
+                    val = self.walk(child, val)
+                    if val is MISSING:
+                        continue
+                found = True
+                if self.reserved:
+                    if isreserved(key):
+                        continue
+                    val = self.strip(val) if isinstance(child, list) else val
+                    if self.empty(val):
+                        continue
+                result[key] = val
+            return result if found else MISSING
+        elif isinstance(value, (list, tuple)):
+            result = [self.walk(node, item) for item in value]
+            result = [item for item in result if item is not MISSING]
+            return result if result else MISSING
+        return MISSING
+
+    def strip(self, value):
+        """ Copy of a value without its reserved properties
+
+        :param value: value to copy
+        :type value: dict or list.
+        :returns: returns the copy
+        """
+        if isinstance(value, dict):
+            result = {}
+            for key, val in value.items():
+                if isreserved(key):
+                    continue
+                val = self.strip(val)
+                if not self.empty(val):
+                    result[key] = val
+            return result
+        elif isinstance(value, list):
+            return [self.strip(item) if isinstance(item, dict) else item for item in value]
+        return value
+
+    @staticmethod
+    def empty(value):
+        """ Check if a value is left out once its reserved properties are removed,
+        which are empty objects and lists of objects that are all empty
+
+        :param value: stripped value
+        :type value: dict or list.
+        :returns: returns True if the value is left out
+        """
+        if isinstance(value, dict):
+            return not value
+        if isinstance(value, list) and any(isinstance(item, dict) for item in value):
+            return not any(value)
+        return False
@@ -0,0 +1,103 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""OData query push-down for RDMC
+
+iLO firmware listing FilterQuery in the ProtocolFeaturesSupported of its
+service root evaluates $filter itself. A filter on a property is sent
+along with the request of a collection, so only the matching members are
+transferred. Results are still filtered on the client, which is also the
+fallback when the server does not support or rejects the query.
+"""
+
+#---------Imports---------
+
+import six
+
+from six.moves.urllib.parse import quote
+
+#---------End of imports---------
+
+#Protocol feature of the service root for $filter
+FILTERQUERY = 'FilterQuery'
+
+def protocolfeatures(monolith):
+    """ Query features the server advertises in its service root
+
+    :param monolith: monolith of the server
+    :type monolith: RisMonolith.
+    :returns: returns the ProtocolFeaturesSupported object, empty if none
+    """
+    for typename, paths in list(monolith.typesadded.items()):
+        if not typename.lower().lstrip('#').startswith('serviceroot.'):
+            continue
+        for path in paths:
+            member = monolith.paths.get(path)
+            if member is None:
+                continue
+            try:
+                features = member.dict.get('ProtocolFeaturesSupported')
+            except (ValueError, AttributeError):
+                continue
+            if isinstance(features, dict):
+                return features
+    return {}
+
+def supports(monolith, feature):
+    """ Check if the server evaluates a query parameter
+
+    :param monolith: monolith of the server
+    :type monolith: RisMonolith.
+    :param feature: feature name, such as FILTERQUERY
+    :type feature: str.
+    :returns: returns True if the feature is advertised
+    """
+    return protocolfeatures(monolith).get(feature) is True
+
+def filterexpr(sel, val):
+    """ $filter expression of an attribute equal to a value
+
+    :param sel: attribute path, keys separated by /
+    :type sel: str.
+    :param val: value the attribute must be equal to
+    :type val: str, bool or int.
+    :returns: returns the expression, None if the filter can not be sent,
+              such as a prefix match
+    """
+    if not sel or val is None:
+        return None
+    if isinstance(val, bool):
+        literal = 'true' if val else 'false'
+    elif isinstance(val, six.integer_types):
+        literal = str(val)
+    elif isinstance(val, six.string_types) and not val.endswith('*'):
+        literal = "'%s'" % val.replace("'", "''")
+    else:
+        return None
+    return '%s eq %s' % (sel, literal)
+
+def querypath(path, filterquery):
+    """ Path of a collection with a $filter query parameter
+
+    :param path: path of the collection
+    :type path: str.
+    :param filterquery: $filter expression
+    :type filterquery: str.
+    :returns: returns the path to request
+    """
+    return path + ('&' if '?' in path else '?') + '$filter=' + \
+                                                    quote(filterquery, safe="/'@")
@@ -0,0 +1,279 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Retry and backoff policy engine for RDMC"""
+
+#---------Imports---------
+
+import time
+import socket
+import random
+import threading
+
+import urllib3
+
+import redfish.rest.v1
+
+from rdmc_helper import LOGGER, TimeOutError, RetryCancelledError
+
+#---------End of imports---------
+
+#UpdateService states in which the service is done processing a request
+UPDATESERVICE_TERMINAL_STATES = ["COMPLETED", "COMPLETE", "IDLE", "ERROR"]
+
+def retry_on_unavailable(result=None, excp=None):
+    """ Retry predicate for responses returned with a 503 status
+
+    :param result: result returned by the retried function
+    :type result: RestResponse.
+    :param excp: exception raised by the retried function
+    :type excp: exception.
+    :returns: returns True if the call should be retried
+    """
+    if excp is not None:
+        return '503' in str(excp)
+    return getattr(result, 'status', None) == 503
+
+def retry_on_connection_error(result=None, excp=None):
+    """ Retry predicate for refused, reset or dropped connections
+
+    :param result: result returned by the retried function
+    :type result: RestResponse.
+    :param excp: exception raised by the retried function
+    :type excp: exception.
+    :returns: returns True if the call should be retried
+    """
+    return isinstance(excp, (socket.error, urllib3.exceptions.HTTPError, \
+                             redfish.rest.v1.RetriesExhaustedError, \
+                             redfish.rest.v1.ServerDownOrUnreachableError))
+
+def retry_on_busy_updateservice(result=None, excp=None):
+    """ Retry predicate for an UpdateService that has not reached a terminal
+    state. Accepts a state string, a (state, body) tuple or an UpdateService
+    body.
+
+    :param result: result returned by the retried function
+    :type result: str, tuple or dict.
+    :param excp: exception raised by the retried function
+    :type excp: exception.
+    :returns: returns True if the call should be retried
+    """
+    if excp is not None:
+        return False
+
+    state = result[0] if isinstance(result, tuple) else result
+    if isinstance(state, dict):
+        try:
+            state = state['Oem']['Hpe']['State']
+        except (KeyError, TypeError):
+            return False
+
+    return str(state).upper() not in UPDATESERVICE_TERMINAL_STATES
+
+def retry_on_falsy(result=None, excp=None):
+    """ Retry predicate for polling until the function returns a truthy value
+
+    :param result: result returned by the retried function
+    :type result: object.
+    :param excp: exception raised by the retried function
+    :type excp: exception.
+    :returns: returns True if the call should be retried
+    """
+    return excp is None and not result
+
+class RetryPolicy(object):
+    """ Exponential backoff retry policy with jitter, a deadline, retry-on
+    predicates and cancellation """
+    def __init__(self, initial=1.0, maximum=30.0, multiplier=2.0, jitter=0.1, \
+                 deadline=None, retryon=None, onretry=None, cancelevent=None):
+        """ Constructor
+
+        :param initial: delay in seconds before the first retry
+        :type initial: float.
+        :param maximum: upper bound of a single delay in seconds
+        :type maximum: float.
+        :param multiplier: factor applied to the delay after each attempt
+        :type multiplier: float.
+        :param jitter: fraction of each delay randomized in both directions
+        :type jitter: float.
+        :param deadline: total seconds allowed before giving up, None for no limit
+        :type deadline: float.
+        :param retryon: predicates called with (result, excp) deciding retries
+        :type retryon: list.
+        :param onretry: callback called with (attempt, delay) before each wait
+        :type onretry: function.
+        :param cancelevent: event that cancels any pending or future wait
+        :type cancelevent: threading.Event.
+        """
+        self.initial = initial
+        self.maximum = maximum
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retryon = list(retryon) if retryon else [retry_on_unavailable, \
+                                                      retry_on_connection_error]
+        self.onretry = onretry
+        self.cancelevent = cancelevent if cancelevent else threading.Event()
+        self.attempts = 0
+        self.lastresult = None
+        self.lastexcp = None
+
+    def cancel(self):
+        """ Cancel the policy, interrupting any wait in progress """
+        self.cancelevent.set()
+
+    @property
+    def cancelled(self):
+        """ Return True if the policy has been cancelled """
+        return self.cancelevent.is_set()
+
+    def delays(self):
+        """ Generator of backoff delays, exhausted once the deadline passes """
+        delay = self.initial
+        endtime = time.time() + self.deadline if self.deadline is not None else None
+
+        while True:
+            current = min(delay, self.maximum)
+            if self.jitter:
+                current += current * self.jitter * random.uniform(-1, 1)
+            current = max(current, 0)
+
+            if endtime is not None:
+                remaining = endtime - time.time()
+                if remaining <= 0:
+                    return
+                current = min(current, remaining)
+
+            yield current
+            delay = delay * self.multiplier
+
+    def pause(self, seconds):
+        """ Cancellable sleep
+
+        :param seconds: time to wait in seconds
+        :type seconds: float.
+        """
+        if self.cancelevent.wait(seconds) or self.cancelled:
+            raise RetryCancelledError("Operation cancelled while waiting.")
+
+    def shouldretry(self, result=None, excp=None):
+        """ Check all retry predicates against a result or exception
+
+        :param result: result returned by the retried function
+        :type result: object.
+        :param excp: exception raised by the retried function
+        :type excp: exception.
+        :returns: returns True if any predicate asks for a retry
+        """
+        return any(pred(result=result, excp=excp) for pred in self.retryon)
+
+    def call(self, funct, *args, **kwargs):
+        """ Call a function, retrying with backoff while a predicate matches
+
+        :param funct: function to be called
+        :type funct: function.
+        :returns: returns the first result not matched by a retry predicate
+        """
+        delays = self.delays()
+        self.attempts = 0
+
+        while True:
+            if self.cancelled:
+                raise RetryCancelledError("Operation cancelled.")
+
+            self.attempts += 1
+            self.lastexcp = None
+
+            try:
+                self.lastresult = funct(*args, **kwargs)
+            except RetryCancelledError:
+                raise
+            except Exception as excp:
+                if not self.shouldretry(excp=excp):
+                    raise
+                self.lastexcp = excp
+                LOGGER.info('Attempt %s failed, retrying [%s]', self.attempts, excp)
+            else:
+                if not self.shouldretry(result=self.lastresult):
+                    return self.lastresult
+
+            delay = next(delays, None)
+            if delay is None:
+                raise TimeOutError("Operation did not complete within %s " \
+                                   "seconds." % self.deadline)
+
+            if self.onretry:
+                self.onretry(self.attempts, delay)
+            self.pause(delay)
+
+    def wait_until(self, funct, *args, **kwargs):
+        """ Poll a function until it returns a truthy value. Exceptions matched
+        by the retry predicates are treated as not ready yet.
+
+        :param funct: function to be polled
+        :type funct: function.
+        :returns: returns the first truthy result
+        """
+        retryon = self.retryon
+        self.retryon = [retry_on_falsy] + retryon
+
+        try:
+            return self.call(funct, *args, **kwargs)
+        finally:
+            self.retryon = retryon
+
+def ilo_ready(url, proxy=None):
+    """ Check if iLO answers its service root
+
+    :param url: iLO url, blobstore://. for local mode
+    :type url: str.
+    :param proxy: proxy to use for remote urls
+    :type proxy: str.
+    :returns: returns True if the service root was retrieved
+    """
+    try:
+        redfish.rest.v1.redfish_client(base_url=url, proxy=proxy)
+    except Exception as excp:
+        if retry_on_connection_error(excp=excp) or retry_on_unavailable(excp=excp):
+            return False
+        raise
+
+    return True
+
+def wait_for_ilo_reset(url, proxy=None, policy=None, downtime=45):
+    """ Wait for iLO to go down after a reset request and come back up
+
+    :param url: iLO url, blobstore://. for local mode
+    :type url: str.
+    :param proxy: proxy to use for remote urls
+    :type proxy: str.
+    :param policy: policy used while waiting for iLO to come back
+    :type policy: RetryPolicy.
+    :param downtime: seconds to wait for iLO to stop responding
+    :type downtime: int.
+    """
+    policy = policy if policy else RetryPolicy(initial=5, maximum=20, \
+                                               deadline=600)
+    godown = RetryPolicy(initial=2, maximum=5, multiplier=1.5, deadline=downtime, \
+                                                cancelevent=policy.cancelevent)
+
+    try:
+        godown.wait_until(lambda: not ilo_ready(url, proxy))
+    except TimeOutError:
+        LOGGER.info("iLO at %s never stopped responding after reset.", url)
+
+    policy.wait_until(ilo_ready, url, proxy)
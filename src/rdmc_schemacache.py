@@ -0,0 +1,302 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Shared on disk cache of schemas and registries for RDMC"""
+
+#---------Imports---------
+
+import os
+import re
+import json
+import errno
+import hashlib
+import tempfile
+import threading
+
+import six
+
+import redfish.rest.v1
+
+from rdmc_crawler import normalize
+from rdmc_helper import LOGGER, InvalidFileInputError
+
+#---------End of imports---------
+
+#Kinds of documents, schemas go to iloschemadir and registries to biosschemadir
+SCHEMA = 'schema'
+REGISTRY = 'registry'
+
+#Attribute tables are stored as documents named after their registry and this suffix
+ATTRIBUTES = '.attributes'
+
+def makedirs(path):
+    """ Create a directory and its parents if they are missing
+
+    :param path: directory to create
+    :type path: str.
+    """
+    try:
+        os.makedirs(path)
+    except OSError as excp:
+        if excp.errno != errno.EEXIST:
+            raise
+
+def atomicwrite(filename, data):
+    """ Write a file through a temporary file so readers never see it half written
+
+    :param filename: file to write
+    :type filename: str.
+    :param data: file content
+    :type data: bytes.
+    """
+    handle, tmpname = tempfile.mkstemp(dir=os.path.dirname(filename), prefix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as outfile:
+            outfile.write(data)
+        try:
+            os.rename(tmpname, filename)
+        except OSError:
+            #Windows does not replace existing files on rename
+            os.remove(filename)
+            os.rename(tmpname, filename)
+    except Exception:
+        if os.path.exists(tmpname):
+            os.remove(tmpname)
+        raise
+
+class SchemaCache(object):
+    """Content addressed store of schema and registry documents
+
+    Documents are stored once under objects/ by the SHA-256 of their content
+    and found through refs/ files named after the schema or registry
+    identifier, which carries its version, and language. Identical servers
+    share every entry whatever host they were downloaded from, and several
+    sessions can fill the same directory at once. Documents missing from
+    the directory are looked up in its schema packs, skipping the packs that
+    can not be read.
+    """
+    def __init__(self, directory, packs=None):
+        self.directory = directory
+        self.packs = list(packs or [])
+
+    @staticmethod
+    def refname(identifier, language):
+        """ File name of a reference
+
+        :param identifier: schema or registry identifier with its version
+        :type identifier: str.
+        :param language: document language
+        :type language: str.
+        :returns: returns the file name
+        """
+        name = '%s.%s' % (identifier.lstrip('#'), language or 'en')
+        return re.sub(r'[^\w.-]', '_', name)
+
+    def _refpath(self, identifier, language):
+        return os.path.join(self.directory, 'refs', self.refname(identifier, language))
+
+    def _objectpath(self, digest):
+        return os.path.join(self.directory, 'objects', digest)
+
+    def get(self, identifier, language='en'):
+        """ Cached document of a schema or registry
+
+        :param identifier: schema or registry identifier with its version
+        :type identifier: str.
+        :param language: document language
+        :type language: str.
+        :returns: returns the document text or None
+        """
+        try:
+            with open(self._refpath(identifier, language), 'rb') as reffile:
+                digest = reffile.read().decode('ascii').strip()
+            with open(self._objectpath(digest), 'rb') as objfile:
+                data = objfile.read()
+            if hashlib.sha256(data).hexdigest() == digest:
+                return data.decode('utf-8')
+            LOGGER.debug('Ignoring corrupt cached document for %s', identifier)
+        except (IOError, OSError, UnicodeError):
+            pass
+
+        return self.searchpacks(lambda pack: pack.get(identifier, language))
+
+    def searchpacks(self, lookup):
+        """ First result of a lookup in the schema packs, a pack that can not be
+        read is reported once and skipped
+
+        :param lookup: function called with a pack, returning None when the
+                       pack does not hold the document
+        :type lookup: function.
+        :returns: returns the first result or None
+        """
+        for pack in self.packs:
+            if pack.unreadable:
+                continue
+            try:
+                result = lookup(pack)
+            except InvalidFileInputError as excp:
+                LOGGER.warning('Skipping schema pack: %s', excp)
+                pack.unreadable = True
+                continue
+            if result is not None:
+                return result
+        return None
+
+    def put(self, identifier, language, content):
+        """ Store the document of a schema or registry
+
+        :param identifier: schema or registry identifier with its version
+        :type identifier: str.
+        :param language: document language
+        :type language: str.
+        :param content: document text
+        :type content: str.
+        :returns: returns the content digest
+        """
+        data = content.encode('utf-8') if isinstance(content, six.text_type) else content
+        digest = hashlib.sha256(data).hexdigest()
+        try:
+            makedirs(os.path.join(self.directory, 'objects'))
+            makedirs(os.path.join(self.directory, 'refs'))
+            if not os.path.isfile(self._objectpath(digest)):
+                atomicwrite(self._objectpath(digest), data)
+            atomicwrite(self._refpath(identifier, language), digest.encode('ascii'))
+        except (IOError, OSError) as excp:
+            LOGGER.debug('Unable to cache the document of %s: %s', identifier, excp)
+        return digest
+
+    def attributes(self, registry):
+        """ Attribute table of an attribute registry, stored or from a schema pack
+
+        :param registry: attribute registry identifier with its version
+        :type registry: str.
+        :returns: returns a dictionary of attribute entries by name or None
+        """
+        content = self.get(registry + ATTRIBUTES)
+        if content is not None:
+            try:
+                return json.loads(content)
+            except ValueError:
+                LOGGER.debug('Ignoring corrupt attribute table of %s', registry)
+
+        return self.searchpacks(lambda pack: pack.attributes(registry))
+
+    def putattributes(self, registry, table):
+        """ Store the attribute table of an attribute registry
+
+        :param registry: attribute registry identifier with its version
+        :type registry: str.
+        :param table: attribute entries by name
+        :type table: dict.
+        """
+        self.put(registry + ATTRIBUTES, 'en', json.dumps(table, sort_keys=True))
+
+def documentlocations(bodies, collectionstring):
+    """ Document locations listed by schema and registry file resources
+
+    :param bodies: schema and registry file and file collection bodies
+    :type bodies: list.
+    :param collectionstring: key holding collection members, Members or Items
+    :type collectionstring: str.
+    :returns: returns a dictionary of (kind, identifier, language, path) by
+              normalized document path
+    """
+    locations = {}
+    for body in bodies:
+        members = body.get(collectionstring) if isinstance(body, dict) else None
+        for entry in (members if isinstance(members, list) else []) + [body]:
+            if not isinstance(entry, dict) or not isinstance(entry.get('Location'), list):
+                continue
+            kind = REGISTRY if entry.get('Registry') else SCHEMA
+            identifier = entry.get('Registry') or entry.get('Schema')
+            if not identifier:
+                continue
+            for location in entry['Location']:
+                uri = location.get('Uri') if isinstance(location, dict) else None
+                #Gen9 nests the path in an extref
+                uri = uri.get('extref') if isinstance(uri, dict) else uri
+                if isinstance(uri, six.string_types):
+                    locations[normalize(uri)] = (kind, identifier, \
+                                                 location.get('Language', 'en'), uri)
+    return locations
+
+def documentresponses(app):
+    """ Responses of the schema and registry files and file collections in the monolith
+
+    :param app: RMC application
+    :type app: RdmcApp.
+    :returns: returns a list of responses
+    """
+    defs = app.typepath.defs
+    index = app.typeindex
+    types = set()
+    for coll in (defs.schemafilecollectiontype, defs.regfilecollectiontype):
+        types.update(index.search(coll))
+        types.update(index.search(coll.replace('Collection', '')))
+
+    monolith = app.monolith
+    insts = [monolith.paths[path] for name in sorted(types) for path in \
+                                monolith.typesadded[name] if path in monolith.paths]
+    return [inst.resp for inst in insts if inst]
+
+class SchemaCacheGet(object):
+    """Client get serving schema and registry documents from SchemaCache
+
+    Replaces RmcClient.get. Paths listed as a document location by the
+    schema and registry collections of the monolith are served from the
+    cache of their kind, downloaded and stored on a miss, every other path
+    goes to the server as before.
+    """
+    def __init__(self, app, get):
+        self._app = app
+        self._get = get
+        self._lock = threading.Lock()
+        self._sources = None
+        self._locations = {}
+
+    def locations(self):
+        """ Document locations of the monolith, rebuilt when its collections change
+
+        :returns: returns a dictionary of (kind, identifier, language, path) by
+                  normalized path
+        """
+        with self._lock:
+            resps = documentresponses(self._app)
+            if self._sources is None or len(self._sources) != len(resps) or \
+                    any(old is not new for old, new in zip(self._sources, resps)):
+                self._locations = documentlocations([resp.dict for resp in resps], \
+                                            self._app.typepath.defs.collectionstring)
+                self._sources = resps
+            return self._locations
+
+    def __call__(self, path, args=None, headers=None):
+        caches = self._app.schemacaches
+        entry = self.locations().get(normalize(path)) if caches and not args else None
+        if not entry or not caches.get(entry[0]):
+            return self._get(path, args=args, headers=headers)
+
+        kind, identifier, language, _ = entry
+        content = caches[kind].get(identifier, language)
+        if content is not None:
+            LOGGER.debug('Using cached %s %s for %s', kind, identifier, path)
+            return redfish.rest.v1.StaticRestResponse(Status=200, Headers={}, \
+                Content=content, restreq=redfish.rest.v1.RestRequest(method='GET', path=path))
+
+        resp = self._get(path, args=args, headers=headers)
+        if resp.status == 200 and resp.read:
+            caches[kind].put(identifier, language, resp.read)
+        return resp
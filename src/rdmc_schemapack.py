@@ -0,0 +1,296 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Offline schema packs for RDMC
+
+A schema pack is a single zip archive of schema and registry documents
+with a prebuilt index.json mapping schema and registry identifiers,
+@odata.type names and attribute registries to their archive members, so a
+lookup reads the index and a single member.
+"""
+
+#---------Imports---------
+
+import os
+import json
+import mmap
+import hashlib
+import zipfile
+import threading
+
+from collections import OrderedDict
+
+import six
+
+from rdmc_helper import LOGGER, InvalidFileInputError
+from rdmc_schemacache import SchemaCache, SCHEMA, REGISTRY, atomicwrite
+
+#---------End of imports---------
+
+PACK_EXTENSION = '.schemapack'
+PACK_VERSION = 1
+INDEX = 'index.json'
+
+def typekeys(odatatype):
+    """ Index keys of an @odata.type or schema title, full and without the class
+
+    :param odatatype: type name such as #ComputerSystem.v1_4_0.ComputerSystem
+    :type odatatype: str.
+    :returns: returns a list of keys
+    """
+    name = odatatype.lstrip('#').lower()
+    short = '.'.join(name.split('.')[:2])
+    return [name] if short == name else [name, short]
+
+class MappedFile(object):
+    """File interface of a memory map, zipfile reads to the end without a size"""
+    def __init__(self, mapped):
+        self._map = mapped
+
+    def read(self, size=-1):
+        """ Read size bytes or up to the end of the map """
+        if size is None or size < 0:
+            size = len(self._map) - self._map.tell()
+        return self._map.read(size)
+
+    def __getattr__(self, name):
+        return getattr(self._map, name)
+
+class SchemaPack(object):
+    """Read only schema pack, opened and memory mapped on first lookup"""
+    def __init__(self, filename):
+        self.filename = filename
+        #Set by the schema caches when the pack can not be read
+        self.unreadable = False
+        self._lock = threading.Lock()
+        self._file = self._map = self._zip = None
+        self._index = None
+
+    @property
+    def index(self):
+        """ Prebuilt index of the pack """
+        with self._lock:
+            if self._index is None:
+                self._open()
+            return self._index
+
+    def _open(self):
+        """ Map the archive and read its index """
+        try:
+            self._file = open(self.filename, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._zip = zipfile.ZipFile(MappedFile(self._map))
+            index = json.loads(self._zip.read(INDEX).decode('utf-8'))
+        except (IOError, OSError, ValueError, KeyError, zipfile.BadZipfile):
+            self.close()
+            raise InvalidFileInputError("'%s' is not a valid schema pack." % self.filename)
+
+        if index.get('version') != PACK_VERSION:
+            self.close()
+            raise InvalidFileInputError("Schema pack '%s' has unsupported version %s." % \
+                                        (self.filename, index.get('version')))
+        self._index = index
+
+    def close(self):
+        """ Release the archive """
+        for handle in (self._zip, self._map, self._file):
+            if handle is not None:
+                handle.close()
+        self._file = self._map = self._zip = None
+
+    def read(self, member):
+        """ Read an archive member
+
+        :param member: member name
+        :type member: str.
+        :returns: returns the member text
+        """
+        _ = self.index
+        with self._lock:
+            return self._zip.read(member).decode('utf-8')
+
+    def get(self, identifier, language='en'):
+        """ Document of a schema or registry
+
+        :param identifier: schema or registry identifier with its version
+        :type identifier: str.
+        :param language: document language
+        :type language: str.
+        :returns: returns the document text or None
+        """
+        entry = self.index['documents'].get(SchemaCache.refname(identifier, language))
+        return self.read(entry['member']) if entry else None
+
+    def schema(self, odatatype, language='en'):
+        """ Schema of an @odata.type
+
+        :param odatatype: type name such as #ComputerSystem.v1_4_0.ComputerSystem
+        :type odatatype: str.
+        :param language: document language
+        :type language: str.
+        :returns: returns the schema text or None
+        """
+        for key in typekeys(odatatype):
+            identifier = self.index['types'].get(key)
+            if identifier:
+                return self.get(identifier, language)
+        return None
+
+    def attributes(self, registry):
+        """ Attribute table of an attribute registry
+
+        :param registry: attribute registry identifier
+        :type registry: str.
+        :returns: returns a dictionary of attributes by name or None
+        """
+        member = self.index['attributes'].get(registry)
+        return json.loads(self.read(member)) if member else None
+
+def findpacks(directory):
+    """ Schema packs found in a directory
+
+    :param directory: directory holding packs
+    :type directory: str.
+    :returns: returns a list of SchemaPack
+    """
+    try:
+        names = sorted(os.listdir(directory)) if directory else []
+    except OSError:
+        return []
+    return [SchemaPack(os.path.join(directory, name)) for name in names \
+                                                    if name.endswith(PACK_EXTENSION)]
+
+class SchemaPackWriter(object):
+    """Collects documents and writes them as a schema pack"""
+    def __init__(self):
+        self.documents = OrderedDict()
+
+    def add(self, kind, identifier, language, content):
+        """ Add a schema or registry document
+
+        :param kind: SCHEMA or REGISTRY
+        :type kind: str.
+        :param identifier: schema or registry identifier with its version
+        :type identifier: str.
+        :param language: document language
+        :type language: str.
+        :param content: document text
+        :type content: str.
+        """
+        self.documents[SchemaCache.refname(identifier, language)] = (kind, identifier, \
+                                                            language or 'en', content)
+
+    def write(self, filename):
+        """ Write the pack, documents are stored once by content
+
+        :param filename: pack file name
+        :type filename: str.
+        :returns: returns the number of documents written
+        """
+        index = {'version': PACK_VERSION, 'documents': {}, 'types': {}, 'attributes': {}}
+        members = OrderedDict()
+
+        for refname, (kind, identifier, language, content) in self.documents.items():
+            data = content.encode('utf-8') if isinstance(content, six.text_type) else content
+            member = 'documents/%s.json' % hashlib.sha256(data).hexdigest()
+            members[member] = data
+            index['documents'][refname] = {'kind': kind, 'identifier': identifier, \
+                                           'language': language, 'member': member}
+            try:
+                body = json.loads(data.decode('utf-8'))
+            except ValueError:
+                LOGGER.warning("Document of '%s' is not valid JSON.", identifier)
+                continue
+
+            if kind == SCHEMA:
+                for key in typekeys(body.get('title') or identifier):
+                    index['types'].setdefault(key, identifier)
+                continue
+
+            attributes = body.get('RegistryEntries', {}).get('Attributes')
+            if isinstance(attributes, list):
+                table = json.dumps(dict((attr.get('AttributeName'), attr) for attr in \
+                                    attributes if isinstance(attr, dict)), sort_keys=True)
+                member = 'attributes/%s.json' % hashlib.sha256(table.encode('utf-8')).hexdigest()
+                members[member] = table.encode('utf-8')
+                index['attributes'][identifier] = member
+
+        archive = six.BytesIO()
+        with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as pack:
+            pack.writestr(INDEX, json.dumps(index, indent=1, sort_keys=True))
+            for member, data in members.items():
+                pack.writestr(member, data)
+        atomicwrite(os.path.abspath(filename), archive.getvalue())
+        return len(self.documents)
+
+def iterbundle(path):
+    """ Yield the name and text of the JSON files of a schema bundle
+
+    :param path: bundle directory or zip archive
+    :type path: str.
+    """
+    if os.path.isdir(path):
+        for root, _, names in os.walk(path):
+            for name in sorted(names):
+                if name.lower().endswith('.json'):
+                    with open(os.path.join(root, name), 'rb') as infile:
+                        yield name, infile.read().decode('utf-8', 'ignore')
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as bundle:
+            for name in bundle.namelist():
+                if name.lower().endswith('.json'):
+                    yield name, bundle.read(name).decode('utf-8', 'ignore')
+    else:
+        raise InvalidFileInputError("Schema bundle '%s' is not a directory or a zip "\
+                                    "archive." % path)
+
+def bundledocuments(path):
+    """ Schemas and registries of a downloaded schema bundle
+
+    Schemas are identified by their title and registries by their Id, also
+    listed under PREFIX.MAJOR.MINOR the way registry collections name them.
+
+    :param path: bundle directory or zip archive
+    :type path: str.
+    :returns: returns a list of (kind, identifier, language, text)
+    """
+    documents = []
+    for name, text in iterbundle(path):
+        try:
+            body = json.loads(text)
+        except ValueError:
+            LOGGER.info("Skipping '%s', it is not valid JSON.", name)
+            continue
+        if not isinstance(body, dict):
+            continue
+
+        if 'Registry' in body.get('@odata.type', '') or 'RegistryEntries' in body or \
+                                                                    'Messages' in body:
+            identifier = body.get('Id') or body.get('RegistryPrefix')
+            if not identifier:
+                continue
+            language = body.get('Language', 'en')
+            documents.append((REGISTRY, identifier, language, text))
+            if body.get('RegistryPrefix') and body.get('RegistryVersion'):
+                alias = '%s.%s' % (body['RegistryPrefix'], '.'.join(body[\
+                                                'RegistryVersion'].split('.')[:2]))
+                if alias != identifier:
+                    documents.append((REGISTRY, alias, language, text))
+        elif isinstance(body.get('title'), six.string_types) and \
+                                                        body['title'].startswith('#'):
+            documents.append((SCHEMA, body['title'], 'en', text))
+    return documents
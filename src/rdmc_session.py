@@ -0,0 +1,299 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Session keep-alive and re-authentication for RDMC
+
+iLO closes a session left idle for the session timeout of its session
+service. A cached session idle for that long is checked before the next
+command runs, and interactive mode touches the session while the prompt
+waits so it does not time out at all. An expired session is replaced by
+a new login with the credentials of the login command of this process,
+the configuration file or the keyring. The monolith is kept, the cache
+policy revalidates its members with their ETags instead of crawling the
+server again. When a session expires while a command runs, only the
+request the server rejected is sent again, the command is never run twice.
+"""
+
+#---------Imports---------
+
+import time
+import threading
+
+from contextlib import contextmanager
+
+import redfish.rest.v1
+
+from rdmc_helper import LOGGER
+from rdmc_hostcache import normalizeurl
+
+try:
+    import keyring
+except ImportError:
+    keyring = None
+
+#---------End of imports---------
+
+#Session timeout of iLO when the session service does not list one, in seconds
+DEFAULT_SESSION_TIMEOUT = 30 * 60
+
+#Sessions idle for less than their timeout minus this margin are not checked
+TIMEOUT_MARGIN = 60
+
+#Shortest time between two keep-alive requests, in seconds
+MIN_KEEPALIVE = 30
+
+def sessiontimeout(monolith):
+    """ Idle time after which the server closes sessions
+
+    :param monolith: monolith of the server
+    :type monolith: RisMonolith.
+    :returns: returns the number of seconds
+    """
+    for typename, paths in list(monolith.typesadded.items()):
+        if not typename.lower().lstrip('#').startswith('sessionservice.'):
+            continue
+        for path in paths:
+            member = monolith.paths.get(path)
+            if member is None:
+                continue
+            try:
+                minutes = member.dict.get('SessionTimeout')
+            except (ValueError, AttributeError):
+                continue
+            if isinstance(minutes, int) and minutes > 0:
+                return minutes * 60
+    return DEFAULT_SESSION_TIMEOUT
+
+class SessionKeeper(object):
+    """Lifetime of the session of the current server
+
+    Passwords given to the login command are remembered by server and user
+    for the life of the process only, they are never written to the cache.
+    """
+    def __init__(self, app):
+        self._app = app
+        self._passwords = {}
+        self._lock = threading.Lock()
+        self._timer = None
+        self._renewing = False
+        self.used = None
+
+    @property
+    def client(self):
+        """ Current client, if it has a session that may expire """
+        client = self._app._rmc_clients
+        if not client or client.get_base_url().startswith('blobstore'):
+            return None
+        return client
+
+    def touch(self, when=None):
+        """ Record that the session was used
+
+        :param when: time of use, now by default
+        :type when: float.
+        """
+        self.used = time.time() if when is None else when
+
+    def remember(self, url, username, password):
+        """ Remember the password of a login for the rest of the process
+
+        :param url: base url of the server
+        :type url: str.
+        :param username: user name of the login
+        :type username: str.
+        :param password: password of the login
+        :type password: str.
+        """
+        if url and username and password:
+            self._passwords[(normalizeurl(url), username)] = password
+
+    def credentials(self, url, username):
+        """ Password to log in again as a user, from this process, the
+        configuration file or the keyring
+
+        :param url: base url of the server
+        :type url: str.
+        :param username: user name of the session
+        :type username: str.
+        :returns: returns the password or None
+        """
+        if not username:
+            return None
+        password = self._passwords.get((normalizeurl(url), username))
+        if not password and username == self._app.config.get_username():
+            password = self._app.config.get_password()
+        if not password and keyring is not None:
+            try:
+                password = keyring.get_password(normalizeurl(url), username)
+            except Exception as excp:
+                LOGGER.info('Unable to read the keyring: %s', excp)
+        return password or None
+
+    def install(self, client):
+        """ Make the rest client of a client log in again and send a request
+        once more when the server rejects it because the session expired. The
+        server did not carry out the rejected request, so it is sent again
+        whatever its method.
+
+        :param client: client to install into
+        :type client: RmcClient.
+        """
+        rest = client._rest_client
+        if client.get_base_url().startswith('blobstore') or '_rest_request' in vars(rest):
+            return
+        request = rest._rest_request
+
+        def renewing(path, *args, **kwargs):
+            """ Rest request sent again once with a new session """
+            resp = request(path, *args, **kwargs)
+            if getattr(resp, 'status', None) != 401 or self._renewing or \
+                                    not client.get_session_key() or path in \
+                                    (rest.login_url, client.get_session_location()):
+                return resp
+            try:
+                if 'insufficientprivilege' in (resp.read or '').lower():
+                    return resp
+            except Exception:
+                pass
+            self._renewing = True
+            try:
+                renewed = self.reauthenticate()
+            finally:
+                self._renewing = False
+            return request(path, *args, **kwargs) if renewed else resp
+
+        rest._rest_request = renewing
+
+    def alive(self, client):
+        """ Check if the session of a client is still open with a GET of the
+        session itself
+
+        :param client: client of the session
+        :type client: RmcClient.
+        :returns: returns False if the server rejects the session
+        """
+        location = client.get_session_location()
+        if not location or not client.get_session_key():
+            return True
+        path = location.replace(client.get_base_url(), '')
+        resp = client._rest_client.get(path)
+        return resp is None or resp.status != 401
+
+    def check(self):
+        """ Before a command, log in again if the session was idle past its
+        timeout and the server closed it
+
+        :returns: returns True if a new session was opened
+        """
+        client = self.client
+        if client is None or self.used is None:
+            return False
+        idle = time.time() - self.used
+        if idle < sessiontimeout(client.monolith) - TIMEOUT_MARGIN:
+            return False
+        with self._lock:
+            try:
+                if self.alive(client):
+                    self.touch()
+                    return False
+            except Exception as excp:
+                LOGGER.info('Unable to check the session: %s', excp)
+                return False
+            return self.reauthenticate()
+
+    def reauthenticate(self):
+        """ Replace the session of the current server by a new login, keeping
+        its monolith
+
+        :returns: returns True if a new session was opened
+        """
+        client = self.client
+        if client is None:
+            return False
+        url = client.get_base_url()
+        username = self._app._cm.user or client.get_username()
+        password = self.credentials(url, username)
+        if not password:
+            LOGGER.info('No stored credentials to log into %s again.', url)
+            return False
+
+        rest = client._rest_client
+        expired = (client.get_session_key(), client.get_session_location(), \
+                                                    client.get_authorization_key())
+        rest.set_session_key(None)
+        rest.set_session_location(None)
+        rest.set_authorization_key(None)
+        try:
+            client.login(username, password)
+        except Exception as excp:
+            rest.set_session_key(expired[0])
+            rest.set_session_location(expired[1])
+            rest.set_authorization_key(expired[2])
+            if not isinstance(excp, redfish.rest.v1.InvalidCredentialsError):
+                raise
+            LOGGER.info('The stored credentials of %s were rejected.', username)
+            return False
+
+        LOGGER.info('Session of %s expired, logged in again as %s.', url, username)
+        self.touch()
+        self._app.save()
+        return True
+
+    def keepalive(self, interval):
+        """ Touch the session every interval seconds until stopped
+
+        :param interval: seconds between two requests
+        :type interval: float.
+        """
+        def worker():
+            """ Touch the session, unless a command is using the client """
+            if not self._lock.acquire(False):
+                return
+            try:
+                client = self.client
+                if client is not None:
+                    if self.alive(client):
+                        self.touch()
+                    else:
+                        self.reauthenticate()
+            except Exception as excp:
+                LOGGER.info('Unable to keep the session alive: %s', excp)
+            try:
+                if self._timer is not None:
+                    self.keepalive(interval)
+            finally:
+                self._lock.release()
+
+        self._timer = threading.Timer(interval, worker)
+        self._timer.daemon = True
+        self._timer.start()
+
+    @contextmanager
+    def idle(self):
+        """ Keep the session alive while the process waits for input """
+        client = self.client
+        if client is not None:
+            timeout = sessiontimeout(client.monolith)
+            self.keepalive(max(MIN_KEEPALIVE, timeout / 2))
+        try:
+            yield
+        finally:
+            #Waits for a keep-alive request under way
+            with self._lock:
+                timer, self._timer = self._timer, None
+            if timer is not None:
+                timer.cancel()
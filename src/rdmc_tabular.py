@@ -0,0 +1,205 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Tabular output formats for RDMC
+
+With the --format option a command writes one row per instance, log entry
+or item as soon as it has it, in CSV, TSV or newline delimited JSON,
+instead of building its whole output first. Nested properties become
+columns named by their path, keys separated by / and list items by their
+index. The columns are the ones given with --columns, or else the ones of
+the first row. Properties of objects that keep no order of their own are
+sorted, so the columns come in the same order on every run.
+"""
+
+#---------Imports---------
+
+import sys
+import csv
+import json
+
+from collections import OrderedDict
+
+import six
+
+from rdmc_helper import InvalidCommandLineError
+
+#---------End of imports---------
+
+#Values of the --format option
+FORMATS = ('csv', 'tsv', 'ndjson')
+
+def flatten(value, prefix=None, result=None):
+    """ Values of a nested value by path, empty objects and lists are kept
+    as values
+
+    :param value: value to flatten
+    :type value: dict or list.
+    :param prefix: path of the value
+    :type prefix: str.
+    :param result: values to add to
+    :type result: OrderedDict.
+    :returns: returns an OrderedDict of values by path
+    """
+    result = OrderedDict() if result is None else result
+    if isinstance(value, dict) and value:
+        keys = list(value.keys()) if isinstance(value, OrderedDict) else sorted(value.keys())
+        items = [(key, value[key]) for key in keys]
+    elif isinstance(value, (list, tuple)) and value:
+        items = [(str(index), item) for index, item in enumerate(value)]
+    else:
+        if prefix is not None:
+            result[prefix] = value
+        return result
+
+    for key, item in items:
+        flatten(item, key if prefix is None else '%s/%s' % (prefix, key), result)
+    return result
+
+def lookup(value, column):
+    """ Value of a column in a record, keys are matched case insensitively
+
+    :param value: record to search
+    :type value: dict.
+    :param column: path of the column, keys separated by /
+    :type column: str.
+    :returns: returns the value, None if the path is not in the record
+    """
+    for key in column.split('/'):
+        if isinstance(value, dict):
+            if key not in value:
+                key = next((name for name in value if name.lower() == key.lower()), None)
+                if key is None:
+                    return None
+            value = value[key]
+        elif isinstance(value, (list, tuple)) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        else:
+            return None
+    return value
+
+def cell(value):
+    """ Text of a value in a CSV or TSV row
+
+    :param value: value to convert
+    :type value: str, bool, int, dict or list.
+    :returns: returns the text of the cell
+    """
+    if value is None:
+        return ''
+    elif isinstance(value, bool):
+        text = 'true' if value else 'false'
+    elif isinstance(value, (dict, list, tuple)):
+        text = json.dumps(value, separators=(',', ':'))
+    elif isinstance(value, six.string_types):
+        text = value
+    else:
+        text = str(value)
+
+    if six.PY2 and isinstance(text, six.text_type):
+        text = text.encode('utf-8')
+    return text
+
+class TabularWriter(object):
+    """Rows of records written to a stream one at a time
+
+    :param fmt: output format, one of FORMATS
+    :type fmt: str.
+    :param columns: column paths, the columns of the first row when empty
+    :type columns: list.
+    :param stream: stream to write to, standard output by default
+    :type stream: file.
+    """
+    def __init__(self, fmt, columns=None, stream=None):
+        self.fmt = fmt
+        self.selected = list(columns or [])
+        self.columns = list(self.selected) or None
+        self.stream = stream if stream is not None else sys.stdout
+        self.rows = 0
+        self._known = set(self.selected)
+        self._warned = False
+        self._csv = None
+        if fmt != 'ndjson':
+            self._csv = csv.writer(self.stream, dialect='excel-tab' if fmt == 'tsv' \
+                                                        else 'excel', lineterminator='\n')
+
+    def writerow(self, record):
+        """ Write the row of a record, the header first on the first row, records
+        without any value are skipped unless columns were given
+
+        :param record: record to write
+        :type record: dict.
+        """
+        if self.selected:
+            values = OrderedDict((column, lookup(record, column)) for column in \
+                                                                        self.selected)
+        else:
+            values = flatten(record)
+            if not values:
+                return
+            if self.columns is None:
+                self.columns = list(values)
+                self._known = set(self.columns)
+
+        extra = [column for column in values if column not in self._known]
+        if self._csv is not None:
+            if not self.rows:
+                self._csv.writerow([cell(column) for column in self.columns])
+            if extra and not self._warned:
+                self._warned = True
+                sys.stderr.write("Warning: Columns missing from the first row such as '%s' "\
+                            "are left out, list them with --columns.\n" % extra[0])
+            self._csv.writerow([cell(values.get(column)) for column in self.columns])
+        else:
+            row = OrderedDict((column, values[column]) for column in self.columns if \
+                                                                    column in values)
+            row.update((column, values[column]) for column in extra)
+            self.stream.write(json.dumps(row) + '\n')
+        self.rows += 1
+
+    def writerows(self, records):
+        """ Write the rows of records as they are produced
+
+        :param records: records to write
+        :type records: iterable.
+        :returns: returns the number of rows written
+        """
+        rows = self.rows
+        for record in records:
+            self.writerow(record)
+        return self.rows - rows
+
+def tabularwriter(options, stream=None):
+    """ Writer of the format and columns options of a command
+
+    :param options: command line options
+    :type options: list.
+    :param stream: stream to write to, standard output by default
+    :type stream: file.
+    :returns: returns a TabularWriter, None for the usual output of the command
+    """
+    fmt = getattr(options, 'format', None)
+    columns = getattr(options, 'columns', None)
+    if not fmt:
+        if columns:
+            raise InvalidCommandLineError("The columns flag can only be used with "\
+                                                                    "the format flag.")
+        return None
+
+    columns = [column.strip() for column in columns.split(',') if column.strip()] \
+                                                                    if columns else []
+    return TabularWriter(fmt, columns=columns, stream=stream)
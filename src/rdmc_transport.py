@@ -0,0 +1,366 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Record and replay transport for RDMC HTTP traffic"""
+
+#---------Imports---------
+
+import io
+import json
+import time
+import base64
+import threading
+
+from collections import defaultdict
+
+import urllib3
+
+from six.moves.urllib.parse import urlparse
+
+from rdmc_helper import LOGGER, InvalidFileInputError, InvalidCommandLineError
+
+#---------End of imports---------
+
+CASSETTE_VERSION = 1
+SCRUBBED = '********'
+
+#Request/response headers and JSON keys that never reach a cassette
+SCRUBBED_KEYS = set(['password', 'oldpassword', 'newpassword', 'sessionkey', \
+                     'x-auth-token', 'authorization', 'cookie', 'set-cookie'])
+
+#Headers describing the wire encoding of the recorded body, not its content
+DROPPED_HEADERS = set(['content-encoding', 'transfer-encoding', 'content-length', \
+                       'connection', 'keep-alive', 'date'])
+
+_ORIGINAL_URLOPEN = urllib3.PoolManager.__dict__['urlopen']
+
+def scrub(data):
+    """ Replace credentials and session keys in a JSON structure
+
+    :param data: JSON structure to scrub
+    :type data: dict or list.
+    :returns: returns a scrubbed copy of data
+    """
+    if isinstance(data, dict):
+        return dict((key, SCRUBBED if key.lower() in SCRUBBED_KEYS else scrub(val)) \
+                                                        for key, val in data.items())
+    elif isinstance(data, list):
+        return [scrub(val) for val in data]
+    return data
+
+def scrub_headers(headers):
+    """ Scrub authentication headers and strip hosts from location headers
+
+    :param headers: HTTP headers
+    :type headers: dict.
+    :returns: returns scrubbed headers
+    """
+    result = dict()
+    for key, val in (headers or {}).items():
+        if key.lower() in SCRUBBED_KEYS:
+            val = SCRUBBED
+        elif key.lower() == 'location':
+            val = relative_url(val)
+        result[key] = val
+    return result
+
+def relative_url(url):
+    """ Path and query of a url, dropping scheme, credentials and host
+
+    :param url: absolute or relative url
+    :type url: str.
+    """
+    parsed = urlparse(url)
+    return parsed.path + ('?' + parsed.query if parsed.query else '')
+
+class Cassette(object):
+    """ JSON lines file of recorded HTTP interactions. Every recording run
+    starts a new segment tagged with the command it ran, so one cassette can
+    hold a whole multi command session. """
+    def __init__(self, filename):
+        """ Constructor
+
+        :param filename: cassette file
+        :type filename: str.
+        """
+        self.filename = filename
+        self.segments = []
+        self._handle = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """ Read every segment of the cassette """
+        self.segments = []
+        try:
+            with open(self.filename, 'r') as cassette:
+                for line in cassette:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    if 'cassette' in entry:
+                        self.segments.append({'command': entry.get('command'), \
+                                              'interactions': []})
+                    elif self.segments:
+                        self.segments[-1]['interactions'].append(entry)
+        except (IOError, OSError) as excp:
+            raise InvalidFileInputError("Unable to open cassette %s: %s" % \
+                                        (self.filename, excp))
+        except ValueError:
+            raise InvalidFileInputError("Cassette %s is not a valid recording." % \
+                                        self.filename)
+
+        if not self.segments:
+            raise InvalidFileInputError("Cassette %s contains no recordings." % \
+                                        self.filename)
+        return self
+
+    def start_segment(self, command=None):
+        """ Open the cassette for appending and start a new segment
+
+        :param command: command being recorded
+        :type command: str.
+        """
+        try:
+            self._handle = open(self.filename, 'a')
+        except (IOError, OSError) as excp:
+            raise InvalidFileInputError("Unable to open cassette %s: %s" % \
+                                        (self.filename, excp))
+        self._write({'cassette': CASSETTE_VERSION, 'command': command, \
+                     'recorded': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())})
+
+    def append(self, interaction):
+        """ Write one interaction, flushed immediately so an interrupted run
+        still leaves a usable cassette
+
+        :param interaction: recorded interaction
+        :type interaction: dict.
+        """
+        self._write(interaction)
+
+    def _write(self, entry):
+        """ Write a JSON line to the cassette """
+        with self._lock:
+            self._handle.write(json.dumps(entry, sort_keys=True) + '\n')
+            self._handle.flush()
+
+    def close(self):
+        """ Close the cassette """
+        if self._handle:
+            self._handle.close()
+            self._handle = None
+
+class RecordingTransport(object):
+    """ Passes requests through to the network and records the exchanges """
+    def __init__(self, cassette, command=None):
+        """ Constructor
+
+        :param cassette: cassette to record to
+        :type cassette: Cassette.
+        :param command: command being recorded
+        :type command: str.
+        """
+        self.cassette = cassette
+        self.cassette.start_segment(command)
+
+    def urlopen(self, manager, method, url, **kwargs):
+        """ Perform and record a request
+
+        :param manager: urllib3 pool manager issuing the request
+        :type manager: urllib3.PoolManager.
+        :param method: HTTP method
+        :type method: str.
+        :param url: request url
+        :type url: str.
+        :returns: returns the urllib3 response
+        """
+        interaction = {'method': method.upper(), 'path': relative_url(url), \
+                       'request': self._request(kwargs)}
+        inittime = time.time()
+
+        try:
+            resp = _ORIGINAL_URLOPEN(manager, method, url, **kwargs)
+        except Exception as excp:
+            interaction['elapsed'] = time.time() - inittime
+            interaction['error'] = str(excp)
+            self.cassette.append(interaction)
+            raise
+
+        interaction['elapsed'] = time.time() - inittime
+        interaction['status'] = resp.status
+        interaction['reason'] = resp.reason
+        interaction['headers'] = scrub_headers(dict((key, val) for key, val in \
+                    resp.headers.items() if key.lower() not in DROPPED_HEADERS))
+        interaction.update(self._body(resp.data))
+        self.cassette.append(interaction)
+
+        return resp
+
+    @staticmethod
+    def _request(kwargs):
+        """ Scrubbed summary of the request headers and body """
+        body = kwargs.get('body')
+        if isinstance(body, bytes):
+            try:
+                body = body.decode('utf-8')
+            except UnicodeDecodeError:
+                pass
+
+        if body is not None:
+            try:
+                body = scrub(json.loads(body))
+            except (TypeError, ValueError):
+                #Uploads and form data may carry keys and binaries, keep the size only
+                body = {'omitted': len(body)}
+
+        return {'headers': scrub_headers(kwargs.get('headers')), 'body': body}
+
+    @staticmethod
+    def _body(data):
+        """ Store a response body as text, or base64 for binary data """
+        data = data or b''
+        try:
+            text = data.decode('utf-8') if isinstance(data, bytes) else data
+            body = json.loads(text)
+        except UnicodeDecodeError:
+            return {'body64': base64.b64encode(data).decode('ascii')}
+        except ValueError:
+            return {'body': text}
+
+        return {'body': json.dumps(scrub(body))}
+
+class ReplayTransport(object):
+    """ Answers requests from a cassette without touching the network """
+    def __init__(self, cassette, scale=1.0, command=None):
+        """ Constructor
+
+        :param cassette: loaded cassette to replay
+        :type cassette: Cassette.
+        :param scale: factor applied to recorded latencies, 0 for none
+        :type scale: float.
+        :param command: command being replayed, its segments are preferred
+        :type command: str.
+        """
+        self.scale = scale
+        self.queues = defaultdict(list)
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        segments = sorted(cassette.segments, key=lambda seg: seg['command'] != command)
+        for segment in segments:
+            for interaction in segment['interactions']:
+                self.queues[(interaction['method'], interaction['path'])].append(interaction)
+
+    def next_interaction(self, method, path):
+        """ Next recorded interaction for a request. The last recording of
+        a request is reused once the earlier ones have been consumed.
+
+        :param method: HTTP method
+        :type method: str.
+        :param path: request path and query
+        :type path: str.
+        """
+        with self._lock:
+            queue = self.queues.get((method, path))
+            if not queue:
+                self.misses += 1
+                return None
+            return queue.pop(0) if len(queue) > 1 else queue[0]
+
+    def urlopen(self, manager, method, url, **kwargs):
+        """ Serve a request from the cassette
+
+        :param manager: urllib3 pool manager issuing the request
+        :type manager: urllib3.PoolManager.
+        :param method: HTTP method
+        :type method: str.
+        :param url: request url
+        :type url: str.
+        :returns: returns a urllib3 response
+        """
+        path = relative_url(url)
+        interaction = self.next_interaction(method.upper(), path)
+
+        if interaction is None:
+            LOGGER.warning("No recorded response for %s %s, answering 404.", \
+                                                                method.upper(), path)
+            interaction = {'status': 404, 'reason': 'Not Found', 'headers': \
+                {'Content-Type': 'application/json'}, 'body': json.dumps({'error': \
+                {'code': 'Base.1.0.GeneralError', 'message': 'Not recorded', \
+                '@Message.ExtendedInfo': [{'MessageId': 'Base.1.0.ResourceMissingAtURI'}]}})}
+
+        if self.scale:
+            time.sleep(interaction.get('elapsed', 0) * self.scale)
+
+        if 'error' in interaction:
+            raise urllib3.exceptions.ProtocolError(interaction['error'])
+
+        if 'body64' in interaction:
+            data = base64.b64decode(interaction['body64'])
+        else:
+            data = interaction.get('body', '').encode('utf-8')
+
+        headers = dict(interaction.get('headers', {}))
+        headers['Content-Length'] = str(len(data))
+
+        return urllib3.response.HTTPResponse(body=io.BytesIO(data), headers=headers, \
+                    status=interaction['status'], reason=interaction.get('reason'), \
+                    preload_content=True, decode_content=False, request_method=method)
+
+def install(record=None, replay=None, scale=1.0, command=None):
+    """ Route all urllib3 traffic through a recording or replaying transport
+
+    :param record: cassette file to record to
+    :type record: str.
+    :param replay: cassette file to replay from
+    :type replay: str.
+    :param scale: factor applied to recorded latencies on replay
+    :type scale: float.
+    :param command: command being run, used to tag and pick segments
+    :type command: str.
+    :returns: returns the installed transport
+    """
+    if record and replay:
+        raise InvalidCommandLineError("Only one of --record and --replay can be used.")
+    if scale < 0:
+        raise InvalidCommandLineError("Replay latency scale must not be negative.")
+
+    if record:
+        transport = RecordingTransport(Cassette(record), command=command)
+    else:
+        transport = ReplayTransport(Cassette(replay).load(), scale=scale, command=command)
+
+    def urlopen(manager, method, url, *args, **kwargs):
+        """ urllib3 PoolManager.urlopen replacement """
+        if args:
+            kwargs['redirect'] = args[0]
+        return transport.urlopen(manager, method, url, **kwargs)
+
+    urllib3.PoolManager.urlopen = urlopen
+    LOGGER.info("%s HTTP traffic %s %s", 'Recording' if record else 'Replaying', \
+                                    'to' if record else 'from', record or replay)
+
+    return transport
+
+def uninstall(transport=None):
+    """ Restore direct urllib3 traffic
+
+    :param transport: transport returned by install
+    :type transport: RecordingTransport or ReplayTransport.
+    """
+    urllib3.PoolManager.urlopen = _ORIGINAL_URLOPEN
+    if isinstance(transport, RecordingTransport):
+        transport.cassette.close()
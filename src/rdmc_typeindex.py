@@ -0,0 +1,279 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Type name index for RDMC selectors"""
+
+#---------Imports---------
+
+import bisect
+
+from collections import defaultdict
+
+#---------End of imports---------
+
+class TypeIndex(object):
+    """Lowercase index of type names with prefix and substring lookup
+
+    Lookups are case insensitive, ignore a leading # like the monolith does
+    and return the original names in the order they were indexed.
+    """
+    def __init__(self, names=None):
+        self._names = []
+        self._lower = []
+        self._sorted = []
+        self._cache = {}
+        self.update(names or [])
+
+    def update(self, names):
+        """ Replace the indexed names
+
+        :param names: type names to index
+        :type names: list.
+        """
+        self._names = [name for name in names if name]
+        self._lower = [name.lower() for name in self._names]
+        self._sorted = sorted((low, pos) for pos, low in enumerate(self._lower))
+        self._cache = {}
+
+    @staticmethod
+    def _query(query):
+        """ Lowercase a query and strip the leading # """
+        query = query or ''
+        return (query[1:] if query.startswith('#') else query).lower()
+
+    def prefix(self, query):
+        """ Names starting with query
+
+        :param query: start of the type names
+        :type query: str.
+        :returns: returns a list of type names
+        """
+        query = self._query(query)
+        start = bisect.bisect_left(self._sorted, (query, -1))
+        positions = []
+        for low, pos in self._sorted[start:]:
+            if not low.startswith(query):
+                break
+            positions.append(pos)
+        return [self._names[pos] for pos in sorted(positions)]
+
+    def search(self, query):
+        """ Names containing query, the way selectors are matched
+
+        :param query: part of the type names
+        :type query: str.
+        :returns: returns a list of type names
+        """
+        query = self._query(query)
+        if query not in self._cache:
+            self._cache[query] = [self._names[pos] for pos, low in \
+                                            enumerate(self._lower) if query in low]
+        return list(self._cache[query])
+
+    def __len__(self):
+        return len(self._names)
+
+    def __iter__(self):
+        return iter(self._names)
+
+class IndexedTypes(defaultdict):
+    """Monolith typesadded replacement counting changes to its type names"""
+    def __init__(self, *args, **kwargs):
+        defaultdict.__init__(self, *args, **kwargs)
+        self.version = 0
+
+    def __setitem__(self, key, val):
+        if key not in self:
+            self.version += 1
+        defaultdict.__setitem__(self, key, val)
+
+    def __delitem__(self, key):
+        self.version += 1
+        defaultdict.__delitem__(self, key)
+
+class VersionedPaths(dict):
+    """Monolith paths replacement counting the members stored or removed"""
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self.version = 0
+
+    def __setitem__(self, key, val):
+        self.version += 1
+        dict.__setitem__(self, key, val)
+
+    def __delitem__(self, key):
+        self.version += 1
+        dict.__delitem__(self, key)
+
+    def pop(self, *args):
+        self.version += 1
+        return dict.pop(self, *args)
+
+    def clear(self):
+        self.version += 1
+        dict.clear(self)
+
+#Filter values of instances where the attribute path is missing or crosses a list
+MISSING = object()
+ANYVALUE = object()
+
+def filtervalue(body, keys, navigate):
+    """ Value of an attribute path the way select filters compare it
+
+    Keys are matched case insensitively. When the path crosses a list the
+    filter only checks that an item holds the rest of the path, whatever
+    its value, which is reported as ANYVALUE.
+
+    :param body: instance body
+    :type body: dict.
+    :param keys: attribute path split on /
+    :type keys: list.
+    :param navigate: RmcApp.navigatejson, used to check list items
+    :type navigate: function.
+    :returns: returns the lowercase value, None if it is not comparable,
+              MISSING or ANYVALUE
+    """
+    current = body
+    for ind, key in enumerate(keys):
+        if isinstance(current, dict):
+            key = next((item for item in current if item.lower() == key.lower()), key)
+            if key not in current:
+                return MISSING
+            current = current[key]
+        elif isinstance(current, (list, tuple)):
+            found = any(navigate(list(keys[ind:]), item) is not None for item in current)
+            return ANYVALUE if found else MISSING
+        else:
+            return MISSING
+
+    try:
+        value = ",".join(current) if isinstance(current, (list, tuple)) else current
+        return str(value).lower()
+    except (TypeError, UnicodeError):
+        return None
+
+class PropertyIndex(object):
+    """Instances of a selection indexed by the value of an attribute path"""
+    def __init__(self, instances, keys, navigate):
+        self.instances = list(instances)
+        self.values = {}
+        self.anyvalue = []
+        for pos, inst in enumerate(self.instances):
+            value = filtervalue(inst.dict, keys, navigate)
+            if value is ANYVALUE:
+                self.anyvalue.append(pos)
+            elif value is not MISSING:
+                self.values.setdefault(value, []).append(pos)
+
+    def match(self, val):
+        """ Instances whose value matches a filter value
+
+        An empty value matches every instance holding the attribute path and
+        a value ending with * matches values starting with the rest of it.
+
+        :param val: filter value
+        :type val: str.
+        :returns: returns a list of instances in selection order
+        """
+        val = val.lower()
+        positions = set(self.anyvalue)
+        if not val:
+            positions.update(pos for group in self.values.values() for pos in group)
+        else:
+            positions.update(self.values.get(val, []))
+            if val[-1] == '*':
+                positions.update(pos for value, group in self.values.items() if \
+                            value is not None and value.startswith(val[:-1]) for pos in group)
+        return [self.instances[pos] for pos in sorted(positions)]
+
+class MonolithTypeIndex(TypeIndex):
+    """Type index of a monolith, rebuilt only when its types change
+
+    Doubles as the type to instances map through the monolith typesadded and
+    keeps the property indexes of filtered selections until a member of the
+    monolith is stored or removed.
+    """
+    def __init__(self, monolith):
+        self.monolith = monolith
+        self._key = None
+        self._pathskey = None
+        self._properties = {}
+        TypeIndex.__init__(self)
+
+    def refresh(self):
+        """ Rebuild the index if types were added or removed since the last call
+
+        :returns: returns the index
+        """
+        types = self.monolith.typesadded
+        if not isinstance(types, IndexedTypes):
+            #load_from_dict replaces typesadded with a plain defaultdict
+            types = self.monolith.typesadded = IndexedTypes(set, types)
+        key = (id(types), types.version)
+        if key != self._key:
+            self.update(list(types.keys()))
+            self._key = key
+
+        paths = self.monolith.paths
+        if not isinstance(paths, VersionedPaths):
+            paths = self.monolith.paths = VersionedPaths(paths)
+        if (id(paths), paths.version) != self._pathskey:
+            self.invalidate()
+            self._pathskey = (id(paths), paths.version)
+        return self
+
+    def invalidate(self):
+        """ Drop the property indexes """
+        self._properties = {}
+
+    def properties(self, selector, path, navigate):
+        """ Property index of every instance of a type selection, built on first
+        use
+
+        :param selector: type selector of the instances
+        :type selector: str.
+        :param path: attribute path, keys separated by /
+        :type path: str.
+        :param navigate: RmcApp.navigatejson, used to check list items
+        :type navigate: function.
+        :returns: returns a PropertyIndex
+        """
+        key = (selector.lower(), path.lower())
+        if key not in self._properties:
+            self._properties[key] = PropertyIndex(self.instances(selector), \
+                                                            path.split('/'), navigate)
+        return self._properties[key]
+
+    def paths(self, query):
+        """ Paths of the instances whose type contains query
+
+        :param query: part of the type names
+        :type query: str.
+        :returns: returns a list of paths
+        """
+        types = self.monolith.typesadded
+        return [path for name in self.search(query) for path in types[name]]
+
+    def instances(self, query):
+        """ Instances whose type contains query
+
+        :param query: part of the type names
+        :type query: str.
+        :returns: returns a list of RisMonolithMemberv100
+        """
+        paths = self.monolith.paths
+        return [paths[path] for path in self.paths(query) if path in paths]
@@ -0,0 +1,347 @@
+###
+# Copyright 2017 Hewlett Packard Enterprise, Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+# -*- coding: utf-8 -*-
+"""Compiled attribute registry validation for RDMC
+
+The library parses the whole attribute registry and every validator it
+needs again on each set or load. Registries are compiled here once per
+registry version instead, into a table of attribute entries whose
+validators are built on first use and kept, and the table is kept on
+disk next to the schema cache.
+"""
+
+#---------Imports---------
+
+import re
+import threading
+
+import six
+
+from redfish.ris.validation import ValidationManager, HpPropertiesRegistry, \
+                        EnumValidator, StringValidator, IntegerValidator, BoolValidator, \
+                        ObjectValidator, PasswordValidator, RegistryValidationError, \
+                        UnknownValidatorError, Typepathforval
+
+from rdmc_helper import LOGGER
+from rdmc_schemacache import REGISTRY
+
+#---------End of imports---------
+
+#Attribute tables on disk and in schema packs are keyed by this name
+ATTRIBUTENAME = 'AttributeName'
+
+_REGISTRIES = {}
+_REGISTRIES_LOCK = threading.Lock()
+
+class CompiledEnumValidator(EnumValidator):
+    """Enum validator matching registry values through a lookup table"""
+    def __init__(self, d):
+        super(CompiledEnumValidator, self).__init__(d)
+        self.valuenames = {}
+        if 'enum' not in self:
+            for possibleval in self.get('Value', None) or []:
+                if isinstance(possibleval, dict) and 'ValueName' in possibleval:
+                    self.valuenames.setdefault(possibleval['ValueName'].lower(), \
+                                                            possibleval['ValueName'])
+
+    def validate(self, keyval, name):
+        """Validate against the registry values
+
+        :param keyval: new value to be used for validation.
+        :type keyval: list.
+        :param name: clean name for outputting.
+        :type name: str.
+        :returns: returns an error if fails
+        """
+        if 'enum' in self:
+            return EnumValidator.validate(self, keyval, name)
+
+        value = self.valuenames.get(str(keyval[0]).lower())
+        if value is not None:
+            keyval[0] = value
+            return []
+        return [RegistryValidationError("'%s' is not a valid setting for '%s'" % \
+                                                    (keyval[0], name), regentry=self)]
+
+class CompiledStringValidator(StringValidator):
+    """String validator with its value expression compiled once"""
+    def __init__(self, d):
+        super(CompiledStringValidator, self).__init__(d)
+        self.pattern = re.compile(self['ValueExpression']) if \
+                                            self.get('ValueExpression', None) else None
+
+    def validate(self, newvallist, _):
+        """Validate against iLO schema
+
+        :param newvallist: new value to be used for validation.
+        :type newvallist: list.
+        :returns: returns an error if validation fails criteria
+        """
+        newval = newvallist[0]
+        result = list()
+        namestr = Typepathforval.typepath.defs.attributenametype
+        if not isinstance(newval, six.string_types):
+            result.append(RegistryValidationError("Given value must be a string"))
+            return result
+        if 'MinLength' in self and len(newval) < int(self['MinLength']):
+            result.append(RegistryValidationError("'%s' must be at least '%s' characters "\
+                        "long" % (self[namestr], int(self['MinLength'])), regentry=self))
+        if 'MaxLength' in self and len(newval) > int(self['MaxLength']):
+            result.append(RegistryValidationError("'%s' must be less than '%s' characters "\
+                        "long" % (self[namestr], int(self['MaxLength'])), regentry=self))
+        if self.pattern and newval and not self.pattern.match(newval):
+            result.append(RegistryValidationError("'%(Name)s' must match the regular "\
+                        "expression '%(ValueExpression)s'" % (self), regentry=self))
+        return result
+
+class CompiledPasswordValidator(PasswordValidator):
+    """Password validator with its value expression compiled once"""
+    def __init__(self, d):
+        super(CompiledPasswordValidator, self).__init__(d)
+        self.pattern = re.compile(self['ValueExpression']) if \
+                                            self.get('ValueExpression', None) else None
+
+    def validate(self, newvallist, _):
+        """Validate against iLO schema
+
+        :param newvallist: new value to be used for validation.
+        :type newvallist: list.
+        :returns: returns an validation error if criteria not met
+        """
+        result = list()
+        newval = newvallist[0]
+        if newval is None:
+            return result
+
+        if not isinstance(newval, six.string_types):
+            result.append(RegistryValidationError("Given value must be a string"))
+        if 'MinLength' in self and len(newval) < int(self['MinLength']):
+            result.append(RegistryValidationError("'%s' must be at least '%s' characters "\
+                        "long" % (self.Name, int(self['MinLength'])), regentry=self))
+        if 'MaxLength' in self and len(newval) > int(self['MaxLength']):
+            result.append(RegistryValidationError("'%s' must be less than '%s' characters "\
+                        "long" % (self.Name, int(self['MaxLength'])), regentry=self))
+        if self.pattern and newval and not self.pattern.match(newval):
+            result.append(RegistryValidationError("'%(Name)s' must match the regular "\
+                        "expression '%(ValueExpression)s'" % (self), regentry=self))
+        return result
+
+#In the order HpPropertiesRegistry.validate_attribute tries them
+VALIDATORS = (CompiledEnumValidator, CompiledStringValidator, IntegerValidator, \
+              BoolValidator, ObjectValidator, CompiledPasswordValidator)
+
+class AttributeValidator(object):
+    """Validator of a single registry attribute, parsed once"""
+    def __init__(self, entry):
+        self.entry = entry
+        types = entry.get('type', None)
+        self.nullable = isinstance(types, list) and any(isinstance(item, six.string_types) \
+                                            and item.lower() == 'null' for item in types)
+        self.validator = None
+        for validator in VALIDATORS:
+            if validator.is_type(entry):
+                self.validator = validator.parse(entry)
+                break
+
+    def validate(self, value, name):
+        """ Validate a new value of the attribute
+
+        :param value: new value of the attribute
+        :type value: any.
+        :param name: attribute name for outputting
+        :type name: str.
+        :returns: returns the value, adjusted to the registry spelling, and a
+                  list of errors
+        """
+        if value is None and self.nullable:
+            return value, []
+        if self.validator is None:
+            raise UnknownValidatorError(self.entry)
+
+        vallist = [value]
+        errors = self.validator.is_array(self.entry, vallist, name)
+        errors.extend(self.validator.validate(vallist, name))
+        return vallist[0], errors
+
+class CompiledRegistry(HpPropertiesRegistry):
+    """Registry model of attribute entries compiled into validators on first use
+
+    Entries are kept as they are instead of being parsed into registry
+    objects up front, a set only pays for the attributes it changes.
+    """
+    def __init__(self, entries):
+        dict.__init__(self, entries)
+        self.validators = {}
+
+    def validator(self, name):
+        """ Validator of an attribute
+
+        :param name: attribute name
+        :type name: str.
+        :returns: returns an AttributeValidator or None
+        """
+        if name not in self.validators:
+            entry = self.get(name, None)
+            self.validators[name] = AttributeValidator(entry) if isinstance(entry, dict) \
+                                and entry and ('type' in entry or 'Type' in entry) else None
+        return self.validators[name]
+
+    def validate_attribute_values(self, tdict):
+        """Validate every value of tdict in a single pass
+
+        :param tdict: the dictionary to test against.
+        :type tdict: dict.
+        :returns: returns a validated list
+        """
+        result = list()
+        for tkey in tdict:
+            validator = self.validator(tkey)
+            if validator is None:
+                #Gen 9 Bios properties not in registry
+                continue
+            tdict[tkey], errors = validator.validate(tdict[tkey], tkey)
+            for err in errors:
+                if isinstance(err, RegistryValidationError) and err.reg:
+                    err.sel = tkey
+            result.extend(errors)
+        return result
+
+def attributetable(registry):
+    """ Attribute entries of an attribute registry body by name
+
+    :param registry: attribute registry body
+    :type registry: dict.
+    :returns: returns a dictionary of attribute entries or None
+    """
+    namestr = Typepathforval.typepath.defs.attributenametype
+    attributes = registry.get('RegistryEntries', {}).get('Attributes', None)
+    if not isinstance(attributes, list):
+        return None
+    return dict((item[namestr], item) for item in attributes if isinstance(item, dict) \
+                                                                    and namestr in item)
+
+class RdmcValidationManager(ValidationManager):
+    """ValidationManager compiling each attribute registry version once
+
+    Compiled registries are shared by every manager of the process and
+    their attribute tables are stored in the registry cache, so later
+    sessions skip reading the registry at all.
+    """
+    def __init__(self, monolith, defines=None, caches=None):
+        self.caches = caches
+        self._pathskey = None
+        super(RdmcValidationManager, self).__init__(monolith, defines=defines)
+
+    def updatevalidationdata(self):
+        """Loads the types from monolith, unless no member changed since the last call"""
+        paths = self.monolith.paths
+        version = getattr(paths, 'version', None)
+        if version is not None and self._pathskey == (id(paths), version):
+            return
+        super(RdmcValidationManager, self).updatevalidationdata()
+        self._pathskey = (id(paths), version) if version is not None else None
+
+    def get_registry_model(self, currtype=None, proppath=None, \
+           getmsg=False, searchtype=None, newarg=None, latestschema=False):
+        """Find the registry model, attribute registries come compiled
+
+        :param currtype: current selection type or attribute registry.
+        :type currtype: str.
+        :param proppath: path of the schema you want to validate.
+        :type proppath: str.
+        :param getmsg: flag to return the registry messages instead.
+        :type getmsg: boolean.
+        :param searchtype: classifier for the current search.
+        :type searchtype: str.
+        :param newarg: list of multi level properties to be modified.
+        :type newarg: list.
+        :param latestschema: flag to determine if we should use smart schema.
+        :type latestschema: boolean.
+        :returns: returns registry model
+        """
+        model = None
+        if currtype and not getmsg and searchtype and \
+                            searchtype == Typepathforval.typepath.defs.attributeregtype:
+            model = self.compiledregistry(currtype)
+        if model is None:
+            return super(RdmcValidationManager, self).get_registry_model(currtype=currtype, \
+                        proppath=proppath, getmsg=getmsg, searchtype=searchtype, \
+                        newarg=newarg, latestschema=latestschema)
+        return self.nestedreg(reg=model, args=newarg) if newarg else model
+
+    def compiledregistry(self, registry):
+        """ Compiled model of an attribute registry version
+
+        :param registry: attribute registry identifier with its version
+        :type registry: str.
+        :returns: returns a CompiledRegistry or None
+        """
+        typepath = Typepathforval.typepath
+        key = (registry.lower(), typepath.defs.attributenametype, bool(typepath.flagiften))
+        with _REGISTRIES_LOCK:
+            if key in _REGISTRIES:
+                return _REGISTRIES[key]
+
+        table = self.storedtable(registry)
+        if table is None:
+            table = self.monolithtable(registry)
+        if table is None:
+            return None
+
+        #Gen 10 keeps the attributes under Attributes, Gen 9 at the top
+        model = CompiledRegistry(table)
+        model = CompiledRegistry({'Attributes': model}) if typepath.flagiften else model
+        with _REGISTRIES_LOCK:
+            return _REGISTRIES.setdefault(key, model)
+
+    def storedtable(self, registry):
+        """ Attribute table of a registry from the registry cache or its packs
+
+        :param registry: attribute registry identifier with its version
+        :type registry: str.
+        :returns: returns a dictionary of attribute entries or None
+        """
+        cache = self.caches.get(REGISTRY) if self.caches else None
+        if not cache or Typepathforval.typepath.defs.attributenametype != ATTRIBUTENAME:
+            return None
+        return cache.attributes(registry)
+
+    def monolithtable(self, registry):
+        """ Attribute table of a registry loaded in the monolith, stored in the cache
+
+        :param registry: attribute registry identifier with its version
+        :type registry: str.
+        :returns: returns a dictionary of attribute entries or None
+        """
+        self.find_prop(registry)
+        regdict = None
+        try:
+            for instance in self.monolith.iter(Typepathforval.typepath.defs.attributeregtype):
+                if regdict is None or instance.dict.get('Id', '').lower() == registry.lower():
+                    regdict = instance.resp.dict
+        except BaseException:
+            pass
+        table = attributetable(regdict) if regdict else None
+        if table is None:
+            return None
+
+        cache = self.caches.get(REGISTRY) if self.caches else None
+        if cache and regdict.get('Id', '').lower() == registry.lower() and \
+                Typepathforval.typepath.defs.attributenametype == ATTRIBUTENAME:
+            LOGGER.debug('Caching the attribute table of %s', registry)
+            cache.putattributes(registry, table)
+        return table